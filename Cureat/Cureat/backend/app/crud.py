@@ -1,11 +1,11 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from . import models, schemas
+from sqlalchemy import or_, text
+from . import models, schemas, database
+from .export_log import export_log
 from passlib.context import CryptContext
 from datetime import date, datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import json
-from pathlib import Path
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 import os
@@ -19,11 +19,7 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-# ---------- JSON 저장 유틸 ----------
-
-def _json_base_dir() -> Path:
-    """JSON 파일을 저장할 기본 디렉토리 경로 반환"""
-    return Path(__file__).resolve().parents[2] / "db" / "json_files"
+# ---------- 내보내기 유틸 ----------
 
 def _model_to_dict(model_instance) -> Dict[str, Any]:
     """SQLAlchemy 모델 인스턴스를 직렬화 가능한 딕셔너리로 변환"""
@@ -34,17 +30,9 @@ def _model_to_dict(model_instance) -> Dict[str, Any]:
             data[key] = value.isoformat()
     return data
 
-def _dump_json(table_name: str, record_id: int, data: Dict[str, Any]) -> None:
-    """테이블 이름으로 폴더를 생성하고 JSON 데이터를 저장합니다."""
-    base_dir = _json_base_dir() / table_name
-    
-    if not base_dir.exists():
-        base_dir.mkdir(parents=True, exist_ok=True)
-    
-    file_path = base_dir / f"{record_id}.json"
-    
-    with file_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+def _export(table_name: str, record_id: int, data: Dict[str, Any]) -> None:
+    """레코드를 내보내기 로그에 추가합니다. (기록은 백그라운드 스레드에서 처리)"""
+    export_log.append(table_name, record_id, data)
 
 # ---------- 유저 관련 CRUD ----------
 
@@ -80,7 +68,7 @@ def create_user(db: Session, user: schemas.UserCreate):
         db.commit()
         db.refresh(db_user)
         user_data = _model_to_dict(db_user)
-        _dump_json("users", db_user.id, user_data)
+        _export("users", db_user.id, user_data)
         return db_user
     except IntegrityError as e:
         db.rollback()
@@ -107,15 +95,54 @@ def update_user_interests(db: Session, user_id: int, interests: str):
         db.commit()
         db.refresh(user)
         user_data = _model_to_dict(user)
-        _dump_json("users", user.id, user_data)
+        _export("users", user.id, user_data)
     return user
 
 # ---------- 맛집 관련 CRUD ----------
 def get_restaurant_by_id(db: Session, restaurant_id: int):
     return db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
 
-def get_restaurants_by_name(db: Session, name: str):
-    return db.query(models.Restaurant).filter(models.Restaurant.name.ilike(f'%{name}%')).all()
+def _encode_cursor(score: float, restaurant_id: int) -> str:
+    return f"{score!r}:{restaurant_id}"
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    """'점수:id' 형식의 커서를 해석 (형식이 잘못되면 ValueError)"""
+    score, restaurant_id = cursor.rsplit(":", 1)
+    return float(score), int(restaurant_id)
+
+def get_restaurants_by_name(db: Session, name: str, limit: int = 20, cursor: Optional[str] = None) -> Tuple[List[models.Restaurant], Optional[str]]:
+    """이름으로 음식점을 검색하여 (관련도 순 음식점 목록, 다음 페이지 커서)를 반환
+
+    3글자 이상이면 FTS5 trigram 인덱스에서 부분 일치를 찾아 bm25 순으로 정렬하고,
+    trigram은 3글자 미만을 색인하지 못하므로 짧은 검색어는 LIKE로 찾아 이름이 짧은 순으로 정렬합니다.
+    cursor 이후의 (점수, id)부터 조회하므로 OFFSET 없이 다음 페이지를 읽습니다.
+    """
+    if database.RESTAURANT_FTS_ENABLED and len(name) >= 3:
+        ranked = (
+            "SELECT rowid AS id, bm25(restaurants_fts) AS score FROM restaurants_fts "
+            "WHERE restaurants_fts MATCH :query"
+        )
+        # 큰따옴표로 감싼 구문 검색 = trigram 부분 문자열 일치
+        params: Dict[str, Any] = {"query": '"' + name.replace('"', '""') + '"'}
+    else:
+        ranked = "SELECT id, length(name) AS score FROM restaurants WHERE name LIKE :query ESCAPE '\\'"
+        escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        params = {"query": f"%{escaped}%"}
+
+    sql = f"SELECT id, score FROM ({ranked})"
+    if cursor:
+        params["last_score"], params["last_id"] = _decode_cursor(cursor)
+        sql += " WHERE score > :last_score OR (score = :last_score AND id > :last_id)"
+    # 다음 페이지가 있는지 확인하기 위해 한 건 더 조회
+    sql += " ORDER BY score, id LIMIT :limit"
+    params["limit"] = limit + 1
+    rows = db.execute(text(sql), params).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].score, rows[-1].id)
+    return get_restaurants_by_ids(db, [row.id for row in rows]), next_cursor
 
 def create_restaurant(db: Session, restaurant: schemas.RestaurantCreate):
     db_restaurant = models.Restaurant(
@@ -128,9 +155,15 @@ def create_restaurant(db: Session, restaurant: schemas.RestaurantCreate):
     db.refresh(db_restaurant)
     # SQLAlchemy 객체를 딕셔너리로 변환하여 전달
     restaurant_data = _model_to_dict(db_restaurant)
-    _dump_json("restaurants", db_restaurant.id, restaurant_data)
+    _export("restaurants", db_restaurant.id, restaurant_data)
     return db_restaurant
 
+def get_restaurants_by_ids(db: Session, restaurant_ids: List[int]) -> List[models.Restaurant]:
+    """id 목록 순서를 유지하여 음식점을 조회"""
+    restaurants = db.query(models.Restaurant).filter(models.Restaurant.id.in_(restaurant_ids)).all()
+    by_id = {restaurant.id: restaurant for restaurant in restaurants}
+    return [by_id[restaurant_id] for restaurant_id in restaurant_ids if restaurant_id in by_id]
+
 def get_all_restaurants(db: Session):
     return db.query(models.Restaurant).all()
 
@@ -146,12 +179,15 @@ def create_review(db: Session, review: schemas.ReviewCreate) -> models.Review:
     db.commit()
     db.refresh(db_review)
     review_data = _model_to_dict(db_review)
-    _dump_json("reviews", db_review.id, review_data)
+    _export("reviews", db_review.id, review_data)
     return db_review
 
 def get_restaurant_reviews(db: Session, restaurant_id: int) -> List[models.Review]:
     return db.query(models.Review).filter(models.Review.restaurant_id == restaurant_id).all()
 
+def get_all_reviews(db: Session) -> List[models.Review]:
+    return db.query(models.Review).filter(models.Review.is_ad.isnot(True)).all()
+
 def get_user_reviews(db: Session, user_id: int, limit: int = 10) -> List[models.Review]:
     return db.query(models.Review).filter(models.Review.user_id == user_id).order_by(models.Review.created_at.desc()).limit(limit).all()
 
@@ -162,7 +198,7 @@ def create_search_log(db: Session, user_id: int, query: str):
     db.commit()
     db.refresh(db_search_log)
     search_log_data = _model_to_dict(db_search_log)
-    _dump_json("search_logs", db_search_log.id, search_log_data)
+    _export("search_logs", db_search_log.id, search_log_data)
     return db_search_log
 
 def get_user_search_logs(db: Session, user_id: int, limit: int = 10) -> List[models.SearchLog]:
@@ -175,7 +211,7 @@ def create_post_edit_execution(db: Session, data: schemas.PostEditExecutionCreat
     db.add(record)
     db.commit()
     db.refresh(record)
-    _dump_json(
+    _export(
         "post_edit_executions",
         record.id,
         {
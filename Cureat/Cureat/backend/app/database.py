@@ -1,6 +1,6 @@
 # backend/app/database.py
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -21,4 +21,40 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# restaurants_fts(FTS5 trigram) 테이블 사용 가능 여부 (ensure_restaurant_fts 실행 후 설정)
+RESTAURANT_FTS_ENABLED = False
+
+def ensure_restaurant_fts():
+    """음식점 이름 검색용 FTS5 trigram 가상 테이블과 동기화 트리거 생성 (SQLite 3.34 이상 필요)"""
+    global RESTAURANT_FTS_ENABLED
+    with engine.begin() as conn:
+        exists = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'restaurants_fts'")).first()
+        try:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS restaurants_fts USING fts5("
+                "name, content='restaurants', content_rowid='id', tokenize='trigram')"
+            ))
+        except Exception as e:
+            print(f"FTS5 trigram 테이블 생성 오류, LIKE 검색 사용: {e}")
+            return False
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS restaurants_fts_ai AFTER INSERT ON restaurants BEGIN "
+            "INSERT INTO restaurants_fts(rowid, name) VALUES (new.id, new.name); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS restaurants_fts_ad AFTER DELETE ON restaurants BEGIN "
+            "INSERT INTO restaurants_fts(restaurants_fts, rowid, name) VALUES ('delete', old.id, old.name); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS restaurants_fts_au AFTER UPDATE OF name ON restaurants BEGIN "
+            "INSERT INTO restaurants_fts(restaurants_fts, rowid, name) VALUES ('delete', old.id, old.name); "
+            "INSERT INTO restaurants_fts(rowid, name) VALUES (new.id, new.name); END"
+        ))
+        if not exists:
+            # 처음 생성한 경우 기존 음식점을 색인
+            conn.execute(text("INSERT INTO restaurants_fts(restaurants_fts) VALUES ('rebuild')"))
+            print("✅ Created 'restaurants_fts' search index")
+    RESTAURANT_FTS_ENABLED = True
+    return True
@@ -0,0 +1,228 @@
+# backend/app/export_log.py
+
+"""레코드 내보내기 로그
+
+커밋된 레코드를 db/export_log/ 아래 세그먼트 파일(export-000001.jsonl ...)에 한 줄짜리 JSON으로 추가합니다.
+요청 스레드는 큐에 넣기만 하고, 백그라운드 스레드가 모아서 기록한 뒤 한 번에 fsync 합니다.
+같은 레코드가 여러 번 기록되면 가장 나중 줄이 최신 상태입니다.
+
+실행 예:
+    cd backend
+    python -m app.export_log read --table users
+    python -m app.export_log compact
+    python -m app.export_log import-legacy   # 기존 db/json_files/<table>/<id>.json 파일을 로그로 옮김
+"""
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+# 내보내기 로그 위치와 세그먼트 최대 크기, fsync 주기 (초)
+EXPORT_LOG_DIR = os.getenv("EXPORT_LOG_DIR") or str(Path(__file__).resolve().parents[2] / "db" / "export_log")
+EXPORT_SEGMENT_MAX_BYTES = int(os.getenv("EXPORT_SEGMENT_MAX_BYTES", str(64 * 1024 * 1024)))
+EXPORT_FSYNC_INTERVAL = float(os.getenv("EXPORT_FSYNC_INTERVAL", "1.0"))
+LEGACY_JSON_DIR = Path(__file__).resolve().parents[2] / "db" / "json_files"
+
+_STOP = object()
+
+
+def _segment_paths(directory: Path):
+    return sorted(directory.glob("export-*.jsonl"))
+
+
+def _segment_path(directory: Path, number: int) -> Path:
+    return directory / f"export-{number:06d}.jsonl"
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class ExportLog:
+    """세그먼트 파일에 레코드를 추가하는 백그라운드 기록기"""
+
+    def __init__(
+        self,
+        directory: str = EXPORT_LOG_DIR,
+        segment_max_bytes: int = EXPORT_SEGMENT_MAX_BYTES,
+        fsync_interval: float = EXPORT_FSYNC_INTERVAL,
+    ):
+        self.directory = Path(directory)
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync_interval = fsync_interval
+        self._queue: "queue.Queue" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._file = None
+
+    def append(self, table: str, record_id: int, data: Dict[str, Any]):
+        """레코드를 기록 대기열에 추가 (파일 기록/fsync는 백그라운드 스레드에서 처리)"""
+        self._ensure_started()
+        self._queue.put({"table": table, "id": record_id, "ts": datetime.now(timezone.utc).isoformat(), "data": data})
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="export-log", daemon=True)
+                self._thread.start()
+
+    def _open_segment(self):
+        """마지막 세그먼트가 가득 찼으면 다음 번호의 세그먼트를 엶"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        paths = _segment_paths(self.directory)
+        number = int(paths[-1].stem.split("-")[1]) if paths else 1
+        path = _segment_path(self.directory, number)
+        if path.exists() and path.stat().st_size >= self.segment_max_bytes:
+            path = _segment_path(self.directory, number + 1)
+        self._file = path.open("a", encoding="utf-8")
+
+    def _write_batch(self, records):
+        if self._file is None:
+            self._open_segment()
+        self._file.write("".join(_dumps(record) + "\n" for record in records))
+        self._file.flush()
+        # 배치마다 한 번만 fsync
+        os.fsync(self._file.fileno())
+        if self._file.tell() >= self.segment_max_bytes:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            try:
+                batch.append(self._queue.get(timeout=self.fsync_interval))
+            except queue.Empty:
+                continue
+            # fsync_interval 동안 들어온 레코드를 모아서 한 번에 기록
+            deadline = time.monotonic() + self.fsync_interval
+            while True:
+                if batch[-1] is _STOP:
+                    batch.pop()
+                    stopping = True
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except OSError as e:
+                    print(f"내보내기 로그 기록 오류: {e}")
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self):
+        """대기 중인 레코드를 모두 기록하고 스레드를 종료 (애플리케이션 종료 시 호출)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(_STOP)
+            thread.join()
+
+
+def read_records(directory: str = EXPORT_LOG_DIR, table: Optional[str] = None, latest: bool = False) -> Iterator[Dict[str, Any]]:
+    """세그먼트 순서대로 레코드를 읽음 (latest=True면 레코드별 최신 상태만 반환)"""
+    def records():
+        for path in _segment_paths(Path(directory)):
+            with path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # 기록 도중 종료되어 잘린 마지막 줄은 건너뜀
+                        continue
+                    if table is None or record["table"] == table:
+                        yield record
+
+    if not latest:
+        yield from records()
+        return
+    current: Dict[tuple, Dict[str, Any]] = {}
+    for record in records():
+        current.pop((record["table"], record["id"]), None)
+        current[(record["table"], record["id"])] = record
+    yield from current.values()
+
+
+def compact(directory: str = EXPORT_LOG_DIR, segment_max_bytes: int = EXPORT_SEGMENT_MAX_BYTES) -> int:
+    """레코드별 최신 상태만 남기도록 세그먼트를 다시 씀 (기록기가 실행 중이지 않을 때 사용)"""
+    directory = Path(directory)
+    old_paths = _segment_paths(directory)
+    if not old_paths:
+        return 0
+    records = list(read_records(str(directory), latest=True))
+    # 새 세그먼트를 임시 파일로 모두 쓴 뒤 기존 세그먼트를 교체
+    tmp_paths, size, f = [], 0, None
+    for record in records:
+        line = _dumps(record) + "\n"
+        if f is None or size >= segment_max_bytes:
+            if f is not None:
+                f.close()
+            tmp_paths.append(directory / f"compact-{len(tmp_paths) + 1:06d}.tmp")
+            f, size = tmp_paths[-1].open("w", encoding="utf-8"), 0
+        f.write(line)
+        size += len(line.encode("utf-8"))
+    if f is not None:
+        f.flush()
+        os.fsync(f.fileno())
+        f.close()
+    for path in old_paths:
+        path.unlink()
+    for number, path in enumerate(tmp_paths, start=1):
+        os.replace(path, _segment_path(directory, number))
+    return len(records)
+
+
+def import_legacy(log: ExportLog, legacy_dir: Path = LEGACY_JSON_DIR) -> int:
+    """기존 db/json_files/<table>/<id>.json 파일을 내보내기 로그로 옮김"""
+    count = 0
+    for path in sorted(legacy_dir.glob("*/*.json")):
+        with path.open(encoding="utf-8") as f:
+            data = json.load(f)
+        record_id = int(path.stem) if path.stem.isdigit() else path.stem
+        log.append(path.parent.name, record_id, data)
+        count += 1
+    log.close()
+    return count
+
+
+# 애플리케이션 전체에서 공유하는 내보내기 로그
+export_log = ExportLog()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default=EXPORT_LOG_DIR, help="내보내기 로그 디렉토리")
+    commands = parser.add_subparsers(dest="command", required=True)
+    read_parser = commands.add_parser("read", help="레코드를 JSON 줄로 출력")
+    read_parser.add_argument("--table", help="출력할 테이블 이름")
+    read_parser.add_argument("--all", action="store_true", help="변경 이력 전체 출력 (기본값: 레코드별 최신 상태)")
+    commands.add_parser("compact", help="레코드별 최신 상태만 남기고 세그먼트를 다시 씀")
+    commands.add_parser("import-legacy", help="db/json_files의 레코드별 JSON 파일을 로그로 옮김")
+    args = parser.parse_args(argv)
+
+    if args.command == "read":
+        for record in read_records(args.dir, table=args.table, latest=not args.all):
+            print(_dumps(record))
+    elif args.command == "compact":
+        print(f"{compact(args.dir)}개 레코드로 압축 완료")
+    elif args.command == "import-legacy":
+        print(f"{import_legacy(ExportLog(args.dir))}개 파일을 옮겼습니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,10 +9,11 @@ from dotenv import load_dotenv
 # .env 로드
 load_dotenv()
 
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import BackgroundTasks, FastAPI, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from .database import get_db, Base, engine
+from .database import get_db, Base, engine, ensure_restaurant_fts
 from . import models, schemas, crud, service
+from .export_log import export_log
 from starlette.middleware.cors import CORSMiddleware
 from typing import List, Dict, Any, Optional
 
@@ -44,6 +45,42 @@ app.add_middleware(
 
 # 데이터베이스 테이블 생성
 Base.metadata.create_all(bind=engine)
+# 음식점 이름 검색용 FTS5 인덱스 생성
+ensure_restaurant_fts()
+
+# 시작 시 벡터 인덱스에 없는 음식점을 벡터화할지 여부 (VECTOR_INDEX_REBUILD_ON_STARTUP=1)
+VECTOR_INDEX_REBUILD_ON_STARTUP = os.getenv("VECTOR_INDEX_REBUILD_ON_STARTUP", "0") == "1"
+
+@app.on_event("startup")
+def rebuild_vector_index():
+    if not VECTOR_INDEX_REBUILD_ON_STARTUP:
+        return
+    db = next(get_db())
+    try:
+        added = service.rebuild_vector_index(db)
+        print(f"✅ 벡터 인덱스에 {added}개 음식점 추가 (전체 {len(service.vector_index)}개)")
+    finally:
+        db.close()
+
+@app.on_event("startup")
+def ensure_search_index():
+    # 키워드 인덱스는 DB 파일에 있어 워커끼리 공유되므로 처음 한 번만 구성 (다시 구성: python -m app.search_index rebuild)
+    db = next(get_db())
+    try:
+        indexed = service.ensure_search_index(db)
+        if indexed is not None:
+            print(f"✅ 키워드 검색 인덱스 구성 완료 ({indexed}개 음식점)")
+    finally:
+        db.close()
+
+@app.on_event("shutdown")
+def flush_vector_index():
+    service.vector_index.flush()
+
+@app.on_event("shutdown")
+def close_export_log():
+    # 대기 중인 내보내기 레코드를 모두 기록
+    export_log.close()
 
 # Naver API 설정
 NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
@@ -90,14 +127,39 @@ def update_user_interests(user_id: int, interests: schemas.UserUpdateInterests,
 # ---------- 맛집 관련 엔드포인트 ----------
 
 @app.post("/restaurants/", response_model=schemas.RestaurantDetail, status_code=status.HTTP_201_CREATED)
-def create_restaurant(restaurant: schemas.RestaurantCreate, db: Session = Depends(get_db)):
+def create_restaurant(restaurant: schemas.RestaurantCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """새로운 맛집 정보를 생성합니다."""
-    return crud.create_restaurant(db, restaurant)
+    db_restaurant = crud.create_restaurant(db, restaurant)
+    service.index_restaurant_text(db_restaurant)
+    # 응답 후 벡터화하여 추천 검색 인덱스에 추가
+    background_tasks.add_task(service.index_restaurant, db_restaurant)
+    return db_restaurant
 
 @app.get("/restaurants/search/", response_model=List[schemas.RestaurantDetail])
-def search_restaurants(name: str, db: Session = Depends(get_db)):
-    """이름으로 맛집을 검색합니다."""
-    restaurants = crud.get_restaurants_by_name(db, name)
+def search_restaurants(
+    response: Response,
+    name: str,
+    mode: str = "hybrid",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """맛집을 검색합니다.
+
+    mode=hybrid : 이름/카테고리/주소/리뷰 키워드(BM25)와 벡터 유사도를 결합한 상위 limit개
+    mode=name : FTS5 인덱스 기반 이름 검색 (다음 페이지가 있으면 X-Next-Cursor 헤더 값을 cursor로 전달)
+    """
+    if mode == "hybrid":
+        restaurants = service.hybrid_search_restaurants(db, name, k=limit)
+    elif mode == "name":
+        try:
+            restaurants, next_cursor = crud.get_restaurants_by_name(db, name, limit=limit, cursor=cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+    else:
+        raise HTTPException(status_code=400, detail=f"Unsupported search mode: {mode}")
     if not restaurants:
         raise HTTPException(status_code=404, detail="Restaurants not found")
     return restaurants
@@ -110,22 +172,23 @@ def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Restaurant not found")
     return restaurant
 
-# ---------- 추천 기능 엔드포인트 (기능 미구현) ----------
+# ---------- 추천 기능 엔드포인트 ----------
 
 @app.get("/restaurants/recommendations/{user_id}", response_model=schemas.RecommendationResponse)
-def get_recommendations_for_user(user_id: int, db: Session = Depends(get_db)):
-    """
-    NLP 기능이 비활성화되어 벡터를 사용할 수 없습니다.
-    따라서 추천 로직을 건너뛰고 임시 응답을 반환합니다.
-    """
-    answer = "현재 추천 기능이 비활성화되어 맛집 추천을 할 수 없습니다. 개발자에게 문의하세요."
-    return schemas.RecommendationResponse(answer=answer, restaurants=[])
+def get_recommendations_for_user(user_id: int, k: int = 5, db: Session = Depends(get_db)):
+    """사용자 관심사와 벡터가 가장 비슷한 맛집을 인메모리 벡터 인덱스에서 찾아 추천합니다."""
+    user = crud.get_user_by_id(db, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return service.get_recommendation_for_user(user, "", db, k=k)
 
 # ---------- 리뷰 관련 엔드포인트 ----------
 @app.post("/reviews/", response_model=schemas.Review)
 def create_review(review: schemas.ReviewCreate, db: Session = Depends(get_db)):
     """리뷰를 생성합니다."""
-    return crud.create_review(db=db, review=review)
+    db_review = crud.create_review(db=db, review=review)
+    service.index_review_text(db_review)
+    return db_review
 
 # ---------- 검색 기록 관련 엔드포인트 ----------
 @app.post("/users/{user_id}/search_logs")
@@ -136,5 +199,5 @@ def create_search_log(user_id: int, query: schemas.SearchLogCreate, db: Session
 # ---------- JSON 저장 엔드포인트 ----------
 @app.post("/post_edit_executions/", response_model=schemas.PostEditExecution)
 def create_post_edit_execution_api(data: schemas.PostEditExecutionCreate, db: Session = Depends(get_db)):
-    """데이터를 JSON 파일로 저장합니다."""
+    """데이터를 저장하고 내보내기 로그에 기록합니다."""
     return crud.create_post_edit_execution(db=db, data=data)
\ No newline at end of file
@@ -0,0 +1,195 @@
+# backend/app/search_index.py
+
+"""음식점 키워드(BM25) 검색 인덱스
+
+형태소 분석한 토큰을 SQLite FTS5 가상 테이블(restaurant_search_fts)에 저장하고 bm25()로 순위를 매깁니다.
+인덱스가 DB 파일 안에 있으므로 여러 워커 프로세스가 같은 인덱스를 공유하고, 한 워커가 반영한 변경을 다른 워커도 바로 검색합니다.
+토큰화는 음식점/리뷰를 저장할 때 한 번만 하며, 워커가 시작할 때마다 전체를 다시 색인하지 않습니다.
+
+실행 예:
+    cd backend
+    python -m app.search_index rebuild   # DB의 음식점/리뷰로 인덱스를 새로 구성
+"""
+import argparse
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from .database import engine as default_engine
+
+# 이름 컬럼 가중치 (카테고리/주소, 리뷰 컬럼은 1)
+NAME_WEIGHT = 2.0
+# Reciprocal Rank Fusion 상수 (순위가 낮은 결과의 영향을 완만하게 줄임)
+RRF_K = 60
+
+_LATIN_TOKEN = re.compile(r"[a-z0-9]+")
+_NON_HANGUL = re.compile(r"[^ㄱ-ㅎㅏ-ㅣ가-힣\s]")
+_preprocess_text = None
+
+
+def _get_preprocess_text():
+    """nlpService.preprocess_text를 처음 사용할 때 한 번만 로드 (konlpy를 쓸 수 없으면 공백 기준 분리)"""
+    global _preprocess_text
+    if _preprocess_text is None:
+        try:
+            from .nlpService import preprocess_text
+            _preprocess_text = preprocess_text
+        except Exception as e:
+            print(f"형태소 분석기 로딩 오류, 공백 기준 토큰화 사용: {e}")
+            _preprocess_text = lambda text: _NON_HANGUL.sub(" ", text)
+    return _preprocess_text
+
+
+def tokenize(text: str) -> List[str]:
+    """preprocess_text 형태소 토큰 + 영문/숫자 토큰"""
+    if not text:
+        return []
+    tokens = _get_preprocess_text()(text).split()
+    # preprocess_text는 한글만 남기므로 영문 상호명/숫자는 따로 추가
+    return tokens + _LATIN_TOKEN.findall(text.lower())
+
+
+def _tokens_text(text: Optional[str]) -> str:
+    return " ".join(tokenize(text or ""))
+
+
+class BM25Index:
+    """음식점 단위 FTS5 역색인 (이름 / 카테고리+주소 / 리뷰 본문 세 컬럼, 문서 rowid = 음식점 id)
+
+    FTS5 기본 토크나이저(unicode61)가 공백으로 나눌 수 있도록 미리 형태소 분석한 토큰을 공백으로 이어 저장합니다.
+    리뷰가 추가되면 해당 음식점 문서의 reviews 컬럼에 토큰을 덧붙입니다.
+    """
+
+    def __init__(self, engine: Engine = default_engine, table: str = "restaurant_search_fts", name_weight: float = NAME_WEIGHT):
+        self.engine = engine
+        self.table = table
+        self.name_weight = name_weight
+
+    def ensure(self):
+        """FTS5 테이블이 없으면 생성"""
+        with self.engine.begin() as conn:
+            conn.execute(text(f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5(name, info, reviews)"))
+
+    def _set_restaurant(self, conn, restaurant_id: int, name: Optional[str], info: Optional[str]):
+        params = {"id": restaurant_id, "name": _tokens_text(name), "info": _tokens_text(info)}
+        updated = conn.execute(text(f"UPDATE {self.table} SET name = :name, info = :info WHERE rowid = :id"), params).rowcount
+        if not updated:
+            conn.execute(text(f"INSERT INTO {self.table} (rowid, name, info, reviews) VALUES (:id, :name, :info, '')"), params)
+
+    def _add_review(self, conn, restaurant_id: int, content: Optional[str]):
+        tokens = _tokens_text(content)
+        if not tokens:
+            return
+        params = {"id": restaurant_id, "tokens": tokens}
+        updated = conn.execute(
+            text(f"UPDATE {self.table} SET reviews = reviews || ' ' || :tokens WHERE rowid = :id"), params
+        ).rowcount
+        if not updated:
+            conn.execute(text(f"INSERT INTO {self.table} (rowid, name, info, reviews) VALUES (:id, '', '', :tokens)"), params)
+
+    def add_restaurant(self, restaurant_id: int, name: Optional[str], info: Optional[str] = None):
+        """음식점 이름과 카테고리/주소 정보를 색인 (이미 있으면 교체, 리뷰 토큰은 유지)"""
+        with self.engine.begin() as conn:
+            self._set_restaurant(conn, restaurant_id, name, info)
+
+    def add_review(self, restaurant_id: int, content: Optional[str]):
+        """리뷰 본문을 해당 음식점 문서에 추가"""
+        with self.engine.begin() as conn:
+            self._add_review(conn, restaurant_id, content)
+
+    def remove(self, restaurant_id: int):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table} WHERE rowid = :id"), {"id": restaurant_id})
+
+    def clear(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table}"))
+
+    def rebuild(self, restaurants: Iterable[Tuple[int, Optional[str], Optional[str]]], reviews: Iterable[Tuple[int, Optional[str]]]) -> int:
+        """(id, 이름, 정보) 음식점 목록과 (음식점 id, 본문) 리뷰 목록으로 인덱스를 새로 구성
+
+        한 트랜잭션에서 비우고 다시 채우므로 다른 프로세스는 이전 인덱스 또는 완성된 인덱스만 보며,
+        여러 프로세스가 동시에 실행해도 결과가 같습니다.
+        """
+        reviews_by_restaurant: Dict[int, List[str]] = defaultdict(list)
+        for restaurant_id, content in reviews:
+            tokens = _tokens_text(content)
+            if tokens:
+                reviews_by_restaurant[restaurant_id].append(tokens)
+        rows = [
+            {
+                "id": restaurant_id,
+                "name": _tokens_text(name),
+                "info": _tokens_text(info),
+                "reviews": " ".join(reviews_by_restaurant.pop(restaurant_id, [])),
+            }
+            for restaurant_id, name, info in restaurants
+        ]
+        # 음식점 정보 없이 리뷰만 있는 문서
+        rows += [
+            {"id": restaurant_id, "name": "", "info": "", "reviews": " ".join(tokens)}
+            for restaurant_id, tokens in reviews_by_restaurant.items()
+        ]
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DELETE FROM {self.table}"))
+            if rows:
+                conn.execute(text(f"INSERT INTO {self.table} (rowid, name, info, reviews) VALUES (:id, :name, :info, :reviews)"), rows)
+        return len(rows)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """BM25 점수가 높은 음식점 k개를 (음식점 id, 점수) 목록으로 반환"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+        # 질의 단어 중 하나라도 포함한 문서 (단어는 큰따옴표로 감싸 FTS5 문법으로 해석되지 않도록 함)
+        match = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        # bm25()는 관련도가 높을수록 작은(음수) 값을 반환하므로 부호를 바꿔 점수로 사용
+        rows = self._execute(
+            f"SELECT rowid, -bm25({self.table}, :name_weight, 1.0, 1.0) AS score FROM {self.table} "
+            f"WHERE {self.table} MATCH :match ORDER BY score DESC, rowid LIMIT :k",
+            {"name_weight": self.name_weight, "match": match, "k": k},
+        )
+        return [(row[0], row[1]) for row in rows]
+
+    def _execute(self, sql: str, params: dict) -> list:
+        with self.engine.connect() as conn:
+            return conn.execute(text(sql), params).all()
+
+    def __len__(self):
+        return self._execute(f"SELECT count(*) FROM {self.table}", {})[0][0]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[Tuple[int, float]]], k: int = RRF_K) -> List[Tuple[int, float]]:
+    """여러 검색 결과 순위를 RRF(1 / (k + 순위)) 점수 합으로 결합"""
+    fused: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, (doc_id, _) in enumerate(ranking, start=1):
+            fused[doc_id] += 1 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+# 애플리케이션 전체에서 공유하는 키워드 검색 인덱스
+search_index = BM25Index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("rebuild", help="DB의 음식점/리뷰로 인덱스를 새로 구성")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        from . import service
+        from .database import SessionLocal
+        db = SessionLocal()
+        try:
+            print(f"키워드 검색 인덱스 구성 완료 ({service.build_search_index(db)}개 음식점)")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import os
+import numpy as np
+from typing import List, Optional
+import google.generativeai as genai
+from dotenv import load_dotenv
+from .. import models, schemas, crud
+from ..vector_index import NumpyVectorIndex
+from ..search_index import search_index, reciprocal_rank_fusion
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# API Key 및 모델 설정
+genai.configure(api_key=os.getenv("GENAI_API_KEY"))
+
+# 사용할 Gemini 모델 객체 생성
+gemini_model = genai.GenerativeModel("gemini-1.5-flash")
+
+# SQLite 배포에서 사용하는 음식점 벡터 인덱스 (db.sqlite3 옆의 vector_index 폴더에 저장)
+vector_index = NumpyVectorIndex()
+
+# 벡터 유사도 계산 함수
+def cosine_similarity(vec_a: List[float], vec_b: List[float]) -> float:
+    a = np.asarray(vec_a, dtype=np.float32)
+    b = np.asarray(vec_b, dtype=np.float32)
+    norm = np.linalg.norm(a) * np.linalg.norm(b)
+    return float(a @ b / norm) if norm else 0.0
+
+def _get_text_vector(text: str) -> List[float]:
+    """텍스트를 벡터로 변환 (NLP 모델을 사용할 수 없으면 빈 리스트)"""
+    try:
+        # konlpy/sentence-transformers 로딩이 무거우므로 처음 사용할 때 import
+        from .. import nlpService
+        return nlpService.get_text_vector(text)
+    except (ImportError, RuntimeError) as e:
+        print(f"텍스트 벡터 변환 오류: {e}")
+        return []
+
+def _restaurant_text(restaurant: models.Restaurant) -> str:
+    return " ".join(value for value in [restaurant.name, restaurant.categories] if value)
+
+def index_restaurant(restaurant: models.Restaurant) -> bool:
+    """음식점 벡터를 인덱스에 추가 (이미 있으면 덮어씀)"""
+    vector = _get_text_vector(_restaurant_text(restaurant))
+    if not vector:
+        return False
+    vector_index.add(restaurant.id, vector, categories=restaurant.categories, address=restaurant.address)
+    return True
+
+def rebuild_vector_index(db: Session) -> int:
+    """인덱스에 없는 음식점을 모두 벡터화하여 추가하고, 추가된 개수를 반환"""
+    added = 0
+    for restaurant in crud.get_all_restaurants(db):
+        if restaurant.id not in vector_index and index_restaurant(restaurant):
+            added += 1
+    vector_index.flush()
+    return added
+
+# --- 키워드(BM25) + 벡터 하이브리드 검색 ---
+def _restaurant_info(restaurant: models.Restaurant) -> str:
+    return " ".join(value for value in [restaurant.categories, restaurant.address] if value)
+
+def index_restaurant_text(restaurant: models.Restaurant):
+    """음식점 이름(가중치 2배)/카테고리/주소를 키워드 인덱스에 추가"""
+    search_index.add_restaurant(restaurant.id, restaurant.name, _restaurant_info(restaurant))
+
+def index_review_text(review: models.Review):
+    """리뷰 본문을 해당 음식점 문서에 추가"""
+    if not review.is_ad:
+        search_index.add_review(review.restaurant_id, review.content)
+
+def build_search_index(db: Session) -> int:
+    """DB의 음식점과 리뷰로 키워드 인덱스를 새로 구성하고, 색인된 음식점 수를 반환"""
+    search_index.ensure()
+    return search_index.rebuild(
+        ((restaurant.id, restaurant.name, _restaurant_info(restaurant)) for restaurant in crud.get_all_restaurants(db)),
+        ((review.restaurant_id, review.content) for review in crud.get_all_reviews(db) if not review.is_ad),
+    )
+
+def ensure_search_index(db: Session) -> Optional[int]:
+    """키워드 인덱스 테이블을 준비하고, 인덱스가 비어 있는데 음식점이 있을 때(최초 실행)만 구성
+
+    인덱스는 DB 파일에 저장되어 워커 프로세스끼리 공유되므로 워커가 시작할 때마다 다시 구성하지 않습니다.
+    구성했으면 색인된 음식점 수, 이미 구성되어 있으면 None을 반환합니다.
+    """
+    search_index.ensure()
+    if len(search_index) or db.query(models.Restaurant.id).first() is None:
+        return None
+    return build_search_index(db)
+
+# 아래 함수들은 DB 조회, 형태소 분석, 임베딩 등 블로킹 작업을 하므로 동기 함수로 두고 엔드포인트도 def로 선언
+# (FastAPI가 스레드 풀에서 실행하여 이벤트 루프를 막지 않음)
+def hybrid_search_restaurants(db: Session, query: str, k: int = 10) -> List[models.Restaurant]:
+    """BM25 결과와 벡터 유사도 결과를 Reciprocal Rank Fusion으로 결합하여 상위 k개 음식점을 반환"""
+    candidates = max(k * 3, 30)
+    rankings = [search_index.search(query, k=candidates)]
+    query_vector = _get_text_vector(query)
+    if query_vector:
+        rankings.append(vector_index.search(query_vector, k=candidates))
+    restaurant_ids = [restaurant_id for restaurant_id, _ in reciprocal_rank_fusion(rankings)[:k]]
+    return crud.get_restaurants_by_ids(db, restaurant_ids)
+
+# --- 맛집 추천 기능 ---
+def get_recommendation_for_user(user: models.User, prompt: str, db: Session, k: int = 5) -> schemas.RecommendationResponse:
+    query = " ".join(value for value in [prompt, user.interests] if value)
+    query_vector = _get_text_vector(query)
+    if not query_vector:
+        return schemas.RecommendationResponse(
+            answer="현재 NLP 기능이 비활성화되어 맛집 추천을 할 수 없습니다. 개발자에게 문의하세요.",
+            restaurants=[]
+        )
+
+    # 후보 음식점을 IN 쿼리 한 번으로 조회 (유사도 순서 유지)
+    restaurant_ids = [restaurant_id for restaurant_id, _ in vector_index.search(query_vector, k=k)]
+    restaurants = [
+        schemas.RestaurantDetail.model_validate(restaurant)
+        for restaurant in crud.get_restaurants_by_ids(db, restaurant_ids)
+    ]
+
+    if not restaurants:
+        return schemas.RecommendationResponse(answer="조건에 맞는 맛집을 찾지 못했습니다.", restaurants=[])
+    return schemas.RecommendationResponse(
+        answer=f"{user.name}님의 관심사와 가장 비슷한 맛집 {len(restaurants)}곳을 추천합니다.",
+        restaurants=restaurants
+    )
@@ -0,0 +1,272 @@
+# backend/app/vector_index.py
+
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# 여러 워커 프로세스가 같은 인덱스 파일을 쓰므로 파일 잠금으로 변경을 직렬화 (Windows는 단일 프로세스로만 사용)
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# 벡터 인덱스 저장 위치 (db.sqlite3와 같은 위치에 저장)
+VECTOR_INDEX_DIR = os.getenv("VECTOR_INDEX_DIR", "./vector_index")
+# 삭제된 행 비율이 이 값을 넘으면 파일을 다시 써서 공간을 회수
+COMPACT_RATIO = 0.25
+
+
+class VectorIndex(ABC):
+    """음식점 벡터 검색 인터페이스 (PostgreSQL 배포의 vector_search.VectorIndex와 같은 메서드)
+
+    search()는 (음식점 id, 유사도) 목록을 유사도가 높은 순서로 반환합니다.
+    """
+
+    @abstractmethod
+    def search(
+        self,
+        query_vector: List[float],
+        k: int = 10,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """(음식점 id, 유사도) 목록을 유사도가 높은 순서로 반환"""
+
+    @abstractmethod
+    def add(self, restaurant_id: int, vector: List[float]):
+        """음식점 벡터를 추가하거나 덮어씀"""
+
+    @abstractmethod
+    def remove(self, restaurant_id: int):
+        """음식점 벡터를 삭제"""
+
+
+class NumpyVectorIndex(VectorIndex):
+    """SQLite 배포용 인메모리 벡터 인덱스 (VectorIndex 구현)
+
+    vectors.f32 : 정규화된 float32 벡터 행렬 (memmap, 용량이 부족하면 두 배로 확장)
+    rows.jsonl : 행 추가/삭제 기록 (추가 전용 로그, 재생하여 id/메타데이터 복원)
+    index.lock : 프로세스 간 잠금 파일
+
+    uvicorn/gunicorn 워커 여러 개가 같은 디렉터리를 공유할 수 있습니다.
+    추가/삭제는 index.lock 배타 잠금을 잡고, 다른 프로세스가 기록한 로그를 먼저 반영한 뒤 행을 할당하므로
+    두 워커가 같은 행에 쓰거나 로그 줄이 섞이지 않습니다. 검색은 공유 잠금을 잡고 새로 기록된 로그만 반영하므로
+    다른 워커에서 추가한 음식점도 재시작 없이 검색됩니다.
+    """
+
+    def __init__(self, directory: str = VECTOR_INDEX_DIR, dim: int = 768, initial_capacity: int = 1024):
+        self.directory = Path(directory)
+        self.dim = dim
+        self.initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._vectors_path = self.directory / "vectors.f32"
+        self._log_path = self.directory / "rows.jsonl"
+        self._lock_path = self.directory / "index.lock"
+        self._lock_file = None
+        self._matrix: Optional[np.memmap] = None
+        self._reset()
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+
+    # ---------- 저장/로드 ----------
+
+    def _reset(self):
+        self._ids = np.full(0, -1, dtype=np.int64)  # 행 번호 -> 음식점 id (-1은 삭제된 행)
+        self._rows: Dict[int, int] = {}  # 음식점 id -> 행 번호
+        self._metadata: Dict[int, Tuple[str, str]] = {}  # 음식점 id -> (카테고리, 주소)
+        self._count = 0
+        self._log_inode: Optional[int] = None
+        self._log_offset = 0  # 반영한 로그 바이트 수
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """프로세스 간 잠금 (같은 프로세스의 스레드 간 잠금은 self._lock을 먼저 잡아서 처리)"""
+        if fcntl is None:
+            yield
+            return
+        if self._lock_file is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._lock_file = self._lock_path.open("a+")
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    def _open_matrix(self, capacity: int):
+        """capacity 행을 담을 수 있는 memmap을 열고, 파일이 작으면 확장"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        size = capacity * self.dim * 4
+        mode = "r+" if self._vectors_path.exists() else "w+"
+        if mode == "r+" and self._vectors_path.stat().st_size < size:
+            with self._vectors_path.open("r+b") as f:
+                f.truncate(size)
+        if self._matrix is not None:
+            self._matrix.flush()
+        self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode=mode, shape=(capacity, self.dim))
+        if len(self._ids) < capacity:
+            self._ids = np.concatenate([self._ids, np.full(capacity - len(self._ids), -1, dtype=np.int64)])
+
+    def _apply(self, record: dict):
+        if record["op"] == "add":
+            row, restaurant_id = record["row"], record["id"]
+            if row >= len(self._ids):
+                self._ids = np.concatenate([self._ids, np.full(max(row + 1, len(self._ids)), -1, dtype=np.int64)])
+            self._ids[row] = restaurant_id
+            self._rows[restaurant_id] = row
+            self._metadata[restaurant_id] = (record.get("categories") or "", record.get("address") or "")
+            self._count = max(self._count, row + 1)
+        elif record["op"] == "del" and record["id"] in self._rows:
+            self._ids[self._rows.pop(record["id"])] = -1
+            self._metadata.pop(record["id"], None)
+
+    def _sync(self):
+        """다른 프로세스가 로그에 추가한 기록을 반영 (파일 잠금을 잡은 상태에서 호출)"""
+        if self._log_path.exists():
+            stat = self._log_path.stat()
+            if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+                # 다른 프로세스가 압축하여 로그 파일이 교체됨 -> 처음부터 다시 읽음
+                self._reset()
+                self._log_inode = stat.st_ino
+            if stat.st_size > self._log_offset:
+                with self._log_path.open("rb") as f:
+                    f.seek(self._log_offset)
+                    data = f.read(stat.st_size - self._log_offset)
+                # 완전히 기록된 줄까지만 반영
+                end = data.rfind(b"\n") + 1
+                for line in data[:end].splitlines():
+                    if line.strip():
+                        self._apply(json.loads(line))
+                self._log_offset += end
+        elif self._log_inode is not None:
+            self._reset()
+        stored_rows = self._vectors_path.stat().st_size // (self.dim * 4) if self._vectors_path.exists() else 0
+        capacity = max(self.initial_capacity, stored_rows, self._count)
+        if self._matrix is None or self._matrix.shape[0] < capacity:
+            self._open_matrix(capacity)
+        elif len(self._ids) < self._matrix.shape[0]:
+            self._ids = np.concatenate([self._ids, np.full(self._matrix.shape[0] - len(self._ids), -1, dtype=np.int64)])
+
+    def _append_log(self, record: dict):
+        with self._log_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # 직접 기록한 줄은 다시 반영하지 않도록 오프셋을 파일 끝으로 이동 (배타 잠금 안에서만 호출)
+        stat = self._log_path.stat()
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+
+    # ---------- 변경 ----------
+
+    def add(self, restaurant_id: int, vector: List[float], categories: Optional[str] = None, address: Optional[str] = None):
+        """벡터를 추가하거나, 이미 있는 음식점이면 같은 행을 덮어씀"""
+        vector = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if vector.shape != (self.dim,) or not norm:
+            raise ValueError(f"{self.dim}차원의 0이 아닌 벡터가 필요합니다.")
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync()
+            row = self._rows.get(restaurant_id)
+            if row is None:
+                row = self._count
+                if row >= self._matrix.shape[0]:
+                    self._open_matrix(max(self.initial_capacity, row * 2))
+                self._count += 1
+            self._matrix[row] = vector / norm
+            self._ids[row] = restaurant_id
+            self._rows[restaurant_id] = row
+            self._metadata[restaurant_id] = (categories or "", address or "")
+            self._append_log({"op": "add", "id": restaurant_id, "row": row, "categories": categories, "address": address})
+
+    def remove(self, restaurant_id: int):
+        """음식점 벡터를 삭제 (행은 비워두고, 삭제된 행이 많아지면 압축)"""
+        with self._lock, self._file_lock(exclusive=True):
+            self._sync()
+            row = self._rows.pop(restaurant_id, None)
+            if row is None:
+                return
+            self._ids[row] = -1
+            self._matrix[row] = 0
+            self._metadata.pop(restaurant_id, None)
+            self._append_log({"op": "del", "id": restaurant_id})
+            if self._count and (self._count - len(self._rows)) / self._count > COMPACT_RATIO:
+                self._compact()
+
+    def _compact(self):
+        """살아있는 행만 앞으로 모아 벡터 파일과 로그를 다시 씀 (배타 잠금을 잡은 상태에서 호출)"""
+        live_rows = np.flatnonzero(self._ids[:self._count] >= 0)
+        vectors = np.array(self._matrix[live_rows])
+        ids = self._ids[live_rows].copy()
+        self._ids[:] = -1
+        self._ids[:len(ids)] = ids
+        self._matrix[:len(ids)] = vectors
+        self._matrix[len(ids):self._count] = 0
+        self._matrix.flush()
+        self._count = len(ids)
+        self._rows = {int(restaurant_id): row for row, restaurant_id in enumerate(ids)}
+
+        tmp_path = self._log_path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for row, restaurant_id in enumerate(ids):
+                categories, address = self._metadata.get(int(restaurant_id), ("", ""))
+                f.write(json.dumps({"op": "add", "id": int(restaurant_id), "row": row, "categories": categories, "address": address}, ensure_ascii=False) + "\n")
+        # 다른 프로세스는 로그 파일의 inode가 바뀐 것을 보고 처음부터 다시 읽음
+        os.replace(tmp_path, self._log_path)
+        stat = self._log_path.stat()
+        self._log_inode, self._log_offset = stat.st_ino, stat.st_size
+
+    def flush(self):
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix.flush()
+
+    # ---------- 검색 ----------
+
+    def search(
+        self,
+        query_vector: List[float],
+        k: int = 10,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """코사인 유사도가 가장 높은 음식점 k개를 (음식점 id, 유사도) 목록으로 반환"""
+        query = np.asarray(query_vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+            if not self._rows or not norm:
+                return []
+            count = self._count
+            ids = self._ids[:count]
+            # 정규화된 행렬과 한 번의 행렬-벡터 곱으로 전체 유사도 계산
+            scores = np.asarray(self._matrix[:count] @ (query / norm))
+            valid = ids >= 0
+            if category or location:
+                valid &= np.array([
+                    restaurant_id >= 0
+                    and (not category or category in self._metadata[restaurant_id][0])
+                    and (not location or location in self._metadata[restaurant_id][1])
+                    for restaurant_id in ids.tolist()
+                ], dtype=bool)
+            candidates = np.flatnonzero(valid)
+            if not len(candidates):
+                return []
+            k = min(k, len(candidates))
+            # 전체 정렬 대신 argpartition으로 상위 k개만 고른 뒤 그 안에서 정렬
+            top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            top = top[np.argsort(-scores[top])]
+            return [(int(ids[row]), float(scores[row])) for row in top]
+
+    def __len__(self):
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+            return len(self._rows)
+
+    def __contains__(self, restaurant_id: int):
+        with self._lock, self._file_lock(exclusive=False):
+            self._sync()
+            return restaurant_id in self._rows
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# backend 디렉터리에서 `python -m pytest`로 실행하지 않아도 app 패키지를 찾을 수 있도록 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
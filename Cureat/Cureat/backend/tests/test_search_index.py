@@ -0,0 +1,148 @@
+import pytest
+from sqlalchemy import create_engine
+
+from app import search_index
+from app.search_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture(autouse=True)
+def whitespace_tokenizer(monkeypatch):
+    """형태소 분석기(konlpy) 대신 한글만 남겨 공백으로 나누는 전처리 사용"""
+    monkeypatch.setattr(search_index, "_preprocess_text", lambda text: search_index._NON_HANGUL.sub(" ", text))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "db.sqlite3"
+
+
+def make_index(db_path):
+    index = BM25Index(create_engine(f"sqlite:///{db_path}"))
+    index.ensure()
+    return index
+
+
+@pytest.fixture
+def index(db_path):
+    return make_index(db_path)
+
+
+def ids(results):
+    return [doc_id for doc_id, _ in results]
+
+
+def test_tokenize_keeps_hangul_and_latin_tokens():
+    assert tokenize("") == []
+    assert tokenize("Cafe 온도 2호점!") == ["온도", "호점", "cafe", "2"]
+
+
+def test_search_only_returns_documents_containing_query_terms(index):
+    index.add_restaurant(1, "을지로 냉면")
+    index.add_restaurant(2, "강남 파스타")
+    index.add_restaurant(3, "을지로 노가리")
+    assert ids(index.search("냉면")) == [1]
+    assert ids(index.search("을지로 냉면"))[0] == 1
+    assert set(ids(index.search("을지로 냉면"))) == {1, 3}
+    assert index.search("초밥") == []
+    assert index.search("") == []
+    assert index.search("!!!") == []
+
+
+def test_scores_are_positive_and_sorted(index):
+    index.add_restaurant(1, "냉면", "한식 냉면 전문")
+    index.add_restaurant(2, "분식", "한식 냉면")
+    index.add_restaurant(3, "파스타")
+    results = index.search("냉면")
+    assert ids(results) == [1, 2]
+    assert results[0][1] > results[1][1] > 0
+
+
+def test_name_is_weighted_higher_than_info(index):
+    index.add_restaurant(1, "냉면집", "한식")
+    index.add_restaurant(2, "한식당", "냉면집")
+    index.add_restaurant(3, "파스타")
+    assert ids(index.search("냉면집")) == [1, 2]
+
+
+def test_shorter_documents_rank_higher_for_same_frequency(index):
+    index.add_restaurant(1, "가게", "냉면")
+    index.add_restaurant(2, "가게", "냉면 육수 면발 고명 식초 겨자")
+    index.add_restaurant(3, "파스타")
+    assert ids(index.search("냉면")) == [1, 2]
+
+
+def test_reviews_accumulate_and_survive_restaurant_update(index):
+    index.add_restaurant(1, "을지로 냉면")
+    index.add_review(1, "육수가 시원해요")
+    index.add_review(1, "면발이 쫄깃")
+    index.add_review(2, "리뷰만 있는 가게")
+    index.add_review(1, "")
+    assert ids(index.search("육수가")) == [1]
+    assert ids(index.search("쫄깃")) == [1]
+    assert ids(index.search("리뷰만")) == [2]
+    # 음식점 정보를 교체해도 리뷰 토큰은 유지
+    index.add_restaurant(1, "종로 평양면옥")
+    assert ids(index.search("을지로")) == []
+    assert ids(index.search("평양면옥")) == [1]
+    assert ids(index.search("육수가")) == [1]
+    assert len(index) == 2
+
+
+def test_search_returns_top_k(index):
+    for doc_id in range(1, 21):
+        index.add_restaurant(doc_id, "가게", " ".join(["냉면"] * doc_id + ["기타"] * 5))
+    assert ids(index.search("냉면", k=3)) == [20, 19, 18]
+    assert index.search("냉면", k=0) == []
+
+
+def test_query_terms_are_not_parsed_as_fts_syntax(index):
+    index.add_restaurant(1, "and or not near")
+    assert ids(index.search('"and" OR near*')) == [1]
+
+
+def test_remove_clear_and_rebuild(index):
+    index.add_restaurant(1, "냉면")
+    index.add_restaurant(2, "냉면 파스타")
+    index.remove(1)
+    index.remove(99)
+    assert len(index) == 1
+    assert ids(index.search("냉면")) == [2]
+    index.clear()
+    assert len(index) == 0
+
+    count = index.rebuild(
+        [(1, "을지로 냉면", "한식"), (2, "강남 파스타", None)],
+        [(1, "육수가 시원해요"), (1, "면발 쫄깃"), (3, "리뷰만 있는 가게"), (2, "")],
+    )
+    assert count == 3
+    assert ids(index.search("쫄깃")) == [1]
+    assert ids(index.search("리뷰만")) == [3]
+    # 다시 구성해도 리뷰가 중복으로 쌓이지 않음
+    index.rebuild([(1, "을지로 냉면", "한식")], [(1, "육수가 시원해요")])
+    assert len(index) == 1
+    assert ids(index.search("쫄깃")) == []
+
+
+def test_index_is_shared_between_processes(db_path):
+    # 워커 프로세스마다 엔진(연결)이 따로 있어도 같은 DB 파일의 인덱스를 사용
+    writer, reader = make_index(db_path), make_index(db_path)
+    writer.add_restaurant(1, "을지로 냉면")
+    assert ids(reader.search("냉면")) == [1]
+    reader.add_review(1, "육수가 시원해요")
+    assert ids(writer.search("육수가")) == [1]
+
+
+def test_reciprocal_rank_fusion():
+    keyword = [(1, 12.0), (2, 8.0), (3, 1.0)]
+    vector = [(3, 0.9), (1, 0.8)]
+    fused = reciprocal_rank_fusion([keyword, vector], k=60)
+    assert ids(fused) == [1, 3, 2]
+    assert dict(fused)[1] == pytest.approx(1 / 61 + 1 / 62)
+    assert dict(fused)[2] == pytest.approx(1 / 62)
+    assert reciprocal_rank_fusion([]) == []
+
+
+def test_reciprocal_rank_fusion_ignores_raw_scores():
+    # 점수 척도가 달라도 순위만으로 결합
+    fused = reciprocal_rank_fusion([[(1, 1000.0), (2, 999.0)], [(2, 0.2), (1, 0.1)]])
+    assert dict(fused)[1] == pytest.approx(dict(fused)[2])
@@ -0,0 +1,174 @@
+import json
+import os
+import re
+import threading
+import time
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# 키워드는 pyahocorasick(C 구현 Aho-Corasick 오토마톤, requirements.txt)으로 매칭하고,
+# 패키지를 설치할 수 없는 환경에서는 키워드를 하나의 정규식 alternation으로 컴파일해 C 정규식 엔진에서 한 번에 매칭
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# 기본 광고 키워드 / 정규식 (AD_FILTER_CONFIG 파일로 교체 가능)
+DEFAULT_AD_KEYWORDS = ["소정의 원고료", "제공받아", "체험단", "광고 포함"]
+DEFAULT_AD_PATTERNS = [
+    r"원고료\s*를?\s*(지원|제공)",
+    r"#\s*(광고|협찬)",
+    r"업체\s*로부터.{0,20}(지원|제공)",
+]
+
+# 설정 파일 경로와 변경 확인 주기 (초)
+# 설정 파일 형식: {"keywords": ["체험단", ...], "patterns": ["#\\s*광고", ...]}
+AD_FILTER_CONFIG = os.getenv("AD_FILTER_CONFIG")
+AD_FILTER_RELOAD_INTERVAL = float(os.getenv("AD_FILTER_RELOAD_INTERVAL", "5"))
+
+
+class EmbeddingAdClassifier:
+    """광고/일반 리뷰 예시 임베딩의 중심 벡터와 비교해 광고 확률을 추정하는 2차 분류기"""
+
+    def __init__(self, ad_examples: Sequence[str], normal_examples: Sequence[str], temperature: float = 0.05):
+        self.ad_examples = list(ad_examples)
+        self.normal_examples = list(normal_examples)
+        self.temperature = temperature
+        self._centroids: Optional[np.ndarray] = None
+
+    @staticmethod
+    def _embed(texts: List[str]) -> np.ndarray:
+        from . import nlpService
+        vectors = np.asarray(nlpService.texts_to_vectors(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _get_centroids(self) -> np.ndarray:
+        if self._centroids is None:
+            # 예시 전체를 한 번의 배치로 임베딩
+            vectors = self._embed(self.ad_examples + self.normal_examples)
+            ad_centroid = vectors[:len(self.ad_examples)].mean(axis=0)
+            normal_centroid = vectors[len(self.ad_examples):].mean(axis=0)
+            centroids = np.stack([ad_centroid, normal_centroid])
+            self._centroids = centroids / np.linalg.norm(centroids, axis=1, keepdims=True)
+        return self._centroids
+
+    def predict_proba(self, reviews: List[str]) -> np.ndarray:
+        """리뷰 목록 전체를 한 번에 임베딩하여 광고 확률 배열을 반환"""
+        if not reviews:
+            return np.zeros(0, dtype=np.float32)
+        similarities = self._embed(reviews) @ self._get_centroids().T
+        # 두 중심과의 유사도 차이를 softmax로 확률화
+        margin = (similarities[:, 0] - similarities[:, 1]) / self.temperature
+        return 1 / (1 + np.exp(-margin))
+
+
+class AdFilter:
+    """광고성 리뷰 판별 엔진
+
+    1단계: 키워드 멀티 패턴 매칭 + 정규식 (설정 파일 변경 시 자동 재컴파일)
+    2단계(선택): 1단계를 통과한 리뷰만 모아 임베딩 분류기로 한 번에 판별
+    """
+
+    def __init__(
+        self,
+        keywords: Sequence[str] = DEFAULT_AD_KEYWORDS,
+        patterns: Sequence[str] = DEFAULT_AD_PATTERNS,
+        config_path: Optional[str] = AD_FILTER_CONFIG,
+        classifier: Optional[EmbeddingAdClassifier] = None,
+    ):
+        self.config_path = config_path
+        self.classifier = classifier
+        self._lock = threading.Lock()
+        self._config_mtime: Optional[float] = None
+        self._last_reload_check = 0.0
+        self._compile(keywords, patterns)
+        self.maybe_reload(force=True)
+
+    def _compile(self, keywords: Sequence[str], patterns: Sequence[str]):
+        """키워드 오토마톤과 정규식을 컴파일하여 교체"""
+        keywords = [keyword for keyword in dict.fromkeys(keywords) if keyword]
+        automaton = None
+        regex_parts = []
+        if ahocorasick is not None and keywords:
+            automaton = ahocorasick.Automaton()
+            for keyword in keywords:
+                automaton.add_word(keyword, keyword)
+            automaton.make_automaton()
+        else:
+            # 긴 키워드부터 배치해 겹치는 키워드에서도 가장 긴 매칭을 우선
+            regex_parts += [re.escape(keyword) for keyword in sorted(keywords, key=len, reverse=True)]
+        # 키워드와 정규식을 하나의 패턴으로 합쳐 리뷰당 한 번만 검색
+        regex_parts += [f"(?:{pattern})" for pattern in patterns]
+        regex = re.compile("|".join(regex_parts)) if regex_parts else None
+        with self._lock:
+            self.keywords = keywords
+            self.patterns = list(patterns)
+            self._automaton = automaton
+            self._regex = regex
+
+    def maybe_reload(self, force: bool = False) -> bool:
+        """설정 파일이 바뀌었으면 다시 읽어 재컴파일 (최대 AD_FILTER_RELOAD_INTERVAL 초마다 확인)"""
+        if not self.config_path:
+            return False
+        now = time.time()
+        if not force and now - self._last_reload_check < AD_FILTER_RELOAD_INTERVAL:
+            return False
+        self._last_reload_check = now
+        try:
+            mtime = os.path.getmtime(self.config_path)
+            if not force and mtime == self._config_mtime:
+                return False
+            with open(self.config_path, encoding="utf-8") as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"광고 필터 설정 파일 로딩 오류: {self.config_path}, {e}")
+            return False
+        self._compile(config.get("keywords", DEFAULT_AD_KEYWORDS), config.get("patterns", DEFAULT_AD_PATTERNS))
+        self._config_mtime = mtime
+        return True
+
+    def is_rule_match(self, review: str) -> bool:
+        """키워드 또는 정규식에 걸리는 광고 리뷰인지 확인"""
+        if self._automaton is not None and next(self._automaton.iter(review), None) is not None:
+            return True
+        return bool(self._regex and self._regex.search(review))
+
+    def score_batch(self, reviews: Sequence[str]) -> List[float]:
+        """리뷰 목록의 광고 점수(0~1)를 한 번에 계산 (규칙 매칭은 1.0)"""
+        self.maybe_reload()
+        scores = [1.0 if self.is_rule_match(review) else 0.0 for review in reviews]
+        if self.classifier is not None:
+            remaining = [index for index, score in enumerate(scores) if score < 1.0]
+            if remaining:
+                probabilities = self.classifier.predict_proba([reviews[index] for index in remaining])
+                for index, probability in zip(remaining, probabilities):
+                    scores[index] = float(probability)
+        return scores
+
+    def filter_reviews(self, reviews: Sequence[str], threshold: float = 0.5) -> List[str]:
+        """광고 점수가 threshold 미만인 리뷰만 반환"""
+        return [review for review, score in zip(reviews, self.score_batch(reviews)) if score < threshold]
+
+
+def _create_classifier() -> Optional[EmbeddingAdClassifier]:
+    """AD_FILTER_CLASSIFIER=1 일 때 기본 예시로 임베딩 분류기를 생성"""
+    if os.getenv("AD_FILTER_CLASSIFIER", "0") != "1":
+        return None
+    return EmbeddingAdClassifier(
+        ad_examples=[
+            "업체로부터 식사를 무료로 지원받아 솔직하게 작성한 후기입니다",
+            "이벤트에 당첨되어 방문했어요 사장님이 서비스도 주셨어요",
+            "블로그 협찬으로 다녀왔습니다 자세한 메뉴는 아래 링크 참고",
+        ],
+        normal_examples=[
+            "음식이 맛있고 직원분들이 친절해서 또 가고 싶어요",
+            "웨이팅이 길었지만 고기가 부드러워서 만족스러웠어요",
+            "가격에 비해 양이 적어서 조금 아쉬웠어요",
+        ],
+    )
+
+
+# 애플리케이션 전체에서 공유하는 광고 필터 인스턴스
+ad_filter = AdFilter(classifier=_create_classifier())
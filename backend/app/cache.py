@@ -0,0 +1,168 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 캐시에 값이 없음을 나타내는 표식 (None은 "찾지 못함" 결과를 캐싱할 때 사용)
+MISSING = object()
+
+
+class MemoryCache:
+    """프로세스 내부 LRU + TTL 캐시"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._data[key]
+                return MISSING
+            # 최근 사용한 항목을 뒤로 보내 LRU 순서 유지
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float):
+        with self._lock:
+            self._data[key] = (time.time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache:
+    """여러 프로세스/재시작 사이에서 공유되는 디스크 기반 TTL 캐시 (값은 JSON으로 저장)"""
+
+    def __init__(self, path: str, max_size: int = 100000):
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed_at ON cache (accessed_at)")
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return MISSING
+            if row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return MISSING
+            self._conn.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), now + ttl, now),
+            )
+            # 최대 크기를 넘으면 만료된 항목과 가장 오래 사용되지 않은 항목부터 삭제
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_size:
+                self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (now,))
+                self._conn.execute(
+                    "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (max(0, count - self.max_size),),
+                )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+
+class ResponseCache:
+    """백엔드(메모리/SQLite)를 감싸 TTL, 네거티브 캐싱, 히트/미스 카운터를 제공하는 캐시"""
+
+    def __init__(self, backend, ttl: float, negative_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+
+    def get(self, key: str) -> Any:
+        """캐시된 값을 반환하며, 없으면 MISSING을 반환"""
+        value = self.backend.get(key)
+        if value is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+            if value is None:
+                self.negative_hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        """값을 저장하며, None("찾지 못함")은 더 짧은 negative_ttl 동안만 보관"""
+        self.backend.set(key, value, self.negative_ttl if value is None else self.ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__,
+            "size": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+
+def create_cache(prefix: str, default_ttl: float, default_negative_ttl: float) -> ResponseCache:
+    """환경 변수 설정으로 캐시를 생성
+
+    <PREFIX>_BACKEND : memory(기본값) 또는 sqlite
+    <PREFIX>_PATH : sqlite 백엔드 파일 경로
+    <PREFIX>_MAX_SIZE : 최대 항목 수
+    <PREFIX>_TTL, <PREFIX>_NEGATIVE_TTL : 일반/네거티브 캐시 유지 시간 (초)
+    """
+    backend_name = os.getenv(f"{prefix}_BACKEND", "memory").lower()
+    max_size: Optional[str] = os.getenv(f"{prefix}_MAX_SIZE")
+    if backend_name == "sqlite":
+        backend = SQLiteCache(
+            os.getenv(f"{prefix}_PATH", f"./{prefix.lower()}.sqlite3"),
+            max_size=int(max_size or 100000),
+        )
+    else:
+        backend = MemoryCache(max_size=int(max_size or 10000))
+    return ResponseCache(
+        backend,
+        ttl=float(os.getenv(f"{prefix}_TTL", default_ttl)),
+        negative_ttl=float(os.getenv(f"{prefix}_NEGATIVE_TTL", default_negative_ttl)),
+    )
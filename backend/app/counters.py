@@ -0,0 +1,218 @@
+"""음식점 비정규화 집계 (평점 합계/리뷰 수, 행동 카운터)
+
+- 평점 집계: 리뷰를 추가하는 트랜잭션 안에서 rating_sum/rating_count를 함께 갱신
+- 행동 카운터(좋아요/북마크 등): 요청마다 UPDATE ... SET col = col + :delta 로 원자적으로 갱신
+- 조회수: 요청마다 UPDATE 하지 않고 메모리에 모아 두었다가 주기적으로 한 번에 반영
+- 정합성 맞추기: reconcile_rating_aggregates()가 reviews 테이블에서 평점 집계를 다시 계산해 어긋난 행만 고침
+  (전체 테이블을 훑는 작업이므로 API 워커마다 실행하지 않고 별도 프로세스 하나에서만 실행)
+
+실행 예:
+    cd backend
+    python -m app.counters reconcile         # 한 번 실행
+    python -m app.counters reconcile --loop  # COUNTER_RECONCILE_INTERVAL초마다 반복 (cron 대신 상주 프로세스로 실행할 때)
+"""
+import argparse
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import bindparam, case, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal, engine
+
+# 카운터 설정
+# COUNTER_FLUSH_INTERVAL : 메모리에 모은 조회수를 DB에 반영하는 주기 (초)
+# COUNTER_RECONCILE_INTERVAL : reconcile --loop에서 평점 집계를 reviews 테이블과 맞추는 주기 (초)
+COUNTER_FLUSH_INTERVAL = float(os.getenv("COUNTER_FLUSH_INTERVAL", "5"))
+COUNTER_RECONCILE_INTERVAL = float(os.getenv("COUNTER_RECONCILE_INTERVAL", "3600"))
+
+# API로 증감할 수 있는 행동 -> 카운터 컬럼
+ACTION_COUNTERS = {
+    "like": "like_count",
+    "dislike": "dislike_count",
+    "bookmark": "bookmark_count",
+    "comment": "comment_count",
+    "share": "share_count",
+    "favorite": "is_favorite_count",
+}
+
+
+def _counts_review(review: models.Review) -> bool:
+    # 광고 리뷰는 평점 집계에서 제외
+    return review.restaurant_id is not None and not review.is_ad
+
+
+def add_review_rating(db: Session, review: models.Review, sign: int = 1):
+    """리뷰 추가(sign=1)/삭제(sign=-1)를 평점 집계에 반영 (커밋하지 않으므로 리뷰와 같은 트랜잭션에서 호출)"""
+    if not _counts_review(review):
+        return
+    db.execute(
+        update(models.Restaurant)
+        .where(models.Restaurant.id == review.restaurant_id)
+        .values(
+            rating_sum=models.Restaurant.rating_sum + sign * int(review.rating),
+            rating_count=models.Restaurant.rating_count + sign,
+        )
+    )
+
+
+def increment(db: Session, restaurant_id: int, column: str, delta: int = 1) -> Optional[int]:
+    """카운터 컬럼을 원자적으로 증감하고 갱신된 값을 반환 (음식점이 없으면 None, 0 미만으로 내려가지 않음)"""
+    counter = getattr(models.Restaurant, column)
+    value = db.execute(
+        update(models.Restaurant)
+        .where(models.Restaurant.id == restaurant_id)
+        .values({column: case((counter + delta < 0, 0), else_=counter + delta)})
+        .returning(counter)
+    ).scalar()
+    db.commit()
+    return value
+
+
+def rating_average(restaurant: models.Restaurant) -> Optional[float]:
+    if not restaurant.rating_count:
+        return None
+    return round(restaurant.rating_sum / restaurant.rating_count, 2)
+
+
+class CounterBuffer:
+    """자주 증가하는 카운터(조회수 등)를 메모리에 모아 두었다가 주기적으로 한 번의 executemany UPDATE로 반영
+
+    프로세스가 비정상 종료되면 반영하지 못한 증가분은 사라집니다 (조회수처럼 근사값이어도 되는 카운터에만 사용).
+    """
+
+    def __init__(self, column: str, flush_interval: float = COUNTER_FLUSH_INTERVAL):
+        self.column = column
+        self.flush_interval = flush_interval
+        counter = models.Restaurant.__table__.c[column]
+        self._statement = (
+            update(models.Restaurant.__table__)
+            .where(models.Restaurant.__table__.c.id == bindparam("restaurant_id"))
+            .values({column: counter + bindparam("delta")})
+        )
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pending: Dict[int, int] = {}
+        self.flushed = 0
+
+    def add(self, restaurant_id: int, delta: int = 1):
+        with self._lock:
+            self._pending[restaurant_id] = self._pending.get(restaurant_id, 0) + delta
+
+    def pending(self, restaurant_id: int) -> int:
+        """아직 DB에 반영되지 않은 증가분 (응답에 더해 보여줄 때 사용)"""
+        with self._lock:
+            return self._pending.get(restaurant_id, 0)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            # 음식점 id 순서로 갱신하여 다른 워커와의 교착 상태를 방지
+            rows = [{"restaurant_id": restaurant_id, "delta": delta} for restaurant_id, delta in sorted(pending.items())]
+            try:
+                with engine.begin() as connection:
+                    connection.execute(self._statement, rows)
+                self.flushed += sum(pending.values())
+            except Exception as e:
+                # 반영하지 못한 증가분은 다음 주기에 다시 시도
+                with self._lock:
+                    for restaurant_id, delta in pending.items():
+                        self._pending[restaurant_id] = self._pending.get(restaurant_id, 0) + delta
+                print(f"{self.column} 카운터 반영 오류, 다음 주기에 재시도: {e}")
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"counter-{self.column}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """스레드를 멈추고 남은 증가분을 반영 (애플리케이션 종료 시 호출)"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = sum(self._pending.values())
+        return {"pending": pending, "flushed": self.flushed}
+
+
+def reconcile_rating_aggregates(db: Session) -> int:
+    """reviews 테이블에서 평점 합계/리뷰 수를 다시 계산하여 어긋난 음식점만 고치고, 고친 행 수를 반환"""
+    counted = (models.Review.restaurant_id == models.Restaurant.id) & models.Review.is_ad.isnot(True)
+    rating_sum = select(func.coalesce(func.sum(models.Review.rating), 0)).where(counted).scalar_subquery()
+    rating_count = select(func.count(models.Review.id)).where(counted).scalar_subquery()
+    result = db.execute(
+        update(models.Restaurant)
+        .where(or_(models.Restaurant.rating_sum != rating_sum, models.Restaurant.rating_count != rating_count))
+        .values(rating_sum=rating_sum, rating_count=rating_count)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+class Reconciler:
+    """reconcile_rating_aggregates를 실행하고 고친 행 수를 누적 (CLI 전용)"""
+
+    def __init__(self, interval: float = COUNTER_RECONCILE_INTERVAL):
+        self.interval = interval
+        self.fixed = 0
+
+    def run_once(self) -> int:
+        db = SessionLocal()
+        try:
+            fixed = reconcile_rating_aggregates(db)
+        finally:
+            db.close()
+        if fixed:
+            print(f"평점 집계 {fixed}개 음식점 수정")
+        self.fixed += fixed
+        return fixed
+
+    def run_forever(self):
+        while True:
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"평점 집계 정합성 확인 오류: {e}")
+            time.sleep(self.interval)
+
+
+# 애플리케이션 전체에서 공유하는 조회수 버퍼
+view_counter = CounterBuffer("view_count")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    reconcile_parser = commands.add_parser("reconcile", help="reviews 테이블에서 평점 집계를 다시 계산")
+    reconcile_parser.add_argument("--loop", action="store_true", help="COUNTER_RECONCILE_INTERVAL초마다 반복 실행")
+    args = parser.parse_args(argv)
+
+    if args.command == "reconcile":
+        reconciler = Reconciler()
+        if args.loop:
+            reconciler.run_forever()
+        else:
+            print(f"{reconciler.run_once()}개 음식점의 평점 집계를 수정했습니다")
+
+
+if __name__ == "__main__":
+    main()
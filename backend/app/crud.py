@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
-from backend import db
-from . import models, schemas
+from sqlalchemy import Float, and_, cast, func, or_, text
+from typing import List, Optional, Tuple
+from . import counters, models, preference, schemas
 from passlib.context import CryptContext
-from datetime import datetime
+from datetime import datetime, timezone
 
 # 비밀번호 해싱 설정
 # bcrypt 해싱 알고리즘 사용
@@ -21,7 +22,7 @@ def get_user_by_email(db: Session, email: str):
 
 def get_user_by_id(db: Session, user_id: int):
     """ID로 사용자를 조회합니다."""
-    return db.query(models.User).filter(models.User.id == user_id).first()
+    return db.query(models.User).filter(models.User.user_id == user_id).first()
 
 def create_user(db: Session, user: schemas.UserCreate):
     # 이메일로 사용자 조회
@@ -49,13 +50,26 @@ def create_user(db: Session, user: schemas.UserCreate):
     db.refresh(db_user) # 새로 생성된 사용자 정보 갱신
     return db_user # 생성된 사용자 반환
 
+def update_user_interests(db: Session, user_id: int, interests: Optional[str]):
+    """사용자 관심사를 수정합니다. (사용자 컨텍스트 캐시는 ORM 이벤트로 무효화됨)"""
+    db_user = get_user_by_id(db, user_id)
+    if db_user:
+        db_user.interests = interests
+        db.commit()
+        db.refresh(db_user)
+    return db_user
+
 # 리뷰 & 검색로그 CRUD 함수
 def create_review(db: Session, review: schemas.ReviewCreate):
     """새로운 리뷰를 생성합니다."""
     db_review = models.Review(**review.dict())
     db.add(db_review)
+    # 음식점 평점 집계를 리뷰와 같은 트랜잭션에서 갱신
+    counters.add_review_rating(db, db_review)
     db.commit()
     db.refresh(db_review)
+    # 높은 평점 리뷰는 작성자의 선호 벡터에 반영
+    preference.record_review(db, db_review)
     return db_review
 
 def create_search_log(db: Session, user_id: int, query: str):
@@ -64,4 +78,179 @@ def create_search_log(db: Session, user_id: int, query: str):
     db.add(db_log)
     db.commit()
     db.refresh(db_log)
-    return db_log
\ No newline at end of file
+    return db_log
+
+# 음식점 관련 CRUD 함수
+def get_restaurant_by_id(db: Session, restaurant_id: int):
+    """ID로 음식점을 조회합니다."""
+    return db.query(models.Restaurant).filter(models.Restaurant.id == restaurant_id).first()
+
+def get_restaurant_by_name(db: Session, name: str):
+    """이름이 정확히 일치하는 음식점을 조회합니다."""
+    return db.query(models.Restaurant).filter(models.Restaurant.name == name).order_by(models.Restaurant.id).first()
+
+def get_recent_review_texts(db: Session, restaurant_id: int, limit: int = 50) -> List[str]:
+    """음식점의 최근 리뷰 본문 (광고 리뷰 제외)"""
+    rows = (
+        db.query(models.Review.content)
+        .filter(models.Review.restaurant_id == restaurant_id, models.Review.is_ad.isnot(True))
+        .order_by(models.Review.created_at.desc(), models.Review.id.desc())
+        .limit(limit)
+        .all()
+    )
+    return [content for content, in rows]
+
+def get_restaurant_ids_needing_summary(db: Session, min_new_reviews: int, limit: int = 100) -> List[int]:
+    """요약이 없거나, 마지막 요약 이후 새 리뷰가 min_new_reviews개 이상 쌓인 음식점 id (오래된 요약부터)"""
+    rows = (
+        db.query(models.Restaurant.id)
+        .filter(or_(
+            models.Restaurant.summary_updated_at.is_(None),
+            models.Restaurant.rating_count - models.Restaurant.summary_review_count >= min_new_reviews,
+        ))
+        .order_by(models.Restaurant.summary_updated_at.asc().nullsfirst(), models.Restaurant.id)
+        .limit(limit)
+        .all()
+    )
+    return [restaurant_id for restaurant_id, in rows]
+
+def update_restaurant_summary(
+    db: Session,
+    restaurant_id: int,
+    summary_info: Optional[dict],
+    vector: Optional[List[float]],
+    source_hash: Optional[str],
+    review_count: int,
+):
+    """리뷰 요약 결과와 벡터를 저장하고 워터마크(요약 시점 리뷰 수)를 갱신합니다."""
+    restaurant = get_restaurant_by_id(db, restaurant_id)
+    if restaurant is None:
+        return None
+    summary_info = summary_info or {}
+    # 요약 필드 -> 컬럼 (값이 있는 필드만 덮어씀)
+    for field, column in (
+        ("summary_pros", "summary_pros"),
+        ("summary_cons", "summary_cons"),
+        ("keywords", "summary_keywords"),
+        ("signature_menu", "summary_feature_menu"),
+        ("summary_price", "summary_price"),
+    ):
+        if summary_info.get(field):
+            setattr(restaurant, column, summary_info[field])
+    if vector is not None:
+        restaurant.vector = vector
+    restaurant.summary_source_hash = source_hash
+    restaurant.summary_review_count = review_count
+    restaurant.summary_updated_at = datetime.now(timezone.utc)
+    db.commit()
+    return restaurant
+
+# 평균 평점 순 음식점 목록
+def get_top_rated_restaurants(db: Session, limit: int = 20, min_reviews: int = 3):
+    """평균 평점 순 음식점 목록 (비정규화된 rating_sum/rating_count 컬럼만 사용, 동점이면 리뷰 수가 많은 순)"""
+    average = models.Restaurant.rating_sum * 1.0 / models.Restaurant.rating_count
+    return (
+        db.query(models.Restaurant)
+        .filter(models.Restaurant.rating_count >= max(min_reviews, 1))
+        .order_by(average.desc(), models.Restaurant.rating_count.desc(), models.Restaurant.id)
+        .limit(limit)
+        .all()
+    )
+
+# 음식점 이름 검색 (인덱스 사용 + 키셋 페이지네이션)
+def _encode_cursor(score: float, restaurant_id: int) -> str:
+    return f"{score!r}:{restaurant_id}"
+
+def _decode_cursor(cursor: str) -> Tuple[float, int]:
+    """'점수:id' 형식의 커서를 해석 (형식이 잘못되면 ValueError)"""
+    score, restaurant_id = cursor.rsplit(":", 1)
+    return float(score), int(restaurant_id)
+
+def search_restaurants_by_name(
+    db: Session,
+    name: str,
+    mode: str = "trigram",
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Tuple[List[models.Restaurant], Optional[str]]:
+    """이름으로 음식점을 검색하여 (관련도 순 음식점 목록, 다음 페이지 커서)를 반환합니다.
+
+    mode : trigram(pg_trgm GIN 인덱스로 부분 일치 + 유사도 순) 또는 fts(search_vector 전문 검색 + ts_rank 순)
+    cursor : 이전 페이지의 마지막 (점수, id) 이후부터 조회 (OFFSET 없이 인덱스 순서로 이어서 읽음)
+    """
+    if mode == "trigram":
+        escaped = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        score = func.similarity(models.Restaurant.name, name)
+        # ILIKE 부분 일치와 % 유사도 조건 모두 같은 트라이그램 GIN 인덱스를 사용 (BitmapOr)
+        condition = or_(
+            models.Restaurant.name.ilike(f"%{escaped}%", escape="\\"),
+            models.Restaurant.name.op("%")(name),
+        )
+    elif mode == "fts":
+        tsquery = func.plainto_tsquery("simple", name)
+        score = func.ts_rank(models.Restaurant.search_vector, tsquery)
+        condition = models.Restaurant.search_vector.op("@@")(tsquery)
+    else:
+        raise ValueError(f"지원하지 않는 검색 모드입니다: {mode}")
+    # similarity/ts_rank는 real(float4)을 반환하므로 double precision으로 변환해 조회/정렬/커서 비교에 같은 값을 사용
+    # (float4 그대로면 커서에 담긴 float8 값과 비교할 때 동점 행이 어긋나 같은 페이지가 반복됨)
+    score = cast(score, Float(53))
+
+    query = db.query(models.Restaurant, score.label("score")).filter(condition)
+    if cursor:
+        last_score, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(score < last_score, and_(score == last_score, models.Restaurant.id > last_id)))
+    # 다음 페이지가 있는지 확인하기 위해 한 건 더 조회
+    rows = query.order_by(score.desc(), models.Restaurant.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last_restaurant, last_score = rows[-1]
+        next_cursor = _encode_cursor(last_score, last_restaurant.id)
+    return [restaurant for restaurant, _ in rows], next_cursor
+
+# 음식점 벡터 검색 함수
+def search_restaurants_by_vector(
+    db: Session,
+    query_vector: List[float],
+    k: int = 10,
+    metric: str = "cosine",
+    ef_search: Optional[int] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    iterative_scan: Optional[str] = None,
+) -> List[Tuple[models.Restaurant, float]]:
+    """쿼리 벡터와 가장 가까운 음식점 k개를 (음식점, 유사도) 목록으로 반환합니다.
+
+    metric : cosine(코사인 거리 <=>) 또는 inner_product(음의 내적 <#>)
+    ef_search : HNSW 탐색 후보 수 (클수록 정확하지만 느림, 기본값은 서버 설정 hnsw.ef_search)
+    category, location : 카테고리/주소 조건으로 먼저 거르는 필터
+    iterative_scan : 필터로 결과가 부족할 때 인덱스를 더 탐색하는 모드 (pgvector 0.8+, relaxed_order 등)
+    """
+    if metric == "cosine":
+        distance = models.Restaurant.vector.cosine_distance(query_vector)
+    elif metric == "inner_product":
+        distance = models.Restaurant.vector.max_inner_product(query_vector)
+    else:
+        raise ValueError(f"지원하지 않는 거리 함수입니다: {metric}")
+
+    # SET LOCAL은 현재 트랜잭션에만 적용되며, SET 문은 바인드 파라미터를 쓸 수 없으므로 정수로 검증 후 삽입
+    if ef_search:
+        db.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+    if iterative_scan:
+        if iterative_scan not in ("off", "strict_order", "relaxed_order"):
+            raise ValueError(f"지원하지 않는 iterative_scan 모드입니다: {iterative_scan}")
+        db.execute(text(f"SET LOCAL hnsw.iterative_scan = {iterative_scan}"))
+
+    query = db.query(models.Restaurant, distance.label("distance")).filter(models.Restaurant.vector.isnot(None))
+    if category:
+        query = query.filter(models.Restaurant.summary_category.ilike(f"%{category}%"))
+    if location:
+        query = query.filter(models.Restaurant.summary_address.ilike(f"%{location}%"))
+    rows = query.order_by(distance).limit(k).all()
+
+    # 거리를 "클수록 가까운" 유사도로 변환 (<#>는 음의 내적을 반환)
+    if metric == "cosine":
+        return [(restaurant, 1 - distance_value) for restaurant, distance_value in rows]
+    return [(restaurant, -distance_value) for restaurant, distance_value in rows]
@@ -0,0 +1,95 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from . import nlpService
+
+# 배치 설정 (환경 변수로 조정 가능)
+# EMBEDDING_BATCH_SIZE : 한 번의 encode() 호출에 모을 최대 텍스트 수
+# EMBEDDING_MAX_WAIT_MS : 첫 요청 이후 다른 요청을 기다리는 최대 시간 (밀리초)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "10"))
+
+
+class EmbeddingService:
+    """동시에 들어온 텍스트들을 짧은 시간 동안 모아 한 번에 벡터화하는 마이크로 배칭 서비스"""
+
+    def __init__(self, batch_size: int = EMBEDDING_BATCH_SIZE, max_wait_ms: float = EMBEDDING_MAX_WAIT_MS):
+        self.batch_size = max(1, batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # 모델 추론은 CPU 바운드 작업이므로 이벤트 루프가 아닌 전용 스레드 하나에서 실행
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding")
+
+    def _ensure_worker(self):
+        """배치 워커가 없으면 현재 이벤트 루프에서 시작"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def embed(self, text: str) -> List[float]:
+        """텍스트 하나를 배치 큐에 넣고 벡터 결과를 기다림"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트를 큐에 넣고 입력 순서대로 벡터 목록을 반환"""
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def _collect_batch(self) -> List[Tuple[str, asyncio.Future]]:
+        """첫 요청이 도착한 뒤 max_wait 동안 batch_size까지 요청을 모음"""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        # 기다리는 동안 취소된 요청은 인코딩하지 않음
+        return [(text, future) for text, future in batch if not future.done()]
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            if not batch:
+                continue
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await loop.run_in_executor(self._executor, nlpService.texts_to_vectors, texts)
+            except Exception as e:
+                print(f"임베딩 배치 처리 중 오류 발생: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    async def close(self):
+        """배치 워커를 중지하고 대기 중인 요청을 취소"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._queue is not None:
+            while not self._queue.empty():
+                _, future = self._queue.get_nowait()
+                if not future.done():
+                    future.cancel()
+
+
+# 애플리케이션 전체에서 공유하는 임베딩 서비스 인스턴스
+embedding_service = EmbeddingService()
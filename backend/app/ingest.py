@@ -0,0 +1,274 @@
+"""맛집/리뷰 대량 적재 CLI
+
+CSV 또는 JSONL 파일을 스트리밍으로 읽어 청크 단위 트랜잭션으로 적재합니다.
+- 맛집: 이름과 요약 정보를 큰 배치로 임베딩하여 vector 컬럼까지 채움
+- 리뷰: 광고 필터로 is_ad를 판정 (--drop-ads 지정 시 광고 리뷰는 적재하지 않음)
+- PostgreSQL은 COPY, SQLite는 executemany로 기록
+- 체크포인트(ingest_checkpoints 테이블, 입력 파일별)를 청크와 같은 트랜잭션에서 갱신하므로 중단 후 같은 명령으로 이어서 실행해도 중복 적재되지 않음
+- 리뷰는 청크마다 음식점 평점 집계(rating_sum/rating_count)도 같은 트랜잭션에서 갱신
+- 평점이 1~5 숫자가 아니거나 필수 컬럼이 없는 행은 건너뛰고 개수를 출력
+
+실행 예:
+    cd backend
+    python -m app.ingest --restaurants data/restaurants.jsonl --reviews data/reviews.csv
+
+맛집 파일 컬럼: name (필수), summary_* 컬럼, image_url
+리뷰 파일 컬럼: content, rating (필수), restaurant_id 또는 restaurant_name, user_id
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import bindparam, insert, inspect, select, update
+
+from . import models
+from .ad_filter import ad_filter
+from .database import engine
+
+# 맛집 파일에서 읽어들일 컬럼
+RESTAURANT_COLUMNS = [
+    "name", "summary_place", "summary_address", "summary_category", "summary_description",
+    "summary_feature_menu", "summary_phone", "summary_parking", "summary_price",
+    "summary_opening_hours", "image_url",
+]
+# 임베딩 텍스트를 만들 때 사용할 컬럼
+EMBEDDING_TEXT_COLUMNS = ["name", "summary_category", "summary_description", "summary_feature_menu"]
+REVIEW_COLUMNS = ["user_id", "restaurant_id", "content", "rating", "is_ad"]
+
+
+def iter_rows(path: str, skip: int = 0) -> Iterator[Dict[str, Any]]:
+    """CSV/JSONL 파일을 한 행씩 읽으며, 앞의 skip 행은 건너뜀 (체크포인트 재개용)"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            rows = csv.DictReader(f)
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for index, row in enumerate(rows):
+            if index >= skip:
+                yield row
+
+
+def iter_chunks(rows: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Checkpoint:
+    """입력 파일별로 커밋된 행 수를 ingest_checkpoints 테이블에 저장하는 체크포인트
+
+    (kind, 입력 파일 절대 경로)마다 행이 하나씩 있으므로 여러 파일을 번갈아 적재해도 각 파일의 진행 상황이 유지됩니다.
+    save()는 청크를 기록한 연결로 호출하여 청크와 체크포인트가 함께 커밋되거나 함께 롤백되도록 합니다.
+    """
+
+    def __init__(self):
+        self.table = models.IngestCheckpoint.__table__
+        self.table.create(engine, checkfirst=True)
+        self._migrate_primary_key()
+
+    def _migrate_primary_key(self):
+        """kind만 기본 키였던 이전 테이블을 (kind, source) 기본 키로 다시 만들고 기존 체크포인트를 옮김"""
+        if inspect(engine).get_pk_constraint(self.table.name)["constrained_columns"] != ["kind"]:
+            return
+        print("ingest_checkpoints 기본 키를 (kind, source)로 변경합니다")
+        with engine.begin() as connection:
+            rows = [dict(row._mapping) for row in connection.execute(select(self.table))]
+            self.table.drop(connection)
+            self.table.create(connection)
+            if rows:
+                connection.execute(insert(self.table), rows)
+
+    def _where(self, kind: str, source: str):
+        return (self.table.c.kind == kind) & (self.table.c.source == os.path.abspath(source))
+
+    def rows_done(self, kind: str, source: str) -> int:
+        with engine.connect() as connection:
+            rows = connection.execute(select(self.table.c.rows).where(self._where(kind, source))).scalar()
+        return rows or 0
+
+    def save(self, connection, kind: str, source: str, rows: int):
+        result = connection.execute(update(self.table).where(self._where(kind, source)).values(rows=rows))
+        if not result.rowcount:
+            connection.execute(insert(self.table).values(kind=kind, source=os.path.abspath(source), rows=rows))
+
+
+class Progress:
+    """처리 속도(rows/sec) 출력"""
+
+    def __init__(self, kind: str, already_done: int):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.rows = 0
+        self.already_done = already_done
+
+        self.skipped = 0
+
+    def add(self, rows: int, skipped: int = 0):
+        self.rows += rows
+        self.skipped += skipped
+        elapsed = time.perf_counter() - self.started
+        skipped_text = f", {self.skipped:,} skipped" if self.skipped else ""
+        print(f"[{self.kind}] {self.already_done + self.rows:,} rows ({self.rows / elapsed:,.0f} rows/sec{skipped_text})")
+
+
+def _vector_literal(vector: Optional[List[float]]) -> Optional[str]:
+    """pgvector 텍스트 형식 ('[0.1,0.2,...]')으로 변환"""
+    if vector is None:
+        return None
+    return "[" + ",".join(f"{value:.6g}" for value in vector) + "]"
+
+
+def parse_rating(value: Any) -> Optional[int]:
+    """'4', ' 4 ', '4.5', 4.0 같은 평점 값을 1~5 정수로 변환 (반올림, 범위 밖이거나 숫자가 아니면 None)"""
+    try:
+        rating = int(float(str(value).strip()) + 0.5)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return rating if 1 <= rating <= 5 else None
+
+
+def add_rating_aggregates(connection, rows: List[Dict[str, Any]]):
+    """적재한 리뷰의 평점을 음식점 평점 집계에 반영 (광고 리뷰 제외, counters.add_review_rating과 같은 기준)"""
+    totals: Dict[int, List[int]] = {}
+    for row in rows:
+        if row["is_ad"]:
+            continue
+        total = totals.setdefault(row["restaurant_id"], [0, 0])
+        total[0] += row["rating"]
+        total[1] += 1
+    if not totals:
+        return
+    table = models.Restaurant.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("restaurant_id"))
+        .values(rating_sum=table.c.rating_sum + bindparam("rating_delta"), rating_count=table.c.rating_count + bindparam("count_delta"))
+    )
+    # 음식점 id 순서로 갱신하여 API의 리뷰 작성과 교착 상태가 생기지 않도록 함
+    connection.execute(statement, [
+        {"restaurant_id": restaurant_id, "rating_delta": rating_sum, "count_delta": count}
+        for restaurant_id, (rating_sum, count) in sorted(totals.items())
+    ])
+
+
+def write_rows(connection, table, columns: List[str], rows: List[Dict[str, Any]]):
+    """현재 트랜잭션에 행들을 기록 (PostgreSQL은 COPY, 그 외는 executemany)"""
+    if connection.dialect.name == "postgresql":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # COPY csv 형식에서 따옴표 없는 빈 값은 NULL로 처리됨
+            writer.writerow(["" if row.get(column) is None else row[column] for column in columns])
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        cursor.copy_expert(f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    else:
+        connection.execute(insert(table), [{column: row.get(column) for column in columns} for row in rows])
+
+
+def ingest_restaurants(path: str, checkpoint: Checkpoint, chunk_size: int, embed_batch_size: int, embed: bool = True):
+    from . import nlpService
+
+    skip = checkpoint.rows_done("restaurants", path)
+    progress = Progress("restaurants", skip)
+    done = skip
+    is_postgres = engine.dialect.name == "postgresql"
+    columns = RESTAURANT_COLUMNS + (["vector"] if embed else [])
+
+    for chunk in iter_chunks(iter_rows(path, skip), chunk_size):
+        rows = [{column: row.get(column) or None for column in RESTAURANT_COLUMNS} for row in chunk]
+        rows = [row for row in rows if row["name"]]
+        if embed and rows:
+            texts = [" ".join(row[column] for column in EMBEDDING_TEXT_COLUMNS if row[column]) for row in rows]
+            vectors: List[List[float]] = []
+            for start in range(0, len(texts), embed_batch_size):
+                vectors.extend(nlpService.texts_to_vectors(texts[start:start + embed_batch_size]))
+            for row, vector in zip(rows, vectors):
+                row["vector"] = _vector_literal(vector) if is_postgres else vector
+
+        # 청크와 체크포인트를 하나의 트랜잭션으로 기록
+        done += len(chunk)
+        with engine.begin() as connection:
+            if rows:
+                write_rows(connection, models.Restaurant.__table__, columns, rows)
+            checkpoint.save(connection, "restaurants", path, done)
+        progress.add(len(chunk), len(chunk) - len(rows))
+
+
+def ingest_reviews(path: str, checkpoint: Checkpoint, chunk_size: int, drop_ads: bool = False):
+    skip = checkpoint.rows_done("reviews", path)
+    progress = Progress("reviews", skip)
+    done = skip
+
+    # 맛집 이름 -> id 매핑 (restaurant_id 대신 restaurant_name이 주어진 리뷰용)
+    with engine.connect() as connection:
+        restaurant_ids = dict(connection.execute(select(models.Restaurant.name, models.Restaurant.id)).all())
+
+    for chunk in iter_chunks(iter_rows(path, skip), chunk_size):
+        # 청크 전체의 광고 점수를 한 번에 계산
+        ad_scores = ad_filter.score_batch([row.get("content") or "" for row in chunk])
+        rows = []
+        skipped = 0
+        for row, ad_score in zip(chunk, ad_scores):
+            restaurant_id = row.get("restaurant_id") or restaurant_ids.get(row.get("restaurant_name"))
+            rating = parse_rating(row.get("rating"))
+            try:
+                restaurant_id = int(restaurant_id) if restaurant_id else None
+                user_id = int(row["user_id"]) if row.get("user_id") else None
+            except (TypeError, ValueError):
+                restaurant_id = user_id = None
+            if not (restaurant_id and row.get("content") and rating):
+                skipped += 1
+                continue
+            is_ad = ad_score >= 0.5
+            if is_ad and drop_ads:
+                continue
+            rows.append({
+                "user_id": user_id,
+                "restaurant_id": restaurant_id,
+                "content": row["content"],
+                "rating": rating,
+                "is_ad": is_ad,
+            })
+
+        # 리뷰, 평점 집계, 체크포인트를 하나의 트랜잭션으로 기록
+        done += len(chunk)
+        with engine.begin() as connection:
+            if rows:
+                write_rows(connection, models.Review.__table__, REVIEW_COLUMNS, rows)
+                add_rating_aggregates(connection, rows)
+            checkpoint.save(connection, "reviews", path, done)
+        progress.add(len(chunk), skipped)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", help="맛집 CSV/JSONL 파일")
+    parser.add_argument("--reviews", help="리뷰 CSV/JSONL 파일")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="트랜잭션 하나에 기록할 행 수")
+    parser.add_argument("--embed-batch-size", type=int, default=256, help="encode() 한 번에 넘길 텍스트 수")
+    parser.add_argument("--no-embed", action="store_true", help="맛집 벡터를 생성하지 않음")
+    parser.add_argument("--drop-ads", action="store_true", help="광고로 판정된 리뷰는 적재하지 않음")
+    args = parser.parse_args(argv)
+
+    if not (args.restaurants or args.reviews):
+        parser.error("--restaurants 또는 --reviews 중 하나 이상을 지정해야 합니다.")
+
+    checkpoint = Checkpoint()
+    if args.restaurants:
+        ingest_restaurants(args.restaurants, checkpoint, args.chunk_size, args.embed_batch_size, embed=not args.no_embed)
+    if args.reviews:
+        ingest_reviews(args.reviews, checkpoint, args.chunk_size, drop_ads=args.drop_ads)
+
+
+if __name__ == "__main__":
+    main()
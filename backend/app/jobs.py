@@ -0,0 +1,453 @@
+"""백그라운드 작업 큐와 워커 프로세스
+
+크롤링/요약/임베딩처럼 오래 걸리는 작업을 API 요청에서 분리하여 jobs 테이블에 넣고, 별도 워커 프로세스가 실행합니다.
+- 가져오기: UPDATE ... WHERE id = (SELECT ... FOR UPDATE SKIP LOCKED LIMIT 1) RETURNING 한 문장으로
+  여러 워커가 같은 작업을 가져가지 않음 (PostgreSQL 전용)
+- 우선순위: priority가 큰 작업부터, 같으면 먼저 들어온 작업부터 실행
+- 중복 방지: 같은 key(예: summary:<음식점 id>)의 대기/실행 중 작업은 하나만 존재 (부분 유니크 인덱스)
+- 재시도: 실패하면 JOB_BACKOFF_BASE * 2^(시도-1)초(최대 JOB_BACKOFF_MAX, 지터 포함) 뒤에 다시 실행, max_attempts회 실패하면 failed
+- 워커는 실행 중인 작업의 locked_at을 JOB_HEARTBEAT_INTERVAL초마다 갱신하고,
+  워커가 죽어 JOB_LOCK_TIMEOUT초 넘게 갱신되지 않은 작업은 다시 대기 상태로 돌림
+- 완료/실패 기록은 작업을 가져간 워커(locked_by)일 때만 반영 (잠금을 잃은 워커가 새 담당 워커의 결과를 덮어쓰지 않음)
+
+실행 예:
+    cd backend
+    python -m app.jobs worker                                   # 모든 종류의 작업 실행
+    python -m app.jobs worker --kinds summarize_restaurant      # 요약 작업만 실행
+    python -m app.jobs enqueue embed_restaurant '{"restaurant_id": 42}' --key embed:42
+    python -m app.jobs stats
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import random
+import signal
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .database import SessionLocal
+
+# 작업 큐 설정
+# JOB_POLL_INTERVAL : 대기 작업이 없을 때 다시 확인하는 주기 (초)
+# JOB_CONCURRENCY : 워커 프로세스 하나가 동시에 실행하는 작업 수
+# JOB_BACKOFF_BASE / JOB_BACKOFF_MAX : 재시도 대기 시간의 기준값과 최댓값 (초)
+# JOB_LOCK_TIMEOUT : locked_at이 이 시간(초) 동안 갱신되지 않은 실행 중 작업은 워커가 죽은 것으로 보고 다시 대기 상태로 돌림
+# JOB_HEARTBEAT_INTERVAL : 실행 중인 작업의 locked_at을 갱신하는 주기 (초, JOB_LOCK_TIMEOUT보다 충분히 짧게)
+# JOB_MAX_ATTEMPTS : 작업별 기본 최대 시도 횟수
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+JOB_CONCURRENCY = int(os.getenv("JOB_CONCURRENCY", "4"))
+JOB_BACKOFF_BASE = float(os.getenv("JOB_BACKOFF_BASE", "10"))
+JOB_BACKOFF_MAX = float(os.getenv("JOB_BACKOFF_MAX", "3600"))
+JOB_LOCK_TIMEOUT = float(os.getenv("JOB_LOCK_TIMEOUT", "900"))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "60"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "5"))
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+# 작업 종류 -> 핸들러 (payload dict를 받아 결과(JSON으로 저장 가능한 값)를 반환, 동기/비동기 함수 모두 가능)
+HANDLERS: Dict[str, Callable[[dict], Any]] = {}
+
+
+def handler(kind: str):
+    """작업 핸들러 등록 데코레이터"""
+    def register(target):
+        HANDLERS[kind] = target
+        return target
+    return register
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _active_job_by_key(db: Session, key: str) -> Optional[models.Job]:
+    return db.execute(
+        select(models.Job).where(models.Job.key == key, models.Job.status.in_(("queued", "running")))
+    ).scalar()
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict] = None,
+    key: Optional[str] = None,
+    priority: int = 0,
+    max_attempts: int = JOB_MAX_ATTEMPTS,
+    delay: float = 0,
+) -> models.Job:
+    """작업을 큐에 넣고 반환 (같은 key의 대기/실행 중 작업이 있으면 새로 만들지 않고 그 작업을 반환)"""
+    if key is not None:
+        existing = _active_job_by_key(db, key)
+        if existing is not None:
+            # 더 급한 요청이 들어오면 대기 중인 작업의 우선순위만 올림
+            if existing.status == "queued" and priority > existing.priority:
+                existing.priority = priority
+                db.commit()
+            return existing
+    job = models.Job(
+        kind=kind,
+        key=key,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=max_attempts,
+        run_after=_now() + timedelta(seconds=delay),
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # 다른 요청이 같은 key의 작업을 먼저 넣은 경우
+        db.rollback()
+        existing = _active_job_by_key(db, key)
+        if existing is None:
+            raise
+        return existing
+    db.refresh(job)
+    return job
+
+
+def claim(db: Session, worker_id: str, kinds: Optional[Sequence[str]] = None) -> Optional[models.Job]:
+    """실행할 작업 하나를 running 상태로 바꾸어 가져옴 (없으면 None)"""
+    now = _now()
+    candidate = (
+        select(models.Job.id)
+        .where(models.Job.status == "queued", models.Job.run_after <= now)
+        .order_by(models.Job.priority.desc(), models.Job.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    if kinds:
+        candidate = candidate.where(models.Job.kind.in_(list(kinds)))
+    job = db.execute(
+        update(models.Job)
+        .where(models.Job.id == candidate.scalar_subquery(), models.Job.status == "queued")
+        .values(status="running", locked_by=worker_id, locked_at=now, attempts=models.Job.attempts + 1)
+        .returning(models.Job)
+        # 같은 세션에 이미 로드된 작업 객체도 RETURNING 값(running, locked_by)으로 갱신
+        .execution_options(synchronize_session=False, populate_existing=True)
+    ).scalar()
+    if job is not None:
+        # 커밋 후에도 세션 밖에서 값을 읽을 수 있도록 분리
+        db.expunge(job)
+    db.commit()
+    return job
+
+
+def _owned(job: models.Job):
+    """작업을 가져간 워커가 아직 잠금을 갖고 있는 경우의 조건"""
+    return (models.Job.id == job.id) & (models.Job.status == "running") & (models.Job.locked_by == job.locked_by)
+
+
+def complete(db: Session, job: models.Job, result: Any = None) -> bool:
+    """성공을 기록 (잠금을 잃어 다른 워커가 다시 가져간 작업이면 반영하지 않고 False)"""
+    updated = db.execute(
+        update(models.Job)
+        .where(_owned(job))
+        .values(status="succeeded", result=result, last_error=None, locked_by=None, locked_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """재시도 대기 시간 (지수 백오프, 여러 작업이 동시에 재시도하지 않도록 50~100% 지터)"""
+    delay = min(JOB_BACKOFF_MAX, JOB_BACKOFF_BASE * 2 ** max(0, attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def fail(db: Session, job: models.Job, error: str) -> Optional[str]:
+    """실패를 기록하고 다시 대기 상태(queued) 또는 최종 실패(failed)로 바꾼 뒤 그 상태를 반환 (잠금을 잃었으면 None)"""
+    if job.attempts >= job.max_attempts:
+        status, run_after = "failed", job.run_after
+    else:
+        status, run_after = "queued", _now() + timedelta(seconds=backoff_seconds(job.attempts))
+    updated = db.execute(
+        update(models.Job)
+        .where(_owned(job))
+        .values(status=status, run_after=run_after, last_error=error[:2000], locked_by=None, locked_at=None)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return status if updated else None
+
+
+def heartbeat(db: Session, worker_id: str, job_ids: Sequence[int]) -> List[int]:
+    """실행 중인 작업의 locked_at을 갱신하고, 아직 이 워커가 잠금을 갖고 있는 작업 id를 반환"""
+    if not job_ids:
+        return []
+    refreshed = db.execute(
+        update(models.Job)
+        .where(models.Job.id.in_(list(job_ids)), models.Job.status == "running", models.Job.locked_by == worker_id)
+        .values(locked_at=_now())
+        .returning(models.Job.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return list(refreshed)
+
+
+def recover_stale(db: Session, timeout: float = JOB_LOCK_TIMEOUT) -> int:
+    """워커가 죽어 locked_at이 오래 갱신되지 않은 running 작업을 대기 상태로 돌리고 (시도 횟수를 다 쓴 작업은 failed) 그 수를 반환"""
+    result = db.execute(
+        update(models.Job)
+        .where(models.Job.status == "running", models.Job.locked_at < _now() - timedelta(seconds=timeout))
+        .values(
+            status=case((models.Job.attempts >= models.Job.max_attempts, "failed"), else_="queued"),
+            last_error="워커 응답 없음 (잠금 시간 초과)",
+            locked_by=None,
+            locked_at=None,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return result.rowcount
+
+
+def get_job(db: Session, job_id: int) -> Optional[models.Job]:
+    return db.get(models.Job, job_id)
+
+
+def list_jobs(db: Session, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50) -> List[models.Job]:
+    query = select(models.Job)
+    if status:
+        query = query.where(models.Job.status == status)
+    if kind:
+        query = query.where(models.Job.kind == kind)
+    return list(db.execute(query.order_by(models.Job.id.desc()).limit(limit)).scalars())
+
+
+def job_stats(db: Session) -> Dict[str, Dict[str, int]]:
+    """작업 종류별, 상태별 작업 수"""
+    rows = db.execute(
+        select(models.Job.kind, models.Job.status, func.count(models.Job.id)).group_by(models.Job.kind, models.Job.status)
+    ).all()
+    stats: Dict[str, Dict[str, int]] = {}
+    for kind, status, count in rows:
+        stats.setdefault(kind, dict.fromkeys(JOB_STATUSES, 0))[status] = count
+    return stats
+
+
+def job_to_dict(job: models.Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "key": job.key,
+        "payload": job.payload,
+        "priority": job.priority,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after,
+        "last_error": job.last_error,
+        "result": job.result,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def _with_session(target, *args, **kwargs):
+    db = SessionLocal()
+    try:
+        return target(db, *args, **kwargs)
+    finally:
+        db.close()
+
+
+def enqueue_job(kind: str, payload: Optional[dict] = None, key: Optional[str] = None, priority: int = 0) -> int:
+    """새 세션으로 작업을 넣고 작업 id를 반환 (요청 처리 중 asyncio.to_thread로 호출)"""
+    return _with_session(lambda db: enqueue(db, kind, payload, key, priority).id)
+
+
+# 기본 작업 핸들러 (무거운 모듈은 워커에서 처음 실행할 때 불러옴)
+_summary_pipeline = None
+
+
+@handler("summarize_restaurant")
+async def summarize_restaurant(payload: dict):
+    """리뷰 크롤링 -> 요약 -> 벡터화 결과를 restaurants에 저장 (payload: restaurant_id, force)"""
+    global _summary_pipeline
+    if _summary_pipeline is None:
+        from .summary_pipeline import SummaryPipeline
+        # 워커 프로세스 안의 요약 작업이 하나의 Gemini 호출 제한을 공유
+        _summary_pipeline = SummaryPipeline()
+    status = await _summary_pipeline.refresh(int(payload["restaurant_id"]), force=bool(payload.get("force")))
+    if status == "failed":
+        raise RuntimeError("리뷰 요약 실패")
+    return {"status": status}
+
+
+def _embed_restaurant(db: Session, restaurant_id: int) -> bool:
+    from .ingest import EMBEDDING_TEXT_COLUMNS
+    from .nlpService import text_to_vector
+
+    restaurant = crud.get_restaurant_by_id(db, restaurant_id)
+    if restaurant is None:
+        return False
+    text = " ".join(getattr(restaurant, column) for column in EMBEDDING_TEXT_COLUMNS if getattr(restaurant, column))
+    restaurant.vector = text_to_vector(text)
+    db.commit()
+    return True
+
+
+@handler("embed_restaurant")
+def embed_restaurant(payload: dict):
+    """음식점 정보(이름/카테고리/설명/대표 메뉴)로 벡터를 다시 계산 (payload: restaurant_id)"""
+    if not _with_session(_embed_restaurant, int(payload["restaurant_id"])):
+        return {"status": "missing"}
+    return {"status": "updated"}
+
+
+class Worker:
+    """jobs 테이블에서 작업을 가져와 실행하는 워커 (프로세스 하나에 concurrency개 작업을 동시에 실행)"""
+
+    def __init__(
+        self,
+        kinds: Optional[Sequence[str]] = None,
+        worker_id: Optional[str] = None,
+        concurrency: int = JOB_CONCURRENCY,
+        poll_interval: float = JOB_POLL_INTERVAL,
+    ):
+        self.kinds = list(kinds) if kinds else None
+        # 컨테이너마다 PID가 같을 수 있으므로 임의 접미사를 붙여 워커를 구분
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self._stopping: Optional[asyncio.Event] = None
+        self._running: Dict[int, models.Job] = {}
+        self.stats: Dict[str, int] = {"succeeded": 0, "retried": 0, "failed": 0, "lost": 0}
+
+    def _lost(self, job: models.Job):
+        print(f"작업 잠금을 잃어 결과를 반영하지 않음: id={job.id}, kind={job.kind}, worker={self.worker_id}")
+        self.stats["lost"] += 1
+
+    async def run_job(self, job: models.Job):
+        job_handler = HANDLERS.get(job.kind)
+        self._running[job.id] = job
+        try:
+            if job_handler is None:
+                raise LookupError(f"등록되지 않은 작업 종류: {job.kind}")
+            if inspect.iscoroutinefunction(job_handler):
+                result = await job_handler(job.payload or {})
+            else:
+                # 동기 핸들러(CPU 연산, 블로킹 I/O)는 이벤트 루프 밖에서 실행
+                result = await asyncio.to_thread(job_handler, job.payload or {})
+        except Exception as e:
+            status = await asyncio.to_thread(_with_session, fail, job, f"{type(e).__name__}: {e}")
+            if status is None:
+                self._lost(job)
+                return
+            print(f"작업 실패 ({status}): id={job.id}, kind={job.kind}, attempts={job.attempts}, {e}")
+            self.stats["failed" if status == "failed" else "retried"] += 1
+            return
+        finally:
+            self._running.pop(job.id, None)
+        if await asyncio.to_thread(_with_session, complete, job, result):
+            self.stats["succeeded"] += 1
+        else:
+            self._lost(job)
+
+    async def _slot(self):
+        while not self._stopping.is_set():
+            try:
+                job = await asyncio.to_thread(_with_session, claim, self.worker_id, self.kinds)
+            except Exception as e:
+                print(f"작업 가져오기 오류: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_job(job)
+
+    async def _heartbeat(self):
+        # 종료 요청 뒤에도 실행 중인 작업이 끝날 때까지는 잠금을 계속 갱신
+        loop = asyncio.get_running_loop()
+        last_beat = loop.time()
+        while not (self._stopping.is_set() and not self._running):
+            await asyncio.sleep(min(1.0, JOB_HEARTBEAT_INTERVAL))
+            if loop.time() - last_beat < JOB_HEARTBEAT_INTERVAL:
+                continue
+            last_beat = loop.time()
+            job_ids = list(self._running)
+            if not job_ids:
+                continue
+            try:
+                refreshed = await asyncio.to_thread(_with_session, heartbeat, self.worker_id, job_ids)
+            except Exception as e:
+                print(f"작업 잠금 갱신 오류: {e}")
+                continue
+            for job_id in set(job_ids) - set(refreshed):
+                if job_id in self._running:
+                    print(f"작업 잠금이 다른 워커로 넘어감: id={job_id} (JOB_LOCK_TIMEOUT 확인 필요)")
+
+    async def _recover(self):
+        while not self._stopping.is_set():
+            try:
+                recovered = await asyncio.to_thread(_with_session, recover_stale)
+                if recovered:
+                    print(f"멈춘 작업 {recovered}개를 다시 대기 상태로 돌렸습니다")
+            except Exception as e:
+                print(f"멈춘 작업 확인 오류: {e}")
+            try:
+                await asyncio.wait_for(self._stopping.wait(), JOB_LOCK_TIMEOUT / 2)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def run(self):
+        """stop()이 호출되거나 SIGINT/SIGTERM을 받을 때까지 실행 (실행 중인 작업은 끝낸 뒤 종료)"""
+        self._stopping = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass
+        print(f"작업 워커 시작: {self.worker_id}, kinds={self.kinds or 'all'}, concurrency={self.concurrency}")
+        await asyncio.gather(self._recover(), self._heartbeat(), *(self._slot() for _ in range(self.concurrency)))
+        print(f"작업 워커 종료: {self.stats}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    worker_parser = commands.add_parser("worker", help="작업 워커 실행")
+    worker_parser.add_argument("--kinds", nargs="*", choices=sorted(HANDLERS), help="실행할 작업 종류 (생략하면 전부)")
+    worker_parser.add_argument("--concurrency", type=int, default=JOB_CONCURRENCY)
+    enqueue_parser = commands.add_parser("enqueue", help="작업 추가")
+    enqueue_parser.add_argument("kind", choices=sorted(HANDLERS))
+    enqueue_parser.add_argument("payload", nargs="?", default="{}", help="JSON 객체")
+    enqueue_parser.add_argument("--key")
+    enqueue_parser.add_argument("--priority", type=int, default=0)
+    commands.add_parser("stats", help="종류별/상태별 작업 수")
+    commands.add_parser("recover", help="멈춘 작업을 다시 대기 상태로 돌림")
+    args = parser.parse_args(argv)
+
+    if args.command == "worker":
+        asyncio.run(Worker(args.kinds, concurrency=args.concurrency).run())
+    elif args.command == "enqueue":
+        job_id = enqueue_job(args.kind, json.loads(args.payload), args.key, args.priority)
+        print(f"작업 {job_id} 추가")
+    elif args.command == "stats":
+        print(json.dumps(_with_session(job_stats), ensure_ascii=False, indent=2))
+    elif args.command == "recover":
+        print(f"{_with_session(recover_stale)}개 작업을 다시 대기 상태로 돌렸습니다")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,24 @@
 import os
-import requests
+import asyncio
+import json
 import google.generativeai as genai
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from typing import List, Optional
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Query, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from . import schemas, counters, crud, jobs, preference, service
+from .database import async_engine, get_async_db, get_db, pool_metrics
+from .embedding_service import embedding_service
+from .model_registry import model_registry
+from . import nlpService  # 모델 로더를 model_registry에 등록
+from .service.naverMapService import naver_client
+from .service.gemini_service import gemini_cache
+from .write_behind import log_search, search_log_buffer
+from .counters import view_counter
+from .user_context import user_context_cache
 
 # .env 파일에서 환경변수 로드
 
@@ -11,33 +27,270 @@ from fastapi import FastAPI
 genai.configure(api_key=os.getenv("GENAI_API_KEY"))
 
 app = FastAPI()
-# Naver API 설정
-NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
-NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
+
+# NLP 모델 사전 로드 (선택)
+# NLP_PRELOAD_MODELS="vector_model" 처럼 지정하고 gunicorn --preload로 실행하면
+# 마스터 프로세스에서 한 번만 로드되고 fork된 워커들이 메모리를 공유함
+# Okt는 JVM을 기동하므로 fork 이전에 로드하지 말고 워커에서 지연 로드할 것
+NLP_PRELOAD_MODELS = [name.strip() for name in os.getenv("NLP_PRELOAD_MODELS", "").split(",") if name.strip()]
+if NLP_PRELOAD_MODELS:
+    model_registry.preload(NLP_PRELOAD_MODELS)
 
 # 사용할 Gemini 모델 객체 생성
 # gemini_model = genai.Model.get("gemini-1.5-flash")
 # 수정된 코드
 gemini_model = genai.GenerativeModel("gemini-1.5-flash")
 
+# 앱 시작 시 실행될 이벤트 핸들러
+@app.on_event("startup")
+def on_startup():
+    # 이전 실행에서 기록하지 못한 검색 기록을 DB에 기록하고 주기적 기록 스레드 시작
+    search_log_buffer.start()
+    # 조회수 주기적 반영 스레드 시작 (평점 집계 정합성 확인은 python -m app.counters reconcile로 별도 실행)
+    view_counter.start()
+
+# 앱 종료 시 실행될 이벤트 핸들러
+@app.on_event("shutdown")
+async def on_shutdown():
+    # 버퍼에 남은 검색 기록을 모두 기록
+    search_log_buffer.stop()
+    # 메모리에 모인 조회수를 모두 반영
+    view_counter.stop()
+    # 임베딩 배치 워커 정리
+    await embedding_service.close()
+    # 네이버 API 커넥션 풀 정리
+    await naver_client.aclose()
+    # 비동기 DB 커넥션 풀 정리
+    await async_engine.dispose()
+
+# 모델 로드 상태 및 메모리 지표 조회
+@app.get("/metrics/models")
+def get_model_metrics():
+    return model_registry.metrics()
+
+# Gemini 시맨틱 캐시 히트/미스 지표 조회
+@app.get("/metrics/gemini_cache")
+def get_gemini_cache_metrics():
+    return gemini_cache.stats()
+
+# DB 커넥션 풀 사용 현황 (checked_out, 대기 시간, 타임아웃 횟수) 조회
+@app.get("/metrics/db_pool")
+def get_db_pool_metrics():
+    return pool_metrics()
+
+# 검색 기록 쓰기 지연 버퍼 상태 조회
+@app.get("/metrics/write_behind")
+def get_write_behind_metrics():
+    return {"search_logs": search_log_buffer.stats()}
+
+# 조회수 버퍼 지표 조회
+@app.get("/metrics/counters")
+def get_counter_metrics():
+    return {"view_count": view_counter.stats()}
+
+# 작업 큐의 종류별/상태별 작업 수 조회
+@app.get("/metrics/jobs")
+def get_job_metrics(db: Session = Depends(get_db)):
+    return jobs.job_stats(db)
+
+# 사용자 컨텍스트 캐시 히트/미스 지표 조회
+@app.get("/metrics/user_context")
+def get_user_context_metrics():
+    return user_context_cache.stats()
+
+def record_search(background_tasks: BackgroundTasks, user_id: int, query: str):
+    """검색 기록을 남기고, 응답을 보낸 뒤 검색어를 사용자 선호 벡터에 반영"""
+    log_search(user_id, query)
+    background_tasks.add_task(preference.record_search, user_id, query)
+
 # 외부 API 호출 함수
 
-def verify_place_with_naver(place_name: str):
+async def verify_place_with_naver(place_name: str):
     """네이버 검색 API로 장소의 실존 여부와 정보 검증"""
-    # 이전 답변에서 제공한 네이버 검색 API 호출 코드
-    url = "https://openapi.naver.com/v1/search/local.json"
-    params = {"query": place_name, "display": 1}
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-    }
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        search_results = response.json().get("items", [])
-        return search_results[0] if search_results else None
-    except requests.exceptions.RequestException as e:
-        print(f"네이버 검색 API 호출 중 오류 발생: {e}")
-        return None
+    # 공유 커넥션 풀을 사용하는 naver_client로 호출 (타임아웃, 재시도 포함)
+    search_result = await naver_client.search_local(place_name)
+    search_results = (search_result or {}).get("items", [])
+    return search_results[0] if search_results else None
+
+
+# 사용자 관심사 수정 API
+@app.put("/users/{user_id}/interests")
+def update_user_interests(user_id: int, interests: schemas.UserUpdateInterests, db: Session = Depends(get_db)):
+    db_user = crud.update_user_interests(db, user_id, interests.interests)
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return {"user_id": db_user.user_id, "interests": db_user.interests}
+
+# 데이트 코스 추천 API
+@app.post("/course/", response_model=schemas.CourseResponse)
+async def create_course(request: schemas.CourseRequest, db: AsyncSession = Depends(get_async_db)):
+    context = await user_context_cache.get(db, request.user_id)
+    if not context:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await service.create_date_course(request, context)
+
+# 맛집 추천 API
+@app.post("/recommendation/", response_model=schemas.RecommendationResponse)
+async def get_recommendation(request: schemas.ChatRequest, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db)):
+    # 사용자 컨텍스트 조회 (캐시에 없을 때만 DB 조회)
+    context = await user_context_cache.get(db, request.user_id)
+    if not context:
+        raise HTTPException(status_code=404, detail="User not found")
+    record_search(background_tasks, context.user_id, request.prompt)
     
-    
\ No newline at end of file
+    # 추천 서비스 호출 (장소별 검증/요약은 동시에 실행)
+    return await service.get_recommendation_for_user(
+        context, request.prompt, db, category=request.category, location=request.location
+    )
+
+# 맛집 추천 스트리밍 API
+# format=ndjson(기본값): 한 줄에 하나의 JSON 청크 / format=sse: Server-Sent Events
+@app.post("/recommendation/stream")
+async def stream_recommendation(
+    request: schemas.ChatRequest, background_tasks: BackgroundTasks, format: str = "ndjson", db: AsyncSession = Depends(get_async_db)
+):
+    context = await user_context_cache.get(db, request.user_id)
+    if not context:
+        raise HTTPException(status_code=404, detail="User not found")
+    record_search(background_tasks, context.user_id, request.prompt)
+
+    async def chunks():
+        async for chunk in service.stream_recommendation_for_user(
+            context, request.prompt, category=request.category, location=request.location
+        ):
+            line = json.dumps(jsonable_encoder(chunk), ensure_ascii=False)
+            if format == "sse":
+                yield f"event: {chunk['type']}\ndata: {line}\n\n"
+            else:
+                yield line + "\n"
+
+    media_type = "text/event-stream" if format == "sse" else "application/x-ndjson"
+    # 프록시(nginx 등)가 응답을 버퍼링하지 않도록 설정
+    return StreamingResponse(
+        chunks(),
+        media_type=media_type,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks,
+    )
+
+# 의미 기반 음식점 검색 API (pgvector HNSW 인덱스)
+@app.get("/restaurants/similar", response_model=List[schemas.RestaurantDetail])
+async def search_similar_restaurants(
+    query: str,
+    background_tasks: BackgroundTasks,
+    k: int = Query(10, ge=1, le=100),
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    ef_search: Optional[int] = Query(None, ge=1, le=1000),
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # user_id가 주어지면 검색 기록을 남기고 사용자 관심사로 검색 결과를 개인화
+    context = None
+    if user_id is not None:
+        record_search(background_tasks, user_id, query)
+        context = await asyncio.to_thread(user_context_cache.get_sync, db, user_id)
+    return await service.search_similar_restaurants(
+        db, query, k=k, category=category, location=location, ef_search=ef_search, context=context
+    )
+
+# 개인화 음식점 추천 API (검색/리뷰 이력으로 갱신되는 사용자 선호 벡터로 pgvector 인덱스 검색, LLM 호출 없음)
+@app.get("/restaurants/recommendations/{user_id}", response_model=List[schemas.RestaurantDetail])
+async def recommend_restaurants(
+    user_id: int,
+    k: int = Query(10, ge=1, le=100),
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    context = await asyncio.to_thread(user_context_cache.get_sync, db, user_id)
+    if not context:
+        raise HTTPException(status_code=404, detail="User not found")
+    return await service.recommend_restaurants_for_user(db, context, k=k, category=category, location=location)
+
+# 음식점 이름 검색 API (pg_trgm / 전문 검색 인덱스, 관련도 순 키셋 페이지네이션)
+# 다음 페이지가 있으면 X-Next-Cursor 헤더의 값을 cursor로 전달
+@app.get("/restaurants/search", response_model=List[schemas.RestaurantDetail])
+def search_restaurants(
+    response: Response,
+    background_tasks: BackgroundTasks,
+    name: str,
+    mode: str = "trigram",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    # 첫 페이지 요청만 검색 기록으로 남김
+    if user_id is not None and not cursor:
+        record_search(background_tasks, user_id, name)
+    try:
+        restaurants, next_cursor = crud.search_restaurants_by_name(db, name, mode=mode, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [service.restaurant_to_detail(restaurant) for restaurant in restaurants]
+
+# 평균 평점 순 음식점 API (비정규화된 평점 집계 컬럼으로 정렬)
+@app.get("/restaurants/top", response_model=List[schemas.RestaurantDetail])
+def get_top_rated_restaurants(
+    limit: int = Query(20, ge=1, le=100),
+    min_reviews: int = Query(3, ge=1),
+    db: Session = Depends(get_db),
+):
+    return [service.restaurant_to_detail(restaurant) for restaurant in crud.get_top_rated_restaurants(db, limit, min_reviews)]
+
+# 음식점 상세 API (조회수는 메모리에 모았다가 주기적으로 반영)
+@app.get("/restaurants/{restaurant_id}", response_model=schemas.RestaurantDetail)
+def get_restaurant(restaurant_id: int, db: Session = Depends(get_db)):
+    restaurant = crud.get_restaurant_by_id(db, restaurant_id)
+    if restaurant is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    view_counter.add(restaurant_id)
+    return service.restaurant_to_detail(restaurant)
+
+# 음식점 행동 카운터 API (like, dislike, bookmark, comment, share, favorite / 취소는 delta=-1)
+@app.post("/restaurants/{restaurant_id}/actions/{action}")
+def record_restaurant_action(restaurant_id: int, action: str, delta: int = Query(1, ge=-1, le=1), db: Session = Depends(get_db)):
+    column = counters.ACTION_COUNTERS.get(action)
+    if column is None:
+        raise HTTPException(status_code=400, detail=f"Unknown action: {action}")
+    value = counters.increment(db, restaurant_id, column, delta)
+    if value is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    return {"restaurant_id": restaurant_id, column: value}
+
+# 음식점 리뷰 요약 요청 API (요청 안에서 요약하지 않고 작업 큐에 넣은 뒤 작업 id 반환, 진행 상황은 /jobs/{job_id}로 확인)
+@app.post("/restaurants/{restaurant_id}/summary", status_code=202)
+def request_restaurant_summary(
+    restaurant_id: int,
+    force: bool = False,
+    priority: int = Query(10, ge=0, le=100),
+    db: Session = Depends(get_db),
+):
+    if crud.get_restaurant_by_id(db, restaurant_id) is None:
+        raise HTTPException(status_code=404, detail="Restaurant not found")
+    job = jobs.enqueue(
+        db, "summarize_restaurant", {"restaurant_id": restaurant_id, "force": force}, f"summary:{restaurant_id}", priority
+    )
+    return jobs.job_to_dict(job)
+
+# 작업 목록/상태 조회 API
+@app.get("/jobs")
+def list_jobs(
+    status: Optional[str] = None,
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    if status is not None and status not in jobs.JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {status}")
+    return [jobs.job_to_dict(job) for job in jobs.list_jobs(db, status, kind, limit)]
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    job = jobs.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return jobs.job_to_dict(job)
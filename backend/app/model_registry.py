@@ -0,0 +1,118 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# 프로세스 메모리 측정용 (Linux /proc 기반, 없으면 getrusage 최대값으로 대체)
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 로딩에 실패한 모델을 다시 시도하기까지 기다리는 시간 (초), 일시적인 오류(메모리 부족, 다운로드 실패)가 영구히 남지 않도록 함
+MODEL_RETRY_INTERVAL = float(os.getenv("MODEL_RETRY_INTERVAL", "60"))
+
+
+def _current_rss_bytes() -> Optional[int]:
+    """현재 프로세스의 RSS(실제 메모리 사용량)를 바이트 단위로 반환"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        # ru_maxrss는 Linux에서 KB, macOS에서 바이트 단위
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return max_rss if os.uname().sysname == "Darwin" else max_rss * 1024
+    return None
+
+
+class ModelRegistry:
+    """무거운 모델을 처음 사용할 때 한 번만 로드하고 프로세스 안에서 공유하는 레지스트리
+
+    gunicorn --preload 처럼 마스터 프로세스에서 앱을 임포트하는 경우 preload()를 호출해두면
+    fork된 워커들이 로드된 모델 메모리를 copy-on-write로 공유합니다.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._metrics: Dict[str, Dict[str, Any]] = {}
+        self._failed_at: Dict[str, float] = {}
+        # 모델마다 잠금을 따로 두어 한 모델의 로딩(예: Okt JVM 시작)이 다른 모델의 로딩을 막지 않도록 함
+        self._locks: Dict[str, threading.Lock] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]):
+        """모델 이름과 로더 함수를 등록 (이 시점에는 로드하지 않음)"""
+        self._loaders[name] = loader
+        self._locks.setdefault(name, threading.Lock())
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Any:
+        """모델을 반환하며, 아직 로드되지 않았으면 최초 한 번만 로드
+
+        로딩에 실패하면 None을 반환하고, MODEL_RETRY_INTERVAL초가 지난 뒤 호출되면 다시 로드를 시도합니다.
+        """
+        if name in self._models:
+            return self._models[name]
+        lock = self._locks.get(name)
+        if lock is None:
+            raise KeyError(f"등록되지 않은 모델입니다: {name}")
+        with lock:
+            # 다른 스레드가 먼저 로드했는지 다시 확인
+            if name in self._models:
+                return self._models[name]
+            failed_at = self._failed_at.get(name)
+            if failed_at is not None and time.monotonic() - failed_at < MODEL_RETRY_INTERVAL:
+                return None
+
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            error = None
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                print(f"'{name}' 모델 로딩 중 오류 발생: {e}")
+                model, error = None, str(e)
+            load_time = time.perf_counter() - started
+            rss_after = _current_rss_bytes()
+
+            attempts = self._metrics.get(name, {}).get("attempts", 0) + 1
+            if model is None:
+                # 실패는 캐시하지 않고 시각만 기록하여 일정 시간 뒤 다시 시도
+                self._failed_at[name] = time.monotonic()
+            else:
+                self._models[name] = model
+                self._failed_at.pop(name, None)
+            self._metrics[name] = {
+                "loaded": model is not None,
+                "attempts": attempts,
+                "load_time_sec": round(load_time, 3),
+                "rss_delta_mb": round((rss_after - rss_before) / 2**20, 1) if rss_before and rss_after else None,
+                "pid": os.getpid(),
+                "error": error,
+            }
+            return model
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        """지정한 모델(기본값: 등록된 전체)을 미리 로드"""
+        for name in names if names is not None else list(self._loaders):
+            self.get(name)
+
+    def metrics(self) -> Dict[str, Any]:
+        """모델별 로드 시간/메모리 증가량과 현재 프로세스 RSS를 반환"""
+        rss = _current_rss_bytes()
+        return {
+            "pid": os.getpid(),
+            "process_rss_mb": round(rss / 2**20, 1) if rss else None,
+            "models": {
+                name: self._metrics.get(name, {"loaded": False})
+                for name in self._loaders
+            },
+        }
+
+
+# 애플리케이션 전체에서 공유하는 모델 레지스트리
+model_registry = ModelRegistry()
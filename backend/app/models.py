@@ -1,9 +1,12 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Date, Boolean, DateTime, Float, JSON
 from sqlalchemy.orm import relationship 
 from sqlalchemy.sql import func 
 from .database import Base 
 from pgvector.sqlalchemy import Vector # pgvector 임포트
 from sqlalchemy import Index # 인덱스 추가를 위한 임포트
+from sqlalchemy import Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from .nlpService import EMBEDDING_DIM # 임베딩 모델의 벡터 차원
 
 class User(Base): 
     __tablename__ = "users" 
@@ -21,9 +24,19 @@ class User(Base):
     allergies_detail = Column(String, nullable=True) 
     is_active = Column(Boolean, default=True) 
     is_verified = Column(Boolean, default=False) 
+    # 검색어/높은 평점 리뷰 음식점 벡터의 지수 감쇠 가중 평균 (음식점 벡터와 같은 공간, preference.py에서 갱신)
+    preference_vector = Column(Vector(EMBEDDING_DIM), nullable=True)
+    preference_weight = Column(Float, nullable=False, default=0.0, server_default="0")
+    preference_updated_at = Column(DateTime(timezone=True), nullable=True)
     search_logs = relationship("SearchLog", back_populates="user")
     reviews = relationship("Review", back_populates="user")
     
+# 전문 검색 문서: 한국어 형태소 사전이 없으므로 'simple' 설정으로 공백 단위 토큰화 (어간 추출/불용어 제거 없음)
+RESTAURANT_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(summary_category, '') || ' ' || "
+    "coalesce(summary_feature_menu, '') || ' ' || coalesce(summary_description, ''))"
+)
+
 class Restaurant(Base): 
     __tablename__ = "restaurants" 
     
@@ -39,8 +52,27 @@ class Restaurant(Base):
     summary_price = Column(String, nullable=True) 
     summary_opening_hours = Column(String, nullable=True) 
     image_url = Column(String, nullable=True) 
+    # 리뷰 AI 요약 (summary_pipeline.py에서 미리 계산)
+    summary_pros = Column(JSON, nullable=True) # 장점 목록
+    summary_cons = Column(JSON, nullable=True) # 단점 목록
+    summary_keywords = Column(JSON, nullable=True) # 키워드 목록
+    summary_source_hash = Column(String(64), nullable=True) # 요약에 사용한 리뷰 내용의 sha256 (같으면 다시 요약하지 않음)
+    summary_review_count = Column(Integer, nullable=False, default=0, server_default="0") # 요약 시점의 rating_count (워터마크)
+    summary_updated_at = Column(DateTime(timezone=True), nullable=True)
     
-    vector = Column(Vector(1536), nullable=True) # 벡터 임베딩 (1536차원)
+    vector = Column(Vector(EMBEDDING_DIM), nullable=True) # 벡터 임베딩 (ko-sroberta-multitask, 768차원)
+    search_vector = Column(TSVECTOR, Computed(RESTAURANT_SEARCH_DOCUMENT, persisted=True)) # 전문 검색용 tsvector (자동 계산)
+
+    # 비정규화 집계 (counters.py에서 원자적으로 갱신, 상세/랭킹은 reviews를 집계하지 않고 이 값을 읽음)
+    rating_sum = Column(Integer, nullable=False, default=0, server_default="0") # 광고가 아닌 리뷰 평점 합계
+    rating_count = Column(Integer, nullable=False, default=0, server_default="0") # 광고가 아닌 리뷰 수
+    view_count = Column(Integer, nullable=False, default=0, server_default="0") # 조회수 (메모리에서 모아 주기적으로 반영)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    dislike_count = Column(Integer, nullable=False, default=0, server_default="0")
+    bookmark_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    share_count = Column(Integer, nullable=False, default=0, server_default="0")
+    is_favorite_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     reviews = relationship("Review", back_populates="restaurant") 
 
@@ -48,7 +80,7 @@ class Review(Base):
     __tablename__ = "reviews" 
     
     id = Column(Integer, primary_key=True, index=True) 
-    user_id = Column(Integer, ForeignKey("users.id")) 
+    user_id = Column(Integer, ForeignKey("users.user_id")) 
     restaurant_id = Column(Integer, ForeignKey("restaurants.id")) 
     content = Column(Text, nullable=False) 
     rating = Column(Integer, nullable=False) 
@@ -57,6 +89,35 @@ class Review(Base):
     user = relationship("User", back_populates="reviews") 
     restaurant = relationship("Restaurant", back_populates="reviews") 
     
+class Job(Base):
+    """백그라운드 작업 큐 (jobs.py의 워커 프로세스가 가져가 실행)"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False) # 작업 종류 (jobs.py에 등록된 핸들러 이름)
+    key = Column(String(200), nullable=True) # 중복 방지 키 (같은 키의 대기/실행 중 작업은 하나만 존재)
+    payload = Column(JSON, nullable=False, default=dict)
+    priority = Column(Integer, nullable=False, default=0, server_default="0") # 클수록 먼저 실행
+    status = Column(String(20), nullable=False, default="queued", server_default="queued") # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now()) # 재시도 대기 시각
+    locked_by = Column(String(100), nullable=True)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class IngestCheckpoint(Base):
+    """ingest.py의 입력 파일별 적재 완료 행 수 (적재한 청크와 같은 트랜잭션에서 갱신)"""
+    __tablename__ = "ingest_checkpoints"
+
+    kind = Column(String(50), primary_key=True) # restaurants, reviews
+    source = Column(String(500), primary_key=True) # 입력 파일 절대 경로 (파일마다 진행 상황을 따로 저장)
+    rows = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
 class SearchLog(Base):
     __tablename__ = "search_logs"
     
@@ -68,4 +129,15 @@ class SearchLog(Base):
     user = relationship("User", back_populates="search_logs")
 
 # pgvector HNSW 인덱스 추가 (음식점 벡터 검색 속도 향상)
-Index('idx_restaurant_vector', Restaurant.vector, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64})
\ No newline at end of file
+# HNSW 인덱스는 연산자 클래스와 같은 거리 연산자를 쓰는 쿼리에만 사용되므로 코사인/내적용을 각각 생성
+Index('idx_restaurant_vector', Restaurant.vector, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'vector': 'vector_cosine_ops'})
+Index('idx_restaurant_vector_ip', Restaurant.vector, postgresql_using='hnsw', postgresql_with={'m': 16, 'ef_construction': 64}, postgresql_ops={'vector': 'vector_ip_ops'})
+
+# 이름 부분 일치(ILIKE '%...%', 유사도 %) 검색용 pg_trgm GIN 인덱스와 전문 검색용 GIN 인덱스 (pg_trgm 확장 필요)
+Index('idx_restaurant_name_trgm', Restaurant.name, postgresql_using='gin', postgresql_ops={'name': 'gin_trgm_ops'})
+Index('idx_restaurant_search_vector', Restaurant.search_vector, postgresql_using='gin')
+
+# 작업 큐: 대기 작업을 우선순위 순으로 가져오는 인덱스와, 같은 키의 대기/실행 중 작업을 하나로 제한하는 부분 유니크 인덱스
+JOB_ACTIVE_CONDITION = text("status IN ('queued', 'running')")
+Index('idx_job_claim', Job.status, Job.priority.desc(), Job.run_after, Job.id)
+Index('idx_job_active_key', Job.key, unique=True, postgresql_where=JOB_ACTIVE_CONDITION, sqlite_where=JOB_ACTIVE_CONDITION)
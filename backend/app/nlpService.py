@@ -1,21 +1,118 @@
+import os
 import re
-from konlpy.tag import Okt
-from sentence_transformers import SentenceTransformer
-from typing import List
+from typing import Dict, List, Optional, Tuple
+from .cache import MISSING, MemoryCache
+from .model_registry import model_registry
 
 # 모델 로딩
-# 한국어 처리에 특화된 사전 학습된 백터 변환 모델 로드
-# 이 코드가 처음 실행될 때 모델을 다운로드하며, 몇 분 정도 소요될 수 있음
-
-try:
-    vector_model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-except Exception as e:
-    print(f"모델 로딩 중 오류 발생: {e}")
-    print("인터넷 연결을 확인하거나 'pip install sentence-transformers'를 실행해주세요.")
-    vector_model = None
-    
-# 형태소 분석을 위해 Okt 객체 생성
-okt = Okt()
+# 한국어 처리에 특화된 사전 학습된 백터 변환 모델과 형태소 분석기는
+# 모듈 임포트 시점이 아니라 처음 사용할 때 model_registry를 통해 한 번만 로드됨
+# 처음 로드될 때 모델을 다운로드하며, 몇 분 정도 소요될 수 있음
+
+# jhgan/ko-sroberta-multitask 모델의 출력 벡터 차원
+EMBEDDING_DIM = 768
+
+def _load_vector_model():
+    from sentence_transformers import SentenceTransformer
+    try:
+        return SentenceTransformer('jhgan/ko-sroberta-multitask')
+    except Exception as e:
+        print(f"모델 로딩 중 오류 발생: {e}")
+        print("인터넷 연결을 확인하거나 'pip install sentence-transformers'를 실행해주세요.")
+        return None
+
+def _load_okt():
+    # 형태소 분석을 위해 Okt 객체 생성 (JVM 기동 포함)
+    from konlpy.tag import Okt
+    return Okt()
+
+model_registry.register("vector_model", _load_vector_model)
+model_registry.register("okt", _load_okt)
+
+def get_vector_model():
+    """SentenceTransformer 모델 반환 (최초 호출 시 로드)"""
+    return model_registry.get("vector_model")
+
+def get_okt():
+    """Okt 형태소 분석기 반환 (최초 호출 시 로드)"""
+    return model_registry.get("okt")
+
+# 전처리 설정 (환경 변수로 조정 가능)
+# NLP_TOKENIZER : okt(기본값, JVM 형태소 분석기) 또는 simple(JVM 없이 조사/어미만 떼는 순수 파이썬 토크나이저)
+# NLP_PREPROCESS_CACHE_SIZE : 전처리 결과 LRU 캐시 크기
+# NLP_PREPROCESS_BATCH_CHARS : 배치 전처리 시 한 번에 JVM으로 넘길 최대 글자 수
+NLP_TOKENIZER = os.getenv("NLP_TOKENIZER", "okt").lower()
+NLP_PREPROCESS_CACHE_SIZE = int(os.getenv("NLP_PREPROCESS_CACHE_SIZE", "50000"))
+NLP_PREPROCESS_BATCH_CHARS = int(os.getenv("NLP_PREPROCESS_BATCH_CHARS", "20000"))
+
+# 미리 컴파일한 정규식과 불용어/품사 집합 (호출마다 다시 만들지 않음)
+_NON_KOREAN_PATTERN = re.compile(r"[^ㄱ-ㅎㅏ-ㅣ가-힣\s]")
+_SPACE_PATTERN = re.compile(r"\s+")
+# 불용어 집합 (필요에 따라 계속 추가 가능)
+STOPWORDS = frozenset(['하다', '있다', '되다', '그', '않다', '없다', '나', '말', '사람', '이', '보다', '등', '같다', '것'])
+MEANINGFUL_POS = frozenset(['Noun', 'Adjective', 'Verb'])
+
+# 여러 텍스트를 한 번의 okt.pos() 호출로 분석할 때 텍스트 사이에 넣는 구분자
+# 정제된 텍스트에는 한글과 공백만 남으므로 영문 구분자는 원문과 섞이지 않고 Alpha 토큰으로 분리됨
+_BATCH_SEPARATOR = "QXSEPQX"
+
+# simple 토크나이저가 떼어낼 조사/어미 (긴 것부터 검사)
+_SIMPLE_SUFFIXES = sorted([
+    '은', '는', '이', '가', '을', '를', '에', '에서', '의', '도', '으로', '로', '와', '과', '하고', '이랑', '랑',
+    '까지', '부터', '만', '요', '에요', '예요', '이에요', '해요', '했어요', '했다', '하다', '하는', '한', '했던',
+    '어요', '아요', '었어요', '았어요', '네요', '고', '서', '지만',
+], key=len, reverse=True)
+
+# 전처리 결과 캐시 (정제된 텍스트 -> 전처리 결과)
+_preprocess_cache = MemoryCache(max_size=NLP_PREPROCESS_CACHE_SIZE)
+
+def _normalize(text: str) -> str:
+    """한글, 공백 외 문자를 제거하고 공백을 하나로 정리 (캐시 키로도 사용)"""
+    return _SPACE_PATTERN.sub(" ", _NON_KOREAN_PATTERN.sub("", text)).strip()
+
+def _simple_pos(text: str) -> List[Tuple[str, str]]:
+    """JVM 없이 공백 단위로 나누고 조사/어미를 떼어 명사로 간주하는 간이 품사 태깅"""
+    tokens = []
+    for word in text.split():
+        for suffix in _SIMPLE_SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 2:
+                word = word[:-len(suffix)]
+                break
+        tokens.append((word, 'Noun'))
+    return tokens
+
+def _pos(text: str) -> List[Tuple[str, str]]:
+    if NLP_TOKENIZER == "simple":
+        return _simple_pos(text)
+    okt = get_okt()
+    if okt is None:
+        # 로딩 실패 후 MODEL_RETRY_INTERVAL 동안은 None이 반환됨
+        raise RuntimeError("형태소 분석기(Okt)가 로드되지 않았습니다.")
+    # 형태소 분석 및 품사 태깅(단어의 원형 복원 포함)
+    return okt.pos(text, stem=True)
+
+def _filter_tokens(tokens: List[Tuple[str, str]]) -> str:
+    """의미있는 품사이면서 불용어가 아니고, 두 글자 이상 단어만 공백으로 연결"""
+    return " ".join(
+        word for word, pos in tokens
+        if pos in MEANINGFUL_POS and word not in STOPWORDS and len(word) > 1
+    )
+
+def _pos_batch(texts: List[str]) -> List[List[Tuple[str, str]]]:
+    """여러 텍스트를 구분자로 이어 붙여 한 번의 형태소 분석 호출로 처리"""
+    if NLP_TOKENIZER == "simple" or len(texts) == 1:
+        return [_pos(text) for text in texts]
+    tokens = _pos(f" {_BATCH_SEPARATOR} ".join(texts))
+    results: List[List[Tuple[str, str]]] = [[]]
+    for word, pos in tokens:
+        if word == _BATCH_SEPARATOR:
+            results.append([])
+        else:
+            results[-1].append((word, pos))
+    if len(results) != len(texts):
+        # 구분자가 예상과 다르게 분석된 경우 텍스트별로 다시 분석
+        return [_pos(text) for text in texts]
+    return results
 
 # 데이터 전처리 (텍스트 정제 및 토큰화) 모델
 def preprocess_text(text: str) -> str:
@@ -24,28 +121,44 @@ def preprocess_text(text: str) -> str:
     2. 형태소 분석을 통해 의미있는 품사(명사, 형용사, 동사)만 추출
     3. 불필요한 단어(불용어)와 한 글자 단어 제거
     """
-    
+    return preprocess_texts([text])[0]
+
+def preprocess_texts(texts: List[str]) -> List[str]:
+    """여러 텍스트를 한 번에 정제 (캐시에 없는 텍스트만 묶어서 형태소 분석)"""
     # 1. 정규 표현식을 사용하여 한글, 공백, 외 문자 제거
-    text = re.sub(r"[^ㄱ-ㅎㅏ-ㅣ가-힣\s]", "", text)
-    
-    # 2. 형태소 분석 및 품사 태깅(단어의 원형 복원 포함)
-    tokens = okt.pos(text, stem=True)
-    
-    # 3. 불용어 리스트 정의 (필요에 따라 계속 추가 가능)
-    stopwords = ['하다', '있다', '되다', '그', '않다', '없다', '나', '말', '사람', '이', '보다', '등', '같다', '것']
-
-    # 4. 의미있는 품사이면서 불용어가 아니고, 두 글자 이상 단어만 필터링
-    meaningful_tokens = [
-        word for word, pos in tokens 
-        if pos in ['Noun', 'Adjective', 'Verb'] and word not in stopwords and len(word) > 1
-    ]
-    
-    # 정제된 토큰들을 공백으로 구분된 하나의 문자열로 합쳐서 반환
-    return " ".join(meaningful_tokens)
+    normalized_texts = [_normalize(text) for text in texts]
+
+    results: List[Optional[str]] = []
+    pending: Dict[str, List[int]] = {}
+    for index, normalized in enumerate(normalized_texts):
+        cached = _preprocess_cache.get(normalized) if normalized else ""
+        results.append(None if cached is MISSING else cached)
+        if cached is MISSING:
+            pending.setdefault(normalized, []).append(index)
+
+    # 2. 캐시에 없는 텍스트는 NLP_PREPROCESS_BATCH_CHARS 단위로 묶어서 형태소 분석
+    unique_texts = list(pending)
+    start = 0
+    while start < len(unique_texts):
+        end, size = start, 0
+        while end < len(unique_texts) and (end == start or size + len(unique_texts[end]) <= NLP_PREPROCESS_BATCH_CHARS):
+            size += len(unique_texts[end])
+            end += 1
+        chunk = unique_texts[start:end]
+        for normalized, tokens in zip(chunk, _pos_batch(chunk)):
+            # 3. 불용어, 한 글자 단어를 제거한 토큰을 공백으로 구분된 문자열로 저장
+            preprocessed = _filter_tokens(tokens)
+            _preprocess_cache.set(normalized, preprocessed, ttl=float("inf"))
+            for index in pending[normalized]:
+                results[index] = preprocessed
+        start = end
+
+    return results
 
 # 백터 변환 모델
 def text_to_vector(text: str) -> List[float]:
     """입력된 텍스트를 벡터로 변환"""
+    vector_model = get_vector_model()
     if not vector_model:
         raise ValueError("벡터 변환 모델이 로드되지 않았습니다.")
     
@@ -56,4 +169,20 @@ def text_to_vector(text: str) -> List[float]:
     vector = vector_model.encode(preprocessed_text)
     
     # 3. DB에 저장하기 쉽도록 numpy 배열을 리스트로 변환하여 반환
-    return vector.tolist()
\ No newline at end of file
+    return vector.tolist()
+
+# 배치 백터 변환 모델
+def texts_to_vectors(texts: List[str]) -> List[List[float]]:
+    """여러 텍스트를 한 번의 encode() 호출로 벡터화"""
+    vector_model = get_vector_model()
+    if not vector_model:
+        raise ValueError("벡터 변환 모델이 로드되지 않았습니다.")
+    if not texts:
+        return []
+
+    # 캐시와 배치 형태소 분석을 사용하는 일괄 전처리
+    preprocessed_texts = preprocess_texts(texts)
+
+    # 텍스트 목록 전체를 하나의 배치로 인코딩하여 forward pass 오버헤드를 한 번만 부담
+    vectors = vector_model.encode(preprocessed_texts, batch_size=len(preprocessed_texts))
+    return vectors.tolist()
\ No newline at end of file
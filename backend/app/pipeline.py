@@ -0,0 +1,105 @@
+import asyncio
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
+
+# 파이프라인 기본 설정 (환경 변수로 조정 가능)
+# PIPELINE_CONCURRENCY : 동시에 처리할 최대 항목(장소) 수
+# PIPELINE_DEADLINE : 전체 파이프라인 마감 시간 (초), 지나면 완료된 항목만 반환
+PIPELINE_CONCURRENCY = int(os.getenv("PIPELINE_CONCURRENCY", "3"))
+PIPELINE_DEADLINE = float(os.getenv("PIPELINE_DEADLINE", "15"))
+
+
+class Stage:
+    """파이프라인의 한 단계 (이전 단계 결과를 받아 다음 단계 입력을 반환하는 코루틴 함수)
+
+    단계 함수가 None을 반환하면 해당 항목은 이후 단계를 건너뛰고 결과에서 제외됩니다.
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Awaitable[Any]], timeout: Optional[float] = None):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+
+
+class Pipeline:
+    """항목마다 단계를 순서대로 실행하되, 여러 항목은 동시성 제한 안에서 병렬로 처리하는 실행기"""
+
+    def __init__(self, stages: List[Stage], concurrency: int = PIPELINE_CONCURRENCY, deadline: float = PIPELINE_DEADLINE):
+        self.stages = stages
+        self.concurrency = max(1, concurrency)
+        self.deadline = deadline
+
+    async def _process(self, item: Any, semaphore: asyncio.Semaphore) -> Any:
+        async with semaphore:
+            value = item
+            for stage in self.stages:
+                try:
+                    value = await asyncio.wait_for(stage.func(value), stage.timeout)
+                except asyncio.TimeoutError:
+                    print(f"파이프라인 '{stage.name}' 단계 시간 초과: {item}")
+                    return None
+                except Exception as e:
+                    print(f"파이프라인 '{stage.name}' 단계 오류: {item}, {e}")
+                    return None
+                if value is None:
+                    return None
+            return value
+
+    async def iter_completed(self, items: Union[List[Any], AsyncIterator[Any]]) -> AsyncIterator[Tuple[int, Any]]:
+        """완료되는 순서대로 (입력 인덱스, 결과)를 내보내며, 마감 시간이 지나면 남은 항목은 취소
+
+        items가 비동기 이터레이터(스트리밍 LLM 응답 등)면 항목이 도착하는 즉시 처리를 시작합니다.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = {}
+        source = None
+        next_item = None
+        if hasattr(items, "__aiter__"):
+            source = items.__aiter__()
+            next_item = asyncio.ensure_future(source.__anext__())
+        else:
+            for index, item in enumerate(items):
+                tasks[asyncio.ensure_future(self._process(item, semaphore))] = index
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + self.deadline
+        pending = set(tasks)
+        try:
+            while pending or next_item is not None:
+                timeout = deadline_at - loop.time()
+                if timeout <= 0:
+                    print(f"파이프라인 마감 시간 초과: {len(pending)}개 항목 제외")
+                    break
+                waiting = pending | {next_item} if next_item is not None else pending
+                done, _ = await asyncio.wait(waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task is next_item:
+                        next_item = None
+                        try:
+                            item = task.result()
+                        except StopAsyncIteration:
+                            continue
+                        except Exception as e:
+                            print(f"파이프라인 입력 오류: {e}")
+                            continue
+                        new_task = asyncio.ensure_future(self._process(item, semaphore))
+                        tasks[new_task] = len(tasks)
+                        pending.add(new_task)
+                        next_item = asyncio.ensure_future(source.__anext__())
+                        continue
+                    pending.discard(task)
+                    result = task.result()
+                    if result is not None:
+                        yield tasks[task], result
+        finally:
+            for task in pending:
+                task.cancel()
+            if next_item is not None:
+                next_item.cancel()
+                await asyncio.gather(next_item, return_exceptions=True)
+            if source is not None and hasattr(source, "aclose"):
+                await source.aclose()
+
+    async def run(self, items: List[Any]) -> List[Any]:
+        """마감 시간 안에 완료된 항목의 결과를 입력 순서대로 반환"""
+        results = [(index, result) async for index, result in self.iter_completed(items)]
+        return [result for _, result in sorted(results, key=lambda pair: pair[0])]
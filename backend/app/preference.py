@@ -0,0 +1,95 @@
+import asyncio
+import os
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+from .embedding_service import embedding_service
+
+# 사용자 선호 벡터 설정
+# PREFERENCE_HALF_LIFE_DAYS : 이 기간이 지나면 과거 이벤트의 가중치가 절반이 됨
+# PREFERENCE_SEARCH_WEIGHT : 검색 한 번의 가중치 (검색어 임베딩)
+# PREFERENCE_REVIEW_WEIGHT : 높은 평점 리뷰 한 번의 가중치 (리뷰한 음식점의 벡터)
+# PREFERENCE_MIN_RATING : 선호 벡터에 반영할 최소 리뷰 평점
+PREFERENCE_HALF_LIFE_DAYS = float(os.getenv("PREFERENCE_HALF_LIFE_DAYS", "30"))
+PREFERENCE_SEARCH_WEIGHT = float(os.getenv("PREFERENCE_SEARCH_WEIGHT", "1.0"))
+PREFERENCE_REVIEW_WEIGHT = float(os.getenv("PREFERENCE_REVIEW_WEIGHT", "2.0"))
+PREFERENCE_MIN_RATING = int(os.getenv("PREFERENCE_MIN_RATING", "4"))
+
+
+def decayed_update(
+    vector: Optional[List[float]],
+    weight: float,
+    updated_at: Optional[datetime],
+    event_vector: List[float],
+    event_weight: float,
+    now: datetime,
+) -> Tuple[List[float], float]:
+    """지수 감쇠 가중 평균에 이벤트 하나를 반영 (이력 전체를 다시 계산하지 않는 O(1) 갱신)
+
+    기존 가중치를 경과 시간만큼 감쇠시킨 뒤, 정규화된 이벤트 벡터를 event_weight로 더해 평균을 다시 구합니다.
+    """
+    event = np.asarray(event_vector, dtype=np.float32)
+    event /= np.linalg.norm(event) or 1
+    if vector is None or not weight:
+        return event.tolist(), event_weight
+    if updated_at is not None:
+        if updated_at.tzinfo is None:
+            updated_at = updated_at.replace(tzinfo=timezone.utc)
+        elapsed_days = max((now - updated_at).total_seconds(), 0) / 86400
+        weight *= 0.5 ** (elapsed_days / PREFERENCE_HALF_LIFE_DAYS)
+    new_weight = weight + event_weight
+    new_vector = (np.asarray(vector, dtype=np.float32) * weight + event * event_weight) / new_weight
+    return new_vector.tolist(), new_weight
+
+
+def apply_event(db: Session, user_id: int, event_vector: List[float], event_weight: float) -> bool:
+    """사용자 행을 잠그고 선호 벡터에 이벤트를 반영 (동시에 들어온 이벤트가 서로 덮어쓰지 않도록 FOR UPDATE)"""
+    user = db.query(models.User).filter(models.User.user_id == user_id).with_for_update().first()
+    if user is None:
+        db.rollback()
+        return False
+    now = datetime.now(timezone.utc)
+    user.preference_vector, user.preference_weight = decayed_update(
+        None if user.preference_vector is None else list(user.preference_vector),
+        user.preference_weight or 0.0,
+        user.preference_updated_at,
+        event_vector,
+        event_weight,
+        now,
+    )
+    user.preference_updated_at = now
+    db.commit()
+    return True
+
+
+def record_review(db: Session, review: models.Review) -> bool:
+    """높은 평점 리뷰면 리뷰한 음식점의 벡터를 선호 벡터에 반영 (임베딩 계산 없음)"""
+    if not review.user_id or int(review.rating) < PREFERENCE_MIN_RATING:
+        return False
+    restaurant = db.query(models.Restaurant).filter(models.Restaurant.id == review.restaurant_id).first()
+    if restaurant is None or restaurant.vector is None:
+        return False
+    return apply_event(db, review.user_id, list(restaurant.vector), PREFERENCE_REVIEW_WEIGHT)
+
+
+def _apply_in_new_session(user_id: int, event_vector: List[float], event_weight: float):
+    db = SessionLocal()
+    try:
+        apply_event(db, user_id, event_vector, event_weight)
+    finally:
+        db.close()
+
+
+async def record_search(user_id: int, query: str):
+    """검색어 임베딩을 선호 벡터에 반영 (응답 후 BackgroundTasks로 실행, 임베딩은 배치 큐, DB 갱신은 스레드에서 실행)"""
+    try:
+        query_vector = await embedding_service.embed(query)
+        await asyncio.to_thread(_apply_in_new_session, user_id, query_vector, PREFERENCE_SEARCH_WEIGHT)
+    except Exception as e:
+        print(f"선호 벡터 갱신 오류: user_id={user_id}, {e}")
+
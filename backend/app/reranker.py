@@ -0,0 +1,188 @@
+import asyncio
+import math
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import models
+from .model_registry import model_registry
+from .user_context import UserContext
+
+# 로컬 재정렬 설정 (환경 변수로 조정 가능)
+# RERANKER_TOP_K : 재정렬 후 남길 후보 수
+# RERANKER_WORKERS : 점수 계산에 사용하는 스레드 수 (CPU 연산이므로 이벤트 루프 밖에서 실행)
+# RERANKER_CROSS_ENCODER_MODEL : sentence-transformers CrossEncoder 모델 이름 (비우면 특징 점수만 사용)
+# RERANKER_BATCH_SIZE : CrossEncoder 배치 크기
+RERANKER_TOP_K = int(os.getenv("RERANKER_TOP_K", "8"))
+RERANKER_WORKERS = int(os.getenv("RERANKER_WORKERS", "2"))
+RERANKER_CROSS_ENCODER_MODEL = os.getenv("RERANKER_CROSS_ENCODER_MODEL", "")
+RERANKER_BATCH_SIZE = int(os.getenv("RERANKER_BATCH_SIZE", "32"))
+
+# 특징별 가중치 (RERANKER_WEIGHT_<특징> 으로 조정)
+RERANKER_WEIGHTS = {
+    "similarity": float(os.getenv("RERANKER_WEIGHT_SIMILARITY", "1.0")),
+    "cross_encoder": float(os.getenv("RERANKER_WEIGHT_CROSS_ENCODER", "1.0")),
+    "rating": float(os.getenv("RERANKER_WEIGHT_RATING", "0.4")),
+    "price": float(os.getenv("RERANKER_WEIGHT_PRICE", "0.3")),
+    "allergy": float(os.getenv("RERANKER_WEIGHT_ALLERGY", "-2.0")),
+}
+
+# 평점 베이지안 평균의 사전값 (리뷰가 적은 음식점의 평균을 전체 평균 쪽으로 당김)
+RATING_PRIOR_MEAN = 3.5
+RATING_PRIOR_COUNT = 5
+
+_MANWON = re.compile(r"(\d+(?:\.\d+)?)(?:\s*[~-]\s*(\d+(?:\.\d+)?))?\s*만")
+_WON = re.compile(r"(\d{1,3}(?:,\d{3})+|\d{4,})\s*원")
+_CHEAP_WORDS = ("저렴", "싼", "가성비", "착한 가격", "학생")
+_EXPENSIVE_WORDS = ("고급", "비싼", "특별한", "기념일", "오마카세", "파인다이닝")
+
+
+def _load_cross_encoder():
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(RERANKER_CROSS_ENCODER_MODEL)
+
+
+if RERANKER_CROSS_ENCODER_MODEL:
+    model_registry.register("cross_encoder", _load_cross_encoder)
+
+
+def parse_prices(text: Optional[str]) -> List[int]:
+    """'1~2만원대', '15,000원' 같은 문자열에서 금액(원)을 추출"""
+    if not text:
+        return []
+    prices = [int(float(value) * 10000) for values in _MANWON.findall(text) for value in values if value]
+    prices += [int(value.replace(",", "")) for value in _WON.findall(text)]
+    return prices
+
+
+def price_intent(query: str) -> Tuple[Optional[int], Optional[str]]:
+    """검색어의 가격 조건을 (예산 상한, 'cheap'/'expensive') 로 해석"""
+    prices = parse_prices(query)
+    budget = max(prices) if prices else None
+    if any(word in query for word in _CHEAP_WORDS):
+        return budget, "cheap"
+    if any(word in query for word in _EXPENSIVE_WORDS):
+        return budget, "expensive"
+    return budget, None
+
+
+def price_score(restaurant: models.Restaurant, budget: Optional[int], intent: Optional[str]) -> Optional[float]:
+    """가격 조건과 음식점 가격대가 얼마나 맞는지 0~1 (조건이나 가격 정보가 없으면 None)"""
+    if budget is None and intent is None:
+        return None
+    prices = parse_prices(restaurant.summary_price)
+    if not prices:
+        return None
+    price = sum(prices) / len(prices)
+    if budget is not None:
+        return 1.0 if price <= budget else max(0.0, 1 - (price - budget) / budget)
+    if intent == "cheap":
+        return max(0.0, 1 - price / 40000)
+    return min(1.0, price / 60000)
+
+
+def rating_score(restaurant: models.Restaurant) -> float:
+    """평점 합계/리뷰 수 집계 컬럼으로 계산한 베이지안 평균 (0~1)"""
+    total = (restaurant.rating_sum or 0) + RATING_PRIOR_MEAN * RATING_PRIOR_COUNT
+    count = (restaurant.rating_count or 0) + RATING_PRIOR_COUNT
+    return total / count / 5
+
+
+def allergy_conflicts(restaurant: models.Restaurant, allergies) -> List[str]:
+    """음식점 메뉴/설명에 포함된 사용자 알러지 항목"""
+    if not allergies:
+        return []
+    text = " ".join(
+        value or ""
+        for value in (restaurant.name, restaurant.summary_category, restaurant.summary_feature_menu, restaurant.summary_description)
+    )
+    return [allergy for allergy in allergies if allergy in text]
+
+
+def candidate_text(restaurant: models.Restaurant) -> str:
+    """CrossEncoder에 넣을 음식점 설명"""
+    fields = (restaurant.name, restaurant.summary_category, restaurant.summary_feature_menu, restaurant.summary_description)
+    return " ".join(value for value in fields if value)
+
+
+class RerankResult:
+    """재정렬된 후보 하나 (최종 점수, 특징별 값, 알러지 충돌 항목)"""
+
+    def __init__(self, restaurant: models.Restaurant, score: float, features: Dict[str, float], conflicts: List[str]):
+        self.restaurant = restaurant
+        self.score = score
+        self.features = features
+        self.conflicts = conflicts
+
+    def reason(self) -> str:
+        """점수에 기여한 특징으로 만든 짧은 추천 이유 (LLM 없이 응답할 때 사용)"""
+        parts = []
+        if self.restaurant.rating_count:
+            parts.append(f"평점 {self.restaurant.rating_sum / self.restaurant.rating_count:.1f} ({self.restaurant.rating_count}명)")
+        if self.features.get("price", 0) >= 0.8:
+            parts.append("원하는 가격대")
+        if self.restaurant.summary_feature_menu:
+            parts.append(f"대표 메뉴 {self.restaurant.summary_feature_menu}")
+        return ", ".join(parts) or "요청과 가장 비슷한 음식점"
+
+
+class Reranker:
+    """벡터 유사도, 평점 집계, 알러지 충돌, 가격대 일치(+선택적 CrossEncoder)의 가중합으로 후보를 재정렬"""
+
+    def __init__(self, weights: Dict[str, float] = RERANKER_WEIGHTS, top_k: int = RERANKER_TOP_K, workers: int = RERANKER_WORKERS):
+        self.weights = weights
+        self.top_k = top_k
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="reranker")
+
+    def _cross_encoder_scores(self, query: str, restaurants: Sequence[models.Restaurant]) -> Optional[List[float]]:
+        if not RERANKER_CROSS_ENCODER_MODEL:
+            return None
+        model = model_registry.get("cross_encoder")
+        if model is None:
+            return None
+        logits = model.predict([(query, candidate_text(restaurant)) for restaurant in restaurants], batch_size=RERANKER_BATCH_SIZE)
+        return [1 / (1 + math.exp(-float(logit))) for logit in logits]
+
+    def score(
+        self,
+        query: str,
+        context: Optional[UserContext],
+        candidates: Sequence[Tuple[models.Restaurant, float]],
+        top_k: Optional[int] = None,
+    ) -> List[RerankResult]:
+        """(음식점, 벡터 유사도) 후보를 점수 순으로 정렬하여 상위 top_k개 반환 (CPU 연산, 스레드에서 호출)"""
+        if not candidates:
+            return []
+        budget, intent = price_intent(query)
+        cross_scores = self._cross_encoder_scores(query, [restaurant for restaurant, _ in candidates])
+        allergies = context.allergies if context else frozenset()
+        results = []
+        for index, (restaurant, similarity) in enumerate(candidates):
+            features = {"similarity": float(similarity), "rating": rating_score(restaurant)}
+            if cross_scores is not None:
+                features["cross_encoder"] = cross_scores[index]
+            price = price_score(restaurant, budget, intent)
+            if price is not None:
+                features["price"] = price
+            conflicts = allergy_conflicts(restaurant, allergies)
+            features["allergy"] = float(bool(conflicts))
+            score = sum(self.weights.get(name, 0.0) * value for name, value in features.items())
+            results.append(RerankResult(restaurant, score, features, conflicts))
+        results.sort(key=lambda result: result.score, reverse=True)
+        return results[: top_k or self.top_k]
+
+    async def rerank(
+        self,
+        query: str,
+        context: Optional[UserContext],
+        candidates: Sequence[Tuple[models.Restaurant, float]],
+        top_k: Optional[int] = None,
+    ) -> List[RerankResult]:
+        """score를 스레드 풀에서 실행 (CrossEncoder 추론이 이벤트 루프를 막지 않도록)"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.score, query, context, list(candidates), top_k)
+
+
+# 애플리케이션 전체에서 공유하는 재정렬기
+reranker = Reranker()
@@ -46,6 +46,10 @@ class User(BaseModel):
     class Config : # Config 클래스
         orm_mode=True # ORM 모드 활성화
 
+class UserUpdateInterests(BaseModel):
+    """사용자 관심사 수정 요청 시 받을 데이터 형식"""
+    interests : Optional[str] = Field(None, example="데이트, 회식, 가족모임")
+
 # 음식점 스키마
 class RestaurantDetail(BaseModel): # 가게 기본 필드
     name: str # 가게 이름
@@ -62,6 +66,8 @@ class RestaurantDetail(BaseModel): # 가게 기본 필드
     comment_count : int = Field(default=0) # 댓글 수
     share_count : int = Field(default=0) # 공유 수
     is_favorite_count : int = Field(default=0) # 즐겨찾기 수
+    rating_average : Optional[float] = None # 평균 평점 (리뷰가 없으면 None)
+    rating_count : int = Field(default=0) # 평점을 남긴 리뷰 수
     
     # AI 요약 정보
     summary_pros: Optional[List[str]] = Field(None, description="음식점 장점 3가지 요약")
@@ -73,6 +79,7 @@ class RestaurantDetail(BaseModel): # 가게 기본 필드
     summary_parking: Optional[str] = Field(None, description="주차 정보")
     summary_price: Optional[str] = Field(None, description="가격대")
     summary_opening_hours: Optional[str] = Field(None, description="영업시간")
+    reason: Optional[str] = Field(None, description="추천 이유")
     
     class Config: # Config 클래스
         orm_mode = True # ORM 모드 활성화
@@ -83,6 +90,8 @@ class ChatRequest(BaseModel):
     """맛집 추천 요청 시 받을 데이터 형식"""
     user_id: int
     prompt: str
+    category: Optional[str] = None # 후보 음식점 카테고리 필터 (예: 한식)
+    location: Optional[str] = None # 후보 음식점 주소 필터 (예: 성수동)
 
 class RecommendationResponse(BaseModel):
     """맛집 추천 API의 최종 응답 형식"""
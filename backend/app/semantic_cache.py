@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .embedding_service import embedding_service
+
+# 프롬프트 정규화용 패턴 (한글/영문/숫자/공백 외 문자 제거, 연속 공백 축약)
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-zA-Zㄱ-ㅎㅏ-ㅣ가-힣\s]")
+_SPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """대소문자, 특수문자, 공백 차이를 없앤 프롬프트를 반환"""
+    prompt = _NON_WORD_PATTERN.sub(" ", prompt.lower())
+    return _SPACE_PATTERN.sub(" ", prompt).strip()
+
+
+class _NamespaceMatrix:
+    """namespace 하나의 캐시 벡터를 미리 할당한 행렬에 모아 두는 저장소
+
+    조회할 때마다 벡터를 다시 쌓지 않도록, 추가는 빈 행에 쓰고 삭제는 마지막 행을 빈 자리로 옮겨 채웁니다.
+    용량이 부족하면 두 배로 늘립니다.
+    """
+
+    def __init__(self, dim: int, capacity: int = 16):
+        self.vectors = np.empty((capacity, dim), dtype=np.float32)
+        self.expires = np.empty(capacity, dtype=np.float64)
+        self.keys: List[int] = []
+        self.rows: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: int, vector: np.ndarray, expires: float):
+        row = len(self.keys)
+        if row == len(self.vectors):
+            capacity = len(self.vectors) * 2
+            vectors = np.empty((capacity, self.vectors.shape[1]), dtype=np.float32)
+            vectors[:row] = self.vectors
+            expires_at = np.empty(capacity, dtype=np.float64)
+            expires_at[:row] = self.expires
+            self.vectors, self.expires = vectors, expires_at
+        self.vectors[row] = vector
+        self.expires[row] = expires
+        self.keys.append(key)
+        self.rows[key] = row
+
+    def remove(self, key: int):
+        row = self.rows.pop(key)
+        last = len(self.keys) - 1
+        if row != last:
+            moved = self.keys[last]
+            self.vectors[row] = self.vectors[last]
+            self.expires[row] = self.expires[last]
+            self.keys[row] = moved
+            self.rows[moved] = row
+        self.keys.pop()
+
+    def expired(self, now: float) -> List[int]:
+        return [self.keys[row] for row in np.flatnonzero(self.expires[: len(self.keys)] < now)]
+
+    def nearest(self, vector: np.ndarray) -> Optional[Tuple[int, float]]:
+        """가장 유사한 항목의 (key, 유사도)"""
+        if not self.keys:
+            return None
+        similarities = self.vectors[: len(self.keys)] @ vector
+        best = int(np.argmax(similarities))
+        return self.keys[best], float(similarities[best])
+
+
+class SemanticCache:
+    """프롬프트 임베딩의 코사인 유사도로 이전 응답을 재사용하는 캐시
+
+    namespace가 다른 항목끼리는 매칭되지 않으므로, 사용자 프로필처럼 응답 내용을 바꾸는 값은
+    namespace로 넘겨 정확히 일치할 때만 재사용되도록 합니다.
+    """
+
+    def __init__(self, threshold: float = 0.93, ttl: float = 3600, max_size: int = 1000):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_size = max_size
+        # key -> (namespace, 응답), LRU 순서 유지 (벡터와 만료 시각은 namespace별 행렬에 저장)
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._matrices: Dict[str, _NamespaceMatrix] = {}
+        self._next_key = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    async def _embed(self, prompt: str) -> Optional[np.ndarray]:
+        """정규화된 프롬프트를 단위 벡터로 변환 (모델을 쓸 수 없으면 None)"""
+        try:
+            vector = np.asarray(await embedding_service.embed(normalize_prompt(prompt)), dtype=np.float32)
+        except Exception as e:
+            print(f"시맨틱 캐시 임베딩 오류: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _remove(self, key: int):
+        namespace, _ = self._entries.pop(key)
+        matrix = self._matrices[namespace]
+        matrix.remove(key)
+        if not len(matrix):
+            del self._matrices[namespace]
+
+    def _search(self, namespace: str, vector: np.ndarray) -> Tuple[bool, Any]:
+        """같은 namespace에서 유사도가 임계값 이상인 가장 가까운 항목을 찾아 (찾았는지, 응답)을 반환"""
+        with self._lock:
+            matrix = self._matrices.get(namespace)
+            if matrix is None:
+                return False, None
+            for key in matrix.expired(time.time()):
+                self._remove(key)
+            if namespace not in self._matrices:
+                return False, None
+            nearest = matrix.nearest(vector)
+            if nearest is None or nearest[1] < self.threshold:
+                return False, None
+            key = nearest[0]
+            self._entries.move_to_end(key)
+            return True, self._entries[key][1]
+
+    async def lookup(self, prompt: str, namespace: str = "") -> Tuple[Optional[Any], Optional[np.ndarray]]:
+        """의미상 같은 프롬프트의 캐시된 응답(없으면 None)과 프롬프트 벡터를 반환
+
+        캐시 미스 후 store()에 벡터를 넘기면 같은 프롬프트를 다시 임베딩하지 않습니다.
+        """
+        vector = await self._embed(prompt)
+        found, value = self._search(namespace, vector) if vector is not None else (False, None)
+        if not found:
+            self.misses += 1
+            return None, vector
+        self.hits += 1
+        return value, vector
+
+    async def store(self, prompt: str, value: Any, namespace: str = "", vector: Optional[np.ndarray] = None):
+        """프롬프트와 응답을 저장하며, 최대 크기를 넘으면 가장 오래 사용되지 않은 항목부터 삭제
+
+        vector는 lookup()이 반환한 프롬프트 벡터 (생략하면 새로 임베딩)
+        """
+        if vector is None:
+            vector = await self._embed(prompt)
+        if vector is None:
+            return
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            matrix = self._matrices.get(namespace)
+            if matrix is None:
+                matrix = self._matrices[namespace] = _NamespaceMatrix(len(vector))
+            matrix.add(key, vector, time.time() + self.ttl)
+            self._entries[key] = (namespace, value)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
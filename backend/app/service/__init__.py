@@ -0,0 +1,698 @@
+import os
+import json
+import asyncio
+from typing import AsyncIterator, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+from bs4 import BeautifulSoup
+from .. import crud, models, schemas, nlpService
+from ..cache import MISSING, create_cache
+from ..database import AsyncSessionLocal
+from ..embedding_service import embedding_service
+from ..ad_filter import ad_filter
+from ..counters import rating_average, view_counter
+from ..jobs import enqueue_job
+from ..reranker import RerankResult, reranker
+from ..vector_search import PgVectorIndex
+from ..user_context import UserContext
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..pipeline import Pipeline, Stage
+from .naverMapService import naver_client
+from .gemini_service import generate_json, stream_json_array
+from ..structured_output import StructuredOutputError, parse_model_list
+import xml.etree.ElementTree as ET
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# API Key 및 모델 설정
+# Gemini 모델과 응답 캐시는 service/gemini_service.py에서 관리
+# Naver API 설정은 service/naverMapService.py의 naver_client에서 관리
+
+# 추천 파이프라인 설정 (환경 변수로 조정 가능)
+# RECOMMEND_CONCURRENCY : 동시에 검증/요약할 장소 수
+# RECOMMEND_DEADLINE : 추천 파이프라인 전체 마감 시간 (초), 지나면 완료된 장소만 응답
+# RECOMMEND_VERIFY_TIMEOUT, RECOMMEND_SUMMARY_TIMEOUT : 단계별 제한 시간 (초)
+RECOMMEND_CONCURRENCY = int(os.getenv("RECOMMEND_CONCURRENCY", "3"))
+RECOMMEND_DEADLINE = float(os.getenv("RECOMMEND_DEADLINE", "15"))
+RECOMMEND_VERIFY_TIMEOUT = float(os.getenv("RECOMMEND_VERIFY_TIMEOUT", "5"))
+RECOMMEND_SUMMARY_TIMEOUT = float(os.getenv("RECOMMEND_SUMMARY_TIMEOUT", "12"))
+# 추천 중 발견한 요약 없는 음식점의 요약 작업 우선순위 (summary_pipeline의 주기 작업보다 먼저 실행)
+SUMMARY_JOB_PRIORITY = int(os.getenv("SUMMARY_JOB_PRIORITY", "10"))
+# 검색어 벡터에 사용자 관심사 벡터를 섞는 비율 (0이면 개인화하지 않음)
+USER_PREFERENCE_WEIGHT = float(os.getenv("USER_PREFERENCE_WEIGHT", "0.3"))
+# 추천 방식
+# RECOMMEND_MODE : retrieval(DB 후보를 Gemini가 재정렬/설명, 네이버 호출 없음) 또는 generate(Gemini가 맛집을 생성 후 네이버 검증)
+#                  retrieval 모드에서 DB 후보가 없으면 generate 방식으로 추천
+# RECOMMEND_CANDIDATES : retrieval 모드에서 벡터 검색으로 가져와 로컬 재정렬기(reranker.py)로 점수를 매길 후보 수
+#                        (재정렬 후 RERANKER_TOP_K개만 Gemini에 전달)
+# RECOMMEND_GEMINI : retrieval 모드에서 Gemini 사용 여부
+#                    always(항상 Gemini가 최종 선택/설명), never(로컬 재정렬 결과만 사용),
+#                    auto(검색어가 RECOMMEND_SIMPLE_QUERY_WORDS 단어 이하인 단순 요청은 Gemini 없이 응답)
+RECOMMEND_MODE = os.getenv("RECOMMEND_MODE", "retrieval")
+RECOMMEND_CANDIDATES = int(os.getenv("RECOMMEND_CANDIDATES", "50"))
+RECOMMEND_GEMINI = os.getenv("RECOMMEND_GEMINI", "auto")
+RECOMMEND_SIMPLE_QUERY_WORDS = int(os.getenv("RECOMMEND_SIMPLE_QUERY_WORDS", "3"))
+
+# 네이버 검색 결과 캐시 (기본: 메모리 LRU, 6시간 / 검색 결과 없음은 1시간)
+# NAVER_CACHE_BACKEND=sqlite 로 설정하면 디스크에 저장되어 재시작 후에도 유지됨
+naver_cache = create_cache("NAVER_CACHE", default_ttl=6 * 60 * 60, default_negative_ttl=60 * 60)
+
+def _naver_cache_key(url: str, params: dict = None) -> str:
+    return f"{url}?{json.dumps(params or {}, sort_keys=True, ensure_ascii=False)}"
+
+# 외부 API 호출 헬퍼 함수
+async def _call_naver_api(path: str, params: dict = None):
+    cache_key = _naver_cache_key(path, params)
+    cached = naver_cache.get(cache_key)
+    if cached is not MISSING:
+        return cached
+
+    # 공유 커넥션 풀, 타임아웃, 재시도는 naver_client가 처리
+    result = await naver_client.get_json(path, params=params)
+    if result is None:
+        # 일시적인 오류는 캐싱하지 않음
+        return None
+
+    # 검색 결과가 없는 장소는 None으로 네거티브 캐싱
+    found = result if result.get("items") else None
+    naver_cache.set(cache_key, found)
+    return found
+
+# 네이버 장소 검증 함수
+async def verify_place_with_naver(place_name: str):
+    """네이버 검색으로 장소를 검증하고 기본 정보와 이미지 URL을 반환합니다."""
+    # 지역 검색과 이미지 검색은 서로 독립적이므로 동시에 요청
+    place_info, image_info = await asyncio.gather(
+        _call_naver_api(
+            "/v1/search/local.json",
+            params={"query": place_name, "display": 1},
+        ),
+        # 이미지 정보 조회
+        _call_naver_api(
+            "/v1/search/image",
+            params={"query": f"{place_name} 음식", "display": 1, "sort": "sim"},
+        ),
+    )
+    if not (place_info and place_info.get("items")): return None
+    
+    # HTML 태그 제거
+    verified_place = dict(place_info.get("items")[0])
+
+    if image_info and image_info.get("items"):
+        verified_place['image_url'] = image_info["items"][0].get('link')
+    return verified_place
+
+def crawl_reviews_for_summary(place_name: str) -> List[str]:
+    """
+    특정 장소에 대한 리뷰 30~50개를 웹 크롤링합니다.
+    (주의: 실제 구현 시에는 특정 사이트의 구조에 맞춰 정교하게 만들어야 합니다)
+    """
+    print(f"'{place_name}'에 대한 리뷰 크롤링 시뮬레이션...")
+    # 예시: 네이버 'VIEW' 검색 결과에서 블로그 본문 일부를 가져온다고 가정
+    # 실제로는 beautifulsoup4를 사용해 HTML을 파싱해야 합니다.
+    return [
+        f"{place_name} 정말 맛있어요! 인생 맛집 등극!",
+        "분위기는 좋은데 가격이 좀 비싸요. 그래도 데이트하기엔 최고.",
+        "이 글은 업체로부터 소정의 원고료를 받아 작성되었습니다.", # 광고 예시
+        "정말... 할많하않... 다신 안 갈듯.",
+        "뷰가 미쳤어요! 음식 맛은 평범한데 사진 찍으러 가기엔 좋아요."
+    ] * 6 # 30개 리뷰 예시
+
+def filter_ad_reviews(reviews: List[str]) -> List[str]:
+    """규칙과 AI를 사용해 광고성/바이럴 리뷰를 필터링합니다."""
+    # 1. 키워드 오토마톤/정규식으로 1차 필터링
+    # 2. (선택적) AD_FILTER_CLASSIFIER=1 이면 남은 리뷰를 임베딩 분류기로 한 번에 2차 필터링
+    clean_reviews = ad_filter.filter_reviews(reviews)
+    print(f"광고 필터링 후 {len(clean_reviews)}개의 유효한 리뷰 확보.")
+    return clean_reviews
+
+
+
+# 맛집 요약 로직
+async def get_restaurant_summary_and_vectorize(place_name: str):
+    """
+    웹 크롤링, 필터링, AI 요약을 거쳐 식당의 상세 정보와 벡터를 생성합니다.
+    (DB에 있는 음식점은 summary_pipeline.py가 미리 계산해 두므로 요청 중에는 DB에 없는 장소만 이 함수를 사용)
+    """
+    # 1. 웹에서 리뷰 30~50개를 크롤링합니다. (블로킹 I/O이므로 스레드에서 실행)
+    crawled_reviews = await asyncio.to_thread(crawl_reviews_for_summary, place_name)
+    
+    # 2. 광고성 리뷰를 필터링합니다.
+    filtered_reviews = filter_ad_reviews(crawled_reviews)
+    
+    if not filtered_reviews:
+        return None, None # 요약할 리뷰가 없으면 종료
+
+    return await summarize_reviews(place_name, filtered_reviews)
+
+async def summarize_reviews(place_name: str, filtered_reviews: List[str]):
+    """광고가 걸러진 리뷰를 Gemini로 요약하고 임베딩하여 (요약 정보, 벡터)를 반환합니다."""
+    # 3. 깨끗한 리뷰들을 Gemini에 보내 상세 정보 요약을 요청합니다.
+    reviews_text = "\n".join(filtered_reviews)
+    summary_prompt = f"""
+    [지시]
+    아래는 '{place_name}'에 대한 실제 방문자 리뷰야.
+    리뷰 내용을 바탕으로 아래 [답변 형식]에 맞춰 JSON 객체로만 답변해줘.
+
+    [리뷰]
+    {reviews_text}
+
+    [답변 형식]
+    {{
+        "summary_pros": ["장점1", "장점2", "장점3"],
+        "summary_cons": ["단점1", "단점2", "단점3"],
+        "keywords": ["키워드1", "키워드2", "키워드3", "키워드4", "키워드5"],
+        "signature_menu": "대표 메뉴",
+        "summary_price": "가격대"
+    }}
+    """
+
+    # 4. 요약 요청과 리뷰 벡터화는 서로 독립적이므로 동시에 실행합니다.
+    summary_info, vector = await asyncio.gather(
+        generate_json(summary_prompt, _parse_summary, response_schema=SUMMARY_RESPONSE_SCHEMA),
+        embedding_service.embed(reviews_text),
+        return_exceptions=True,
+    )
+    if isinstance(vector, BaseException):
+        raise vector
+    if isinstance(summary_info, BaseException):
+        print(f"요약 결과 파싱 오류: {place_name}, {summary_info}")
+        summary_info = {}
+    return summary_info, vector
+
+
+# Gemini JSON 모드 응답 스키마 (필드 이름은 schemas.RestaurantDetail과 같게 하여 바로 검증)
+_STRING = {"type": "STRING"}
+_STRING_LIST = {"type": "ARRAY", "items": _STRING}
+SUMMARY_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "summary_pros": _STRING_LIST,
+        "summary_cons": _STRING_LIST,
+        "keywords": _STRING_LIST,
+        "signature_menu": _STRING,
+        "summary_price": _STRING,
+    },
+}
+RESTAURANT_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "name": _STRING,
+        "address": _STRING,
+        "summary_pros": _STRING_LIST,
+        "summary_cons": _STRING_LIST,
+        "keywords": _STRING_LIST,
+        "nearby_attractions": _STRING_LIST,
+        "signature_menu": _STRING,
+        "summary_price": _STRING,
+        "summary_opening_hours": _STRING,
+        "summary_parking": _STRING,
+        "summary_phone": _STRING,
+    },
+    "required": ["name", "address"],
+}
+RECOMMENDATION_RESPONSE_SCHEMA = {"type": "ARRAY", "items": RESTAURANT_RESPONSE_SCHEMA}
+COURSE_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"title": _STRING, "steps": {"type": "ARRAY", "items": RESTAURANT_RESPONSE_SCHEMA}},
+        "required": ["title", "steps"],
+    },
+}
+RERANK_RESPONSE_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "answer": _STRING,
+        "picks": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {"id": {"type": "INTEGER"}, "reason": _STRING},
+                "required": ["id", "reason"],
+            },
+        },
+    },
+    "required": ["answer", "picks"],
+}
+
+
+def _parse_summary(value) -> dict:
+    if not isinstance(value, dict):
+        raise StructuredOutputError(f"JSON 객체가 아닙니다: {type(value).__name__}")
+    # RestaurantDetail 필드 형식으로 검증 후 요약 필드만 사용
+    detail = schemas.RestaurantDetail(name="", address="", **{key: value[key] for key in SUMMARY_RESPONSE_SCHEMA["properties"] if key in value})
+    return detail.dict(include=set(SUMMARY_RESPONSE_SCHEMA["properties"]), exclude_none=True)
+
+
+# 맛집 추천 로직
+def _build_recommendation_prompt(context: UserContext, prompt: str) -> str:
+    """사용자 정보와 요청으로 Gemini 추천 프롬프트를 생성합니다."""
+    # 1. Gemini에게 맛집 3곳의 '이름'과 상세 요약 정보'를 모두 요청하는 프롬프트
+    return f"""
+    [지시]
+    너는 맛집 정보를 누구보다 잘 아는 전문가야.
+    웹 검색을 통해서 아래 사용자 정보와 프롬프트 요청에 가장 적절한 
+    각 맛집에 대한 상세 정보도 함께 찾아서 아래 [답변 형식]에 맞춰 완벽한 JSON 배열로만 답변해줘.
+    광고성 리뷰, 바이럴 마케팅 리뷰가 들어가면 안 돼.
+
+    
+    [사용자 정보]
+    {context.prompt_block}
+     
+    [사용자 요청]
+    "{prompt}"   
+    
+    [답변 형식]
+    맛집 3곳을 아래 형식의 객체로 담은 JSON 배열
+    {{
+        "name": "추천 맛집 이름",
+        "address": "맛집 주소",
+        "summary_pros": ["장점1", "장점2", "장점3"],
+        "summary_cons": ["단점1", "단점2", "단점3"],
+        "keywords": ["키워드1", "키워드2", "키워드3"],
+        "signature_menu": "시그니처 메뉴1, 시그니처 메뉴2",
+        "summary_price": "가격대 (예: 1~2만원대)",
+        "summary_opening_hours": "영업시간 (예: 매일 11:00~22:00, 브레이크타임 15:00~17:00, 월요일 휴무)",
+        "summary_parking": "주차 가능 여부 (예: 가능, 불가능, 유료)",
+        "summary_phone": "전화번호",
+        "nearby_attractions": ["주변 놀거리1", "주변 놀거리2", "주변 놀거리3"]
+    }}
+
+    [주의사항]
+    - 실제 존재하는 맛집이 맞는지 반드시 확인해야 해.
+    - 사용자의 관심사와 알러지 정보를 반드시 반영해야 해.
+    """
+
+async def _verify_stage(candidate: schemas.RestaurantDetail):
+    """1단계: 네이버 API로 기본 정보 검증"""
+    place_basic_info = await verify_place_with_naver(candidate.name)
+    if not place_basic_info:
+        return None
+    return candidate, place_basic_info
+
+async def _load_restaurant_by_name(name: str) -> Optional[models.Restaurant]:
+    async with AsyncSessionLocal() as db:
+        return await db.run_sync(crud.get_restaurant_by_name, name)
+
+def _precomputed_summary(restaurant: models.Restaurant) -> dict:
+    """summary_pipeline.py가 저장해 둔 요약 필드"""
+    detail = restaurant_to_detail(restaurant)
+    return {field: detail[field] for field in SUMMARY_DETAIL_FIELDS if detail.get(field)}
+
+async def _summary_stage(verified):
+    """2단계: 상세 정보 조합 (DB에 미리 계산된 요약이 있으면 사용, DB에 없는 장소만 크롤링 -> 필터링 -> 요약 -> 벡터화)"""
+    candidate, place_basic_info = verified
+    restaurant = await _load_restaurant_by_name(candidate.name)
+    if restaurant is not None and restaurant.summary_updated_at is not None:
+        summary_info = _precomputed_summary(restaurant)
+    elif restaurant is not None:
+        # DB에 있지만 아직 요약되지 않은 음식점은 요청 안에서 계산하지 않고 작업 큐에 넘김 (다음 요청부터 요약 포함)
+        summary_info = None
+        try:
+            await asyncio.to_thread(
+                enqueue_job, "summarize_restaurant", {"restaurant_id": restaurant.id},
+                f"summary:{restaurant.id}", SUMMARY_JOB_PRIORITY,
+            )
+        except Exception as e:
+            print(f"요약 작업 추가 오류: {e}")
+    else:
+        summary_info, _ = await get_restaurant_summary_and_vectorize(candidate.name)
+    
+    # 프론트엔드에 전달할 최종 데이터 조합 (Gemini가 준 정보 위에 검증된 정보와 리뷰 요약을 덮어씀)
+    return {
+        **candidate.dict(exclude_none=True, exclude_defaults=True),
+        "name": place_basic_info.get('title', '').replace('<b>', '').replace('</b>', ''),
+        "address": place_basic_info.get('roadAddress'),
+        "mapx": place_basic_info.get('mapx'),
+        "mapy": place_basic_info.get('mapy'),
+        "image_url": place_basic_info.get('image_url'),
+        **(summary_info or {}) # 요약된 상세 정보를 여기에 추가
+    }
+
+# 장소별 검증/요약 단계를 장소 간 병렬로 실행하는 추천 파이프라인
+recommendation_pipeline = Pipeline(
+    stages=[
+        Stage("verify", _verify_stage, timeout=RECOMMEND_VERIFY_TIMEOUT),
+        Stage("summary", _summary_stage, timeout=RECOMMEND_SUMMARY_TIMEOUT),
+    ],
+    concurrency=RECOMMEND_CONCURRENCY,
+    deadline=RECOMMEND_DEADLINE,
+)
+
+async def _recommend_places(context: UserContext, prompt: str) -> List[schemas.RestaurantDetail]:
+    """Gemini에게 추천 맛집 목록을 JSON으로 요청하여 RestaurantDetail로 검증합니다. (비슷한 요청은 시맨틱 캐시에서 재사용)"""
+    candidates = await generate_json(
+        _build_recommendation_prompt(context, prompt),
+        lambda value: parse_model_list(value, schemas.RestaurantDetail, "추천 맛집"),
+        response_schema=RECOMMENDATION_RESPONSE_SCHEMA,
+        cache_prompt=prompt,
+        namespace=context.namespace,
+    )
+    return candidates[:3]
+
+async def _stream_places(context: UserContext, prompt: str) -> AsyncIterator[schemas.RestaurantDetail]:
+    """추천 맛집을 스트리밍으로 요청하여, 객체 하나가 완성될 때마다 검증하여 내보냅니다."""
+    count = 0
+    async for item in stream_json_array(
+        _build_recommendation_prompt(context, prompt),
+        response_schema=RECOMMENDATION_RESPONSE_SCHEMA,
+        cache_prompt=prompt,
+        namespace=context.namespace,
+    ):
+        try:
+            candidate = schemas.RestaurantDetail.model_validate(item)
+        except ValueError as e:
+            print(f"추천 맛집 검증 오류: {e}")
+            continue
+        yield candidate
+        count += 1
+        if count >= 3:
+            return
+
+async def _personalized_query_vector(query: str, context: Optional[UserContext]) -> List[float]:
+    """검색어 벡터에 사용자 선호 벡터를 USER_PREFERENCE_WEIGHT 비율로 섞은 벡터"""
+    query_vector = await embedding_service.embed(query)
+    preference_vector = await context.preference_vector() if context and USER_PREFERENCE_WEIGHT else None
+    if not preference_vector:
+        return query_vector
+    query_array = np.asarray(query_vector, dtype=np.float32)
+    preference_array = np.asarray(preference_vector, dtype=np.float32)
+    query_array /= np.linalg.norm(query_array) or 1
+    preference_array /= np.linalg.norm(preference_array) or 1
+    return (query_array + USER_PREFERENCE_WEIGHT * preference_array).tolist()
+
+async def _retrieve_candidates(
+    db: AsyncSession,
+    context: UserContext,
+    prompt: str,
+    k: int = RECOMMEND_CANDIDATES,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+) -> List[Tuple[models.Restaurant, float]]:
+    """요청과 가까운 음식점 후보를 restaurants 테이블의 pgvector 인덱스에서 (음식점, 유사도) 목록으로 가져옵니다."""
+    query_vector = await _personalized_query_vector(prompt, context)
+    return await db.run_sync(
+        lambda session: PgVectorIndex(session).search_restaurants(query_vector, k, category, location)
+    )
+
+def _candidate_line(restaurant: models.Restaurant) -> str:
+    """Gemini에 보낼 후보 한 줄 요약 (토큰을 줄이기 위해 판단에 필요한 필드만 포함)"""
+    average = rating_average(restaurant)
+    fields = [
+        f"id={restaurant.id}",
+        restaurant.name,
+        restaurant.summary_category,
+        restaurant.summary_address,
+        f"메뉴: {restaurant.summary_feature_menu}" if restaurant.summary_feature_menu else None,
+        f"가격: {restaurant.summary_price}" if restaurant.summary_price else None,
+        f"평점: {average} ({restaurant.rating_count}명)" if average is not None else None,
+        (restaurant.summary_description or "")[:80] or None,
+    ]
+    return " | ".join(field for field in fields if field)
+
+def _build_rerank_prompt(context: UserContext, prompt: str, candidates: List[models.Restaurant]) -> str:
+    candidate_lines = "\n    ".join(_candidate_line(restaurant) for restaurant in candidates)
+    return f"""
+    [지시]
+    너는 맛집 추천 전문가야.
+    아래 [후보] 중에서만 사용자 정보와 요청에 가장 적절한 맛집 3곳을 골라 적절한 순서로 정렬하고,
+    사용자에게 보여줄 짧은 안내 문장(answer)과 맛집별 추천 이유(reason)를 JSON으로 답변해줘.
+    후보에 없는 맛집은 절대 추천하지 말고, 알러지 정보와 맞지 않는 맛집은 제외해.
+
+    [사용자 정보]
+    {context.prompt_block}
+
+    [사용자 요청]
+    "{prompt}"
+
+    [후보]
+    {candidate_lines}
+
+    [답변 형식]
+    {{"answer": "안내 문장", "picks": [{{"id": 후보 id, "reason": "추천 이유"}}, ...]}}
+    """
+
+async def _rerank_with_gemini(
+    context: UserContext, prompt: str, candidates: List[models.Restaurant]
+) -> Tuple[str, List[dict]]:
+    """후보 목록을 Gemini로 재정렬하여 (안내 문장, RestaurantDetail 딕셔너리 목록)을 반환합니다.
+
+    Gemini가 후보에 없는 id를 반환하면 무시하고, 호출이 실패하면 후보 순서(로컬 재정렬 순서)대로 상위 3곳을 반환합니다.
+    """
+    by_id = {restaurant.id: restaurant for restaurant in candidates}
+    try:
+        reranked = await generate_json(
+            _build_rerank_prompt(context, prompt, candidates),
+            _parse_rerank,
+            response_schema=RERANK_RESPONSE_SCHEMA,
+            cache_prompt=prompt,
+            # 후보 목록이 달라지면 캐시된 선택을 재사용하지 않음
+            namespace=f"{context.namespace}|rerank|{','.join(str(restaurant.id) for restaurant in candidates)}",
+        )
+    except Exception as e:
+        print(f"후보 재정렬 오류, 벡터 검색 순서 사용: {e}")
+        reranked = None
+
+    if reranked:
+        answer, picks = reranked
+        restaurants, seen = [], set()
+        for pick in picks:
+            restaurant = by_id.get(pick["id"])
+            if restaurant is None or restaurant.id in seen:
+                continue
+            seen.add(restaurant.id)
+            restaurants.append({**restaurant_to_detail(restaurant), "reason": pick["reason"] or None})
+            if len(restaurants) == 3:
+                break
+        if restaurants:
+            return answer or "맛집을 찾았어요! 사진을 터치해 상세 정보를 확인해보세요.", restaurants
+    return "맛집을 찾았어요! 사진을 터치해 상세 정보를 확인해보세요.", [restaurant_to_detail(restaurant) for restaurant in candidates[:3]]
+
+def _parse_rerank(value) -> Tuple[str, List[dict]]:
+    if not isinstance(value, dict) or not isinstance(value.get("picks"), list):
+        raise StructuredOutputError("answer와 picks를 가진 JSON 객체가 아닙니다")
+    picks = []
+    for pick in value["picks"]:
+        try:
+            picks.append({"id": int(pick["id"]), "reason": str(pick.get("reason") or "")})
+        except (KeyError, TypeError, ValueError):
+            continue
+    if value["picks"] and not picks:
+        raise StructuredOutputError("picks에 올바른 id가 없습니다")
+    return str(value.get("answer") or ""), picks
+
+async def _recommend_from_candidates(
+    db: AsyncSession,
+    context: UserContext,
+    prompt: str,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+) -> Optional[Tuple[str, List[dict]]]:
+    """retrieval 모드 추천: 벡터 검색 -> 로컬 재정렬 -> (필요할 때만) Gemini 선택/설명 (DB 후보가 없으면 None)"""
+    candidates = await _retrieve_candidates(db, context, prompt, category=category, location=location)
+    if not candidates:
+        return None
+    ranked = await reranker.rerank(prompt, context, candidates)
+    # 알러지 충돌 후보는 다른 후보가 있으면 제외
+    ranked = [result for result in ranked if not result.conflicts] or ranked
+    if not _needs_gemini(prompt):
+        return _local_answer(prompt, ranked)
+    return await _rerank_with_gemini(context, prompt, [result.restaurant for result in ranked])
+
+def _needs_gemini(prompt: str) -> bool:
+    if RECOMMEND_GEMINI == "always":
+        return True
+    if RECOMMEND_GEMINI == "never":
+        return False
+    return len(prompt.split()) > RECOMMEND_SIMPLE_QUERY_WORDS
+
+def _local_answer(prompt: str, ranked: List[RerankResult]) -> Tuple[str, List[dict]]:
+    """LLM 호출 없이 재정렬 결과 상위 3곳과 특징 기반 추천 이유로 응답"""
+    restaurants = [{**restaurant_to_detail(result.restaurant), "reason": result.reason()} for result in ranked[:3]]
+    return f"'{prompt}'에 어울리는 맛집을 찾았어요! 사진을 터치해 상세 정보를 확인해보세요.", restaurants
+
+async def get_recommendation_for_user(
+    context: UserContext,
+    prompt: str,
+    db: Optional[AsyncSession] = None,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+):
+    """사용자 정보와 요청을 바탕으로 맛집 3곳을 추천하고 상세 정보를 반환합니다.
+
+    retrieval 모드에서는 DB 후보를 Gemini가 재정렬만 하므로 외부 호출이 Gemini 1회로 줄어듭니다.
+    """
+    if RECOMMEND_MODE == "retrieval" and db is not None:
+        try:
+            recommended = await _recommend_from_candidates(db, context, prompt, category, location)
+        except Exception as e:
+            # 후보 검색/재정렬이 실패하면 generate 방식으로 추천
+            print(f"Recommendation error: {e}")
+            recommended = None
+        if recommended is not None:
+            answer, restaurants = recommended
+            return {"answer": answer, "restaurants": restaurants}
+
+    try:
+        candidates = await _recommend_places(context, prompt)
+        
+        # 장소별 단계는 동시에 실행되며, 마감 시간 안에 완료된 장소만 포함됩니다.
+        verified_restaurants = await recommendation_pipeline.run(candidates)
+        
+        if verified_restaurants:
+            return {"answer": "맛집을 찾았어요! 사진을 터치해 상세 정보를 확인해보세요.", "restaurants": verified_restaurants}
+        else:
+            return {"answer": "맛집을 찾을 수 없었어요.", "restaurants": []}
+            
+    except Exception as e:
+        print(f"Recommendation error: {e}")
+        return {"answer": "추천 생성 중 문제가 발생했습니다.", "restaurants": []}
+
+async def stream_recommendation_for_user(
+    context: UserContext,
+    prompt: str,
+    category: Optional[str] = None,
+    location: Optional[str] = None,
+):
+    """추천 결과를 청크 단위로 내보냅니다.
+
+    answer 청크(RecommendationResponse, restaurants는 빈 목록)를 먼저 보낸 뒤
+    검증이 끝나는 순서대로 restaurant 청크(RestaurantDetail)를 하나씩 보내고, 마지막에 done 청크를 보냅니다.
+    generate 모드에서는 Gemini 응답을 스트리밍으로 받아, 맛집 객체 하나가 완성되는 즉시 해당 장소의 검증을 시작합니다.
+    """
+    if RECOMMEND_MODE == "retrieval":
+        try:
+            # 스트리밍 응답은 요청 의존성(세션)이 정리된 뒤에도 실행될 수 있으므로 별도 세션 사용
+            async with AsyncSessionLocal() as db:
+                recommended = await _recommend_from_candidates(db, context, prompt, category, location)
+        except Exception as e:
+            print(f"Recommendation error: {e}")
+            recommended = None
+        if recommended is not None:
+            answer, restaurants = recommended
+            yield {"type": "answer", "data": schemas.RecommendationResponse(answer=answer, restaurants=[]).dict()}
+            for restaurant in restaurants:
+                yield {"type": "restaurant", "data": schemas.RestaurantDetail(**restaurant).dict()}
+            yield {"type": "done", "data": {"count": len(restaurants)}}
+            return
+
+    yield {"type": "answer", "data": schemas.RecommendationResponse(answer="맛집을 찾았어요! 사진을 터치해 상세 정보를 확인해보세요.", restaurants=[]).dict()}
+
+    count = 0
+    async for _, restaurant in recommendation_pipeline.iter_completed(_stream_places(context, prompt)):
+        try:
+            detail = schemas.RestaurantDetail(**restaurant)
+        except ValueError as e:
+            print(f"추천 결과 검증 오류: {restaurant.get('name')}, {e}")
+            continue
+        count += 1
+        yield {"type": "restaurant", "data": detail.dict()}
+
+    done = {"count": count}
+    if not count:
+        done["answer"] = "맛집을 찾을 수 없었어요."
+    yield {"type": "done", "data": done}
+
+
+# 음식점 벡터 검색
+# 미리 계산해 두는 요약 필드 (RestaurantDetail 기준)
+SUMMARY_DETAIL_FIELDS = ("summary_pros", "summary_cons", "keywords", "signature_menu", "summary_price")
+
+def restaurant_to_detail(restaurant: models.Restaurant) -> dict:
+    """DB 음식점 모델을 RestaurantDetail 형식의 딕셔너리로 변환합니다."""
+    return {
+        "name": restaurant.name,
+        "address": restaurant.summary_address or "",
+        "image_url": restaurant.image_url,
+        "signature_menu": restaurant.summary_feature_menu,
+        "summary_phone": restaurant.summary_phone,
+        "summary_parking": restaurant.summary_parking,
+        "summary_price": restaurant.summary_price,
+        "summary_opening_hours": restaurant.summary_opening_hours,
+        "summary_pros": restaurant.summary_pros,
+        "summary_cons": restaurant.summary_cons,
+        "keywords": restaurant.summary_keywords,
+        # 비정규화 집계 컬럼 (reviews를 집계하지 않음, 조회수는 아직 반영되지 않은 증가분 포함)
+        "view_count": (restaurant.view_count or 0) + view_counter.pending(restaurant.id),
+        "like_count": restaurant.like_count or 0,
+        "dislike_count": restaurant.dislike_count or 0,
+        "bookmark_count": restaurant.bookmark_count or 0,
+        "comment_count": restaurant.comment_count or 0,
+        "share_count": restaurant.share_count or 0,
+        "is_favorite_count": restaurant.is_favorite_count or 0,
+        "rating_average": rating_average(restaurant),
+        "rating_count": restaurant.rating_count or 0,
+    }
+
+async def search_similar_restaurants(
+    db: Session,
+    query: str,
+    k: int = 10,
+    category: str = None,
+    location: str = None,
+    ef_search: int = None,
+    context: Optional[UserContext] = None,
+) -> List[dict]:
+    """검색어와 의미가 가까운 음식점을 pgvector 인덱스에서 찾아 반환합니다.
+
+    context가 주어지면 검색어 벡터에 사용자 관심사 벡터를 USER_PREFERENCE_WEIGHT 비율로 섞어 개인화합니다.
+    """
+    query_vector = await _personalized_query_vector(query, context)
+    # DB 조회는 블로킹 I/O이므로 스레드에서 실행
+    results = await asyncio.to_thread(
+        PgVectorIndex(db).search_restaurants, query_vector, k, category, location, ef_search
+    )
+    return [restaurant_to_detail(restaurant) for restaurant, _ in results]
+
+
+async def recommend_restaurants_for_user(
+    db: Session,
+    context: UserContext,
+    k: int = 10,
+    category: str = None,
+    location: str = None,
+) -> List[dict]:
+    """사용자 선호 벡터와 가까운 음식점을 반환합니다 (선호 벡터와 관심사가 모두 없으면 빈 목록)."""
+    preference_vector = await context.preference_vector()
+    if not preference_vector:
+        return []
+    results = await asyncio.to_thread(PgVectorIndex(db).search_restaurants, preference_vector, k, category, location)
+    return [restaurant_to_detail(restaurant) for restaurant, _ in results]
+
+
+async def create_date_course(request: schemas.CourseRequest, context: UserContext):
+    """사용자 정보와 제약 조건을 바탕으로 3가지 데이트 코스를 생성합니다."""
+    prompt = f"""
+    [지시]
+    당신은 최고의 데이트 코스 플래너입니다.
+    아래 사용자 정보와 제약 조건을 모두 고려하여, 최적의 데이트 코스 3가지를 추천해주세요.
+    각 장소의 예상 소요 시간, 영업 시간, 날씨(현재 서울 날씨) 등을 종합적으로 고려해야 합니다.
+
+    [사용자 정보]
+    {context.prompt_block}
+    
+    [제약 조건]
+    - 지역: {request.location}
+    - 일정: {request.start_time} 부터 {request.end_time} 까지
+    - 테마/목적: {request.theme}
+
+    [답변 형식]
+    코스 3개를 담은 JSON 배열. 각 코스는 제목(title, 예: "코스 1: 성수동 감성 카페와 예술 산책")과
+    방문 순서대로 나열한 장소 목록(steps)으로 구성하고, 각 장소에는 이름(name)과 주소(address)를 반드시 포함해줘.
+    """
+    try:
+        # 같은 조건의 비슷한 코스 요청은 시맨틱 캐시에서 재사용
+        courses = await generate_json(
+            prompt,
+            lambda value: parse_model_list(value, schemas.CourseDetail, "데이트 코스"),
+            response_schema=COURSE_RESPONSE_SCHEMA,
+            cache_prompt=f"{request.location} {request.theme}",
+            namespace=f"{context.namespace}|{request.start_time}|{request.end_time}",
+        )
+        return {"courses": courses}
+    except Exception as e:
+        print(f"Course generation error: {e}")
+        return {"courses": []}
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from ..semantic_cache import SemanticCache
+from ..structured_output import JsonArrayStreamParser, StructuredOutputError, extract_json, parse_with_repair
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# API Key 및 모델 설정
+# Gemini API 설정
+genai.configure(api_key=os.getenv("GENAI_API_KEY"))
+
+# 사용할 Gemini 모델 객체 생성
+gemini_model = genai.GenerativeModel("gemini-1.5-flash")
+
+# Gemini 응답 시맨틱 캐시 설정 (환경 변수로 조정 가능)
+# GEMINI_CACHE_THRESHOLD : 캐시된 응답을 재사용할 최소 코사인 유사도
+# GEMINI_CACHE_TTL : 캐시 유지 시간 (초), GEMINI_CACHE_MAX_SIZE : 최대 항목 수
+gemini_cache = SemanticCache(
+    threshold=float(os.getenv("GEMINI_CACHE_THRESHOLD", "0.93")),
+    ttl=float(os.getenv("GEMINI_CACHE_TTL", "3600")),
+    max_size=int(os.getenv("GEMINI_CACHE_MAX_SIZE", "1000")),
+)
+
+# JSON 응답이 파싱/검증에 실패했을 때 오류를 알려주고 다시 요청하는 최대 횟수
+GEMINI_JSON_MAX_REPAIRS = int(os.getenv("GEMINI_JSON_MAX_REPAIRS", "1"))
+
+T = TypeVar("T")
+
+
+def _json_config(response_schema: Optional[dict]) -> dict:
+    """JSON 모드 생성 설정 (response_schema가 주어지면 해당 스키마로 출력을 제한)"""
+    config = {"response_mime_type": "application/json"}
+    if response_schema is not None:
+        config["response_schema"] = response_schema
+    return config
+
+
+def _repair(response_schema: Optional[dict]) -> Callable[[str], Awaitable[str]]:
+    """parse_with_repair에 넘길 수정 요청 함수 (JSON 모드로 Gemini를 다시 호출)"""
+    async def repair(prompt: str) -> str:
+        response = await gemini_model.generate_content_async(prompt, generation_config=_json_config(response_schema))
+        return response.text
+    return repair
+
+
+async def generate_json(
+    prompt: str,
+    parse: Callable[[Any], T],
+    response_schema: Optional[dict] = None,
+    cache_prompt: Optional[str] = None,
+    namespace: str = "",
+    max_repairs: int = GEMINI_JSON_MAX_REPAIRS,
+) -> T:
+    """JSON 모드로 생성한 응답을 파싱하여 parse(값)의 결과를 반환합니다.
+
+    파싱/검증에 실패하면 오류 내용과 함께 최대 max_repairs번 수정을 요청하고, 그래도 실패하면 StructuredOutputError를 발생시킵니다.
+    캐시에는 검증을 통과한 응답만 저장합니다.
+    """
+    vector = None
+    if cache_prompt is not None:
+        cached, vector = await gemini_cache.lookup(cache_prompt, namespace)
+        if cached is not None:
+            try:
+                return parse(extract_json(cached))
+            except ValueError as e:
+                print(f"캐시된 Gemini 응답 파싱 오류, 다시 생성: {e}")
+
+    response = await gemini_model.generate_content_async(prompt, generation_config=_json_config(response_schema))
+    result, text = await parse_with_repair(response.text, parse, _repair(response_schema), max_repairs)
+    if cache_prompt is not None:
+        await gemini_cache.store(cache_prompt, text, namespace, vector=vector)
+    return result
+
+
+async def stream_json_array(
+    prompt: str,
+    response_schema: Optional[dict] = None,
+    cache_prompt: Optional[str] = None,
+    namespace: str = "",
+    max_repairs: int = GEMINI_JSON_MAX_REPAIRS,
+) -> AsyncIterator[Any]:
+    """JSON 배열 응답을 스트리밍으로 받아, 원소 객체가 완성되는 즉시 하나씩 내보냅니다.
+
+    전체 응답을 기다리지 않으므로 첫 원소를 빨리 처리할 수 있습니다.
+    파싱하지 못한 원소는 스트림이 끝난 뒤 최대 max_repairs번 수정을 요청하여 내보내고,
+    배열이 끝까지 올바르게 파싱된 응답만 캐시에 저장합니다.
+    """
+    parser = JsonArrayStreamParser()
+    vector = None
+    if cache_prompt is not None:
+        cached, vector = await gemini_cache.lookup(cache_prompt, namespace)
+        if cached is not None:
+            for item in parser.feed(cached):
+                yield item
+            return
+
+    chunks, count = [], 0
+    response = await gemini_model.generate_content_async(
+        prompt, generation_config=_json_config(response_schema), stream=True
+    )
+    async for chunk in response:
+        chunks.append(chunk.text)
+        for item in parser.feed(chunk.text):
+            count += 1
+            yield item
+
+    if parser.finished and not parser.failed:
+        if cache_prompt is not None:
+            await gemini_cache.store(cache_prompt, "".join(chunks), namespace, vector=vector)
+        return
+
+    # 파싱하지 못한 원소만 모아 수정 요청 (이미 내보낸 원소는 다시 요청하지 않음)
+    # 배열을 하나도 읽지 못했으면 응답 전체를 수정 요청
+    if parser.failed:
+        broken = "[" + ",".join(parser.failed) + "]"
+        print(f"Gemini 스트리밍 JSON 원소 파싱 오류 {len(parser.failed)}개: {parser.errors[0]}")
+    elif not count:
+        broken = "".join(chunks)
+        print("Gemini 스트리밍 응답에서 JSON 배열을 찾지 못했습니다")
+    else:
+        return
+    try:
+        repaired, _ = await parse_with_repair(
+            broken, lambda value: value if isinstance(value, list) else [value], _repair(response_schema), max_repairs
+        )
+    except StructuredOutputError as e:
+        print(f"Gemini 스트리밍 JSON 수정 실패: {e}")
+        return
+    for item in repaired:
+        yield item
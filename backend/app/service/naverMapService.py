@@ -0,0 +1,122 @@
+import asyncio
+import os
+import random
+from typing import Any, Dict, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+# .env 파일에서 환경변수 로드
+load_dotenv()
+
+# HTTP/2는 h2 패키지가 설치된 경우에만 사용 (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# 네이버 API 연결 설정 (환경 변수로 조정 가능)
+# NAVER_API_BASE_URL을 로컬 주소로 바꾸면 가짜 네이버 서버를 대상으로 테스트할 수 있음
+NAVER_API_BASE_URL = os.getenv("NAVER_API_BASE_URL", "https://openapi.naver.com")
+NAVER_HTTP_TIMEOUT = float(os.getenv("NAVER_HTTP_TIMEOUT", "5.0"))
+NAVER_HTTP_MAX_CONNECTIONS = int(os.getenv("NAVER_HTTP_MAX_CONNECTIONS", "20"))
+NAVER_HTTP_MAX_KEEPALIVE = int(os.getenv("NAVER_HTTP_MAX_KEEPALIVE", "10"))
+NAVER_HTTP_RETRIES = int(os.getenv("NAVER_HTTP_RETRIES", "2"))
+NAVER_HTTP_BACKOFF = float(os.getenv("NAVER_HTTP_BACKOFF", "0.2"))
+
+# 재시도할 HTTP 상태 코드 (요청 한도 초과, 일시적인 서버 오류)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class NaverApiClient:
+    """keep-alive 커넥션 풀을 공유하는 네이버 검색 API 비동기 클라이언트
+
+    모든 요청이 openapi.naver.com 한 호스트로 향하므로 풀의 연결 수 제한이 곧 호스트별 제한이 됩니다.
+    """
+
+    def __init__(
+        self,
+        client_id: Optional[str] = None,
+        client_secret: Optional[str] = None,
+        base_url: str = NAVER_API_BASE_URL,
+        timeout: float = NAVER_HTTP_TIMEOUT,
+        max_connections: int = NAVER_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = NAVER_HTTP_MAX_KEEPALIVE,
+        retries: int = NAVER_HTTP_RETRIES,
+        backoff: float = NAVER_HTTP_BACKOFF,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.client_id = client_id or os.getenv("NAVER_CLIENT_ID")
+        self.client_secret = client_secret or os.getenv("NAVER_CLIENT_SECRET")
+        self.base_url = base_url
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """공유 AsyncClient를 반환 (최초 호출 시 생성)"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers={
+                    "X-Naver-Client-Id": self.client_id or "",
+                    "X-Naver-Client-Secret": self.client_secret or "",
+                },
+                timeout=httpx.Timeout(self.timeout),
+                limits=self.limits,
+                http2=HTTP2_AVAILABLE and self.transport is None,
+                transport=self.transport,
+            )
+        return self._client
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """지수 백오프 + 지터 (0.2s, 0.4s, 0.8s ...)"""
+        return self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """GET 요청 후 JSON 응답을 반환하며, 재시도 후에도 실패하면 None을 반환"""
+        client = self._get_client()
+        for attempt in range(self.retries + 1):
+            try:
+                response = await client.get(path, params=params)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.retries:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                response.raise_for_status()
+                return response.json()
+            except httpx.TransportError as e:
+                # 연결 실패, 타임아웃 등 네트워크 오류는 재시도
+                if attempt < self.retries:
+                    await asyncio.sleep(self._backoff_delay(attempt))
+                    continue
+                print(f"네이버 API 호출 중 오류 발생: {path}, {e}")
+                return None
+            except (httpx.HTTPStatusError, ValueError) as e:
+                print(f"네이버 API 호출 중 오류 발생: {path}, {e}")
+                return None
+        return None
+
+    async def search_local(self, query: str, display: int = 1) -> Optional[Dict[str, Any]]:
+        """네이버 지역 검색"""
+        return await self.get_json("/v1/search/local.json", params={"query": query, "display": display})
+
+    async def search_image(self, query: str, display: int = 1, sort: str = "sim") -> Optional[Dict[str, Any]]:
+        """네이버 이미지 검색"""
+        return await self.get_json("/v1/search/image", params={"query": query, "display": display, "sort": sort})
+
+    async def aclose(self):
+        """커넥션 풀 정리"""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+
+
+# 애플리케이션 전체에서 공유하는 네이버 API 클라이언트
+naver_client = NaverApiClient()
@@ -0,0 +1,159 @@
+import json
+import re
+from typing import Any, Awaitable, Callable, List, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ValidationError
+
+# 닫는 괄호 앞의 쉼표 (LLM이 자주 남기는 문법 오류)
+_TRAILING_COMMA = re.compile(r",(\s*[\]}])")
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+T = TypeVar("T")
+
+
+class StructuredOutputError(ValueError):
+    """LLM 응답에서 기대한 JSON 구조를 얻지 못함"""
+
+
+def _loads(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # 문자열 밖의 쉼표만 제거하는 완전한 처리는 아니지만, 실패한 경우에만 한 번 시도
+        return json.loads(_TRAILING_COMMA.sub(r"\1", text))
+
+
+def extract_json(text: str) -> Any:
+    """응답 텍스트에서 첫 번째 JSON 값(객체/배열)을 파싱 (코드 펜스, 앞뒤 설명 문장은 무시)"""
+    text = _CODE_FENCE.sub("", text.strip())
+    starts = [index for index in (text.find("["), text.find("{")) if index >= 0]
+    if not starts:
+        raise StructuredOutputError("JSON 값을 찾을 수 없습니다")
+    start = min(starts)
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)
+        return value
+    except json.JSONDecodeError:
+        pass
+    end = text.rfind("]" if text[start] == "[" else "}")
+    try:
+        return _loads(text[start:end + 1])
+    except json.JSONDecodeError as e:
+        raise StructuredOutputError(f"JSON 파싱 실패: {e}") from e
+
+
+class JsonArrayStreamParser:
+    """스트리밍으로 도착하는 JSON 배열 텍스트에서 최상위 원소 객체가 완성되는 즉시 반환하는 증분 파서
+
+    문자열/이스케이프 상태와 괄호 깊이만 추적하므로 청크마다 새로 들어온 문자만 한 번씩 검사합니다.
+    배열 앞의 코드 펜스나 설명 문장은 건너뛰고, 파싱할 수 없는 원소는 원문(failed)과 오류(errors)를 기록한 뒤 건너뜁니다.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._started = False
+        self._finished = False
+        self.failed: List[str] = []
+        self.errors: List[str] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        items = []
+        for char in chunk:
+            if self._finished:
+                break
+            if not self._started:
+                if char == "[":
+                    self._started = True
+                continue
+            if self._depth == 0:
+                # 원소 사이의 공백/쉼표는 무시하고, 객체 시작 또는 배열 끝만 처리
+                if char == "{":
+                    self._depth = 1
+                    self._buffer = [char]
+                elif char == "]":
+                    self._finished = True
+                continue
+            self._buffer.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    text = "".join(self._buffer)
+                    self._buffer = []
+                    try:
+                        items.append(_loads(text))
+                    except json.JSONDecodeError as e:
+                        self.failed.append(text)
+                        self.errors.append(str(e))
+        return items
+
+    @property
+    def finished(self) -> bool:
+        return self._finished
+
+
+def parse_model_list(value: Any, model: Type[BaseModel], label: Optional[str] = None) -> List[BaseModel]:
+    """JSON 배열의 원소를 model로 검증 (검증에 실패한 원소는 로그만 남기고 제외, 유효한 원소가 없으면 오류)"""
+    if isinstance(value, dict):
+        # {"restaurants": [...]} 처럼 배열을 객체로 한 번 감싼 응답 허용
+        value = next((item for item in value.values() if isinstance(item, list)), [value])
+    if not isinstance(value, list):
+        raise StructuredOutputError(f"JSON 배열이 아닙니다: {type(value).__name__}")
+    valid, errors = [], []
+    for item in value:
+        try:
+            valid.append(model.model_validate(item))
+        except ValidationError as e:
+            errors.append(str(e))
+    for error in errors:
+        print(f"{label or model.__name__} 검증 오류: {error}")
+    if value and not valid:
+        raise StructuredOutputError(f"유효한 {label or model.__name__} 항목이 없습니다: {errors[0]}")
+    return valid
+
+
+def _repair_prompt(text: str, error: Exception) -> str:
+    return f"""
+    아래 JSON 응답을 파싱/검증하는 중 오류가 발생했어.
+    내용은 바꾸지 말고 오류만 고쳐서 올바른 JSON만 답변해줘.
+
+    [오류]
+    {error}
+
+    [응답]
+    {text}
+    """
+
+
+async def parse_with_repair(
+    text: str,
+    parse: Callable[[Any], T],
+    repair: Callable[[str], Awaitable[str]],
+    max_repairs: int,
+) -> Tuple[T, str]:
+    """text를 파싱하여 (parse 결과, 최종 응답 텍스트)를 반환
+
+    실패하면 오류 내용을 담은 수정 요청 프롬프트로 repair(프롬프트 -> 새 응답 텍스트)를 최대 max_repairs번 호출하고,
+    그래도 실패하면 StructuredOutputError를 발생시킵니다.
+    """
+    for attempt in range(max_repairs + 1):
+        try:
+            return parse(extract_json(text)), text
+        except ValueError as e:  # StructuredOutputError, ValidationError 포함
+            if attempt == max_repairs:
+                raise StructuredOutputError(f"JSON 응답 수정 실패: {e}") from e
+            print(f"JSON 응답 오류, 수정 요청 ({attempt + 1}/{max_repairs}): {e}")
+            text = await repair(_repair_prompt(text, e))
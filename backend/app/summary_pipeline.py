@@ -0,0 +1,208 @@
+"""음식점 리뷰 요약 사전 계산 파이프라인
+
+요청 처리 중에 크롤링/요약/임베딩을 하지 않도록, 별도 프로세스에서 restaurants의 summary_* 컬럼과 vector를 미리 채웁니다.
+- 대상: 요약이 없거나, 마지막 요약 이후 새 리뷰가 SUMMARY_MIN_NEW_REVIEWS개 이상 쌓인 음식점 (rating_count 워터마크)
+- 리뷰 내용(sha256)이 마지막 요약 때와 같으면 Gemini를 호출하지 않고 워터마크만 갱신
+- 여러 음식점을 SUMMARY_WORKERS개 워커가 동시에 처리하고, Gemini 호출은 SUMMARY_RATE_PER_MINUTE로 제한
+
+실행 예:
+    cd backend
+    python -m app.summary_pipeline once          # 대상 음식점을 한 번 처리
+    python -m app.summary_pipeline loop          # SUMMARY_INTERVAL초마다 반복
+    python -m app.summary_pipeline restaurant 42 # 음식점 하나를 강제로 다시 요약
+    python -m app.summary_pipeline enqueue       # 대상 음식점을 작업 큐에 넣고 jobs 워커가 처리 (python -m app.jobs worker)
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import time
+from typing import Dict, List, Optional
+
+from . import crud, jobs
+from .database import SessionLocal
+from .service import crawl_reviews_for_summary, filter_ad_reviews, summarize_reviews
+
+# 요약 파이프라인 설정
+# SUMMARY_WORKERS : 동시에 처리할 음식점 수
+# SUMMARY_RATE_PER_MINUTE : 분당 최대 요약(Gemini) 호출 수
+# SUMMARY_MIN_NEW_REVIEWS : 다시 요약할 새 리뷰 수 기준
+# SUMMARY_MAX_REVIEWS : 요약에 사용할 최근 리뷰 수 (DB 리뷰 기준)
+# SUMMARY_BATCH_SIZE : 한 번에 가져올 대상 음식점 수
+# SUMMARY_INTERVAL : loop 모드의 실행 주기 (초)
+SUMMARY_WORKERS = int(os.getenv("SUMMARY_WORKERS", "4"))
+SUMMARY_RATE_PER_MINUTE = float(os.getenv("SUMMARY_RATE_PER_MINUTE", "30"))
+SUMMARY_MIN_NEW_REVIEWS = int(os.getenv("SUMMARY_MIN_NEW_REVIEWS", "5"))
+SUMMARY_MAX_REVIEWS = int(os.getenv("SUMMARY_MAX_REVIEWS", "50"))
+SUMMARY_BATCH_SIZE = int(os.getenv("SUMMARY_BATCH_SIZE", "100"))
+SUMMARY_INTERVAL = float(os.getenv("SUMMARY_INTERVAL", "300"))
+
+
+class RateLimiter:
+    """토큰 버킷 방식의 비동기 호출 빈도 제한 (분당 rate_per_minute회, 최대 burst회 연속 허용)"""
+
+    def __init__(self, rate_per_minute: float, burst: int = 1):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) * self.interval)
+
+
+def source_hash(reviews: List[str]) -> str:
+    """요약에 사용하는 리뷰 내용의 해시 (순서와 무관)"""
+    digest = hashlib.sha256()
+    for review in sorted(reviews):
+        digest.update(review.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _load_source(restaurant_id: int):
+    db = SessionLocal()
+    try:
+        restaurant = crud.get_restaurant_by_id(db, restaurant_id)
+        if restaurant is None:
+            return None
+        reviews = crud.get_recent_review_texts(db, restaurant_id, SUMMARY_MAX_REVIEWS)
+        return restaurant.name, restaurant.summary_source_hash, restaurant.rating_count or 0, reviews
+    finally:
+        db.close()
+
+
+def _save(restaurant_id: int, summary_info, vector, digest: Optional[str], review_count: int):
+    db = SessionLocal()
+    try:
+        crud.update_restaurant_summary(db, restaurant_id, summary_info, vector, digest, review_count)
+    finally:
+        db.close()
+
+
+def _stale_ids(min_new_reviews: int, limit: int) -> List[int]:
+    db = SessionLocal()
+    try:
+        return crud.get_restaurant_ids_needing_summary(db, min_new_reviews, limit)
+    finally:
+        db.close()
+
+
+def enqueue_stale(limit: int = SUMMARY_BATCH_SIZE, min_new_reviews: int = SUMMARY_MIN_NEW_REVIEWS) -> int:
+    """요약이 필요한 음식점마다 summarize_restaurant 작업을 추가하고 추가한 수를 반환 (이미 대기 중인 음식점은 중복 추가하지 않음)"""
+    restaurant_ids = _stale_ids(min_new_reviews, limit)
+    for restaurant_id in restaurant_ids:
+        jobs.enqueue_job("summarize_restaurant", {"restaurant_id": restaurant_id}, f"summary:{restaurant_id}")
+    return len(restaurant_ids)
+
+
+class SummaryPipeline:
+    """대상 음식점을 워커 풀로 요약하여 DB에 저장"""
+
+    def __init__(
+        self,
+        workers: int = SUMMARY_WORKERS,
+        rate_per_minute: float = SUMMARY_RATE_PER_MINUTE,
+        min_new_reviews: int = SUMMARY_MIN_NEW_REVIEWS,
+    ):
+        self.workers = max(1, workers)
+        self.min_new_reviews = min_new_reviews
+        self.limiter = RateLimiter(rate_per_minute)
+
+    async def refresh(self, restaurant_id: int, force: bool = False) -> str:
+        """음식점 하나를 요약하고 결과 상태(updated/unchanged/empty/failed/missing)를 반환"""
+        source = await asyncio.to_thread(_load_source, restaurant_id)
+        if source is None:
+            return "missing"
+        name, previous_hash, review_count, db_reviews = source
+        # 자체 리뷰와 크롤링한 리뷰를 함께 사용 (크롤링은 블로킹 I/O이므로 스레드에서 실행)
+        crawled_reviews = await asyncio.to_thread(crawl_reviews_for_summary, name)
+        reviews = filter_ad_reviews(db_reviews + crawled_reviews)
+        if not reviews:
+            await asyncio.to_thread(_save, restaurant_id, None, None, None, review_count)
+            return "empty"
+
+        digest = source_hash(reviews)
+        if digest == previous_hash and not force:
+            # 내용이 같으면 요약을 다시 만들지 않고 워터마크만 갱신
+            await asyncio.to_thread(_save, restaurant_id, None, None, digest, review_count)
+            return "unchanged"
+
+        await self.limiter.acquire()
+        summary_info, vector = await summarize_reviews(name, reviews)
+        if not summary_info:
+            # 다음 실행에서 다시 시도하도록 저장하지 않음
+            return "failed"
+        await asyncio.to_thread(_save, restaurant_id, summary_info, vector, digest, review_count)
+        return "updated"
+
+    async def run_once(self, limit: int = SUMMARY_BATCH_SIZE) -> Dict[str, int]:
+        """요약이 필요한 음식점을 최대 limit개 처리하고 상태별 개수를 반환"""
+        restaurant_ids = await asyncio.to_thread(_stale_ids, self.min_new_reviews, limit)
+        queue: "asyncio.Queue[int]" = asyncio.Queue()
+        for restaurant_id in restaurant_ids:
+            queue.put_nowait(restaurant_id)
+        stats: Dict[str, int] = {}
+
+        async def worker():
+            while True:
+                try:
+                    restaurant_id = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    status = await self.refresh(restaurant_id)
+                except Exception as e:
+                    print(f"음식점 요약 오류: restaurant_id={restaurant_id}, {e}")
+                    status = "failed"
+                stats[status] = stats.get(status, 0) + 1
+
+        await asyncio.gather(*(worker() for _ in range(min(self.workers, len(restaurant_ids)))))
+        return stats
+
+    async def run_forever(self, interval: float = SUMMARY_INTERVAL):
+        while True:
+            stats = await self.run_once()
+            if stats:
+                print(f"음식점 요약 완료: {stats}")
+            await asyncio.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    once_parser = commands.add_parser("once", help="요약이 필요한 음식점을 한 번 처리")
+    once_parser.add_argument("--limit", type=int, default=SUMMARY_BATCH_SIZE)
+    commands.add_parser("loop", help="SUMMARY_INTERVAL초마다 반복 실행")
+    restaurant_parser = commands.add_parser("restaurant", help="음식점 하나를 강제로 다시 요약")
+    restaurant_parser.add_argument("restaurant_id", type=int)
+    enqueue_parser = commands.add_parser("enqueue", help="요약이 필요한 음식점을 작업 큐에 추가")
+    enqueue_parser.add_argument("--limit", type=int, default=SUMMARY_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.command == "enqueue":
+        print(f"요약 작업 {enqueue_stale(args.limit)}개 추가")
+        return
+
+    pipeline = SummaryPipeline()
+    if args.command == "once":
+        print(asyncio.run(pipeline.run_once(args.limit)))
+    elif args.command == "loop":
+        asyncio.run(pipeline.run_forever())
+    elif args.command == "restaurant":
+        print(asyncio.run(pipeline.refresh(args.restaurant_id, force=True)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import os
+import re
+from datetime import date
+from typing import FrozenSet, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import crud, models
+from .cache import MISSING, MemoryCache
+from .embedding_service import embedding_service
+
+# 사용자 컨텍스트 캐시 설정
+# USER_CONTEXT_TTL : 캐시 유지 시간 (초), 워커 프로세스마다 따로 캐시하므로 다른 워커의 변경은 이 시간 안에 반영
+# USER_CONTEXT_MAX_SIZE : 캐시할 최대 사용자 수
+USER_CONTEXT_TTL = float(os.getenv("USER_CONTEXT_TTL", "300"))
+USER_CONTEXT_MAX_SIZE = int(os.getenv("USER_CONTEXT_MAX_SIZE", "10000"))
+
+_LIST_SEPARATOR = re.compile(r"[,/·\n]+")
+
+
+def parse_list(text: Optional[str]) -> Tuple[str, ...]:
+    """'데이트, 회식, 가족모임' 같은 쉼표 구분 문자열을 중복 없는 항목 목록으로 변환"""
+    if not text:
+        return ()
+    return tuple(dict.fromkeys(item.strip() for item in _LIST_SEPARATOR.split(text) if item.strip()))
+
+
+def age_bucket(birthdate: Optional[date], today: Optional[date] = None) -> str:
+    """생년월일을 '20대' 같은 연령대로 변환"""
+    if not birthdate:
+        return "알 수 없음"
+    today = today or date.today()
+    age = today.year - birthdate.year - ((today.month, today.day) < (birthdate.month, birthdate.day))
+    return f"{age // 10 * 10}대"
+
+
+class UserContext:
+    """추천/코스/검색에 필요한 사용자 프로필을 미리 가공해 둔 객체"""
+
+    def __init__(self, user: models.User):
+        self.user_id = user.user_id
+        self.name = user.name
+        self.gender = user.gender
+        self.interests: Tuple[str, ...] = parse_list(user.interests)
+        self.allergies: FrozenSet[str] = frozenset(parse_list(user.allergies_detail)) if user.allergies else frozenset()
+        self.age_bucket = age_bucket(user.birthdate)
+        self.interests_text = ", ".join(self.interests)
+        allergies_text = ", ".join(sorted(self.allergies)) or "없음"
+        # 프롬프트의 [사용자 정보] 블록 (요청마다 다시 만들지 않음)
+        self.prompt_block = (
+            f"- 관심사 : {self.interests_text or '없음'}\n"
+            f"    - 알러지 : {allergies_text}\n"
+            f"    - 성별 : {self.gender}\n"
+            f"    - 나이 : {self.age_bucket}"
+        )
+        # 응답 내용에 영향을 주는 프로필 값 (시맨틱 캐시는 이 값이 같을 때만 재사용)
+        self.namespace = f"{self.interests_text}|{allergies_text}|{self.gender}|{self.age_bucket}"
+        # 검색/리뷰 이력으로 쌓인 선호 벡터가 있으면 사용하고, 없으면 관심사 임베딩을 사용
+        stored_vector = getattr(user, "preference_vector", None)
+        self._preference_vector: Optional[List[float]] = None if stored_vector is None else list(stored_vector)
+
+    async def preference_vector(self) -> Optional[List[float]]:
+        """저장된 선호 벡터 또는 관심사 텍스트의 임베딩 (임베딩은 처음 요청할 때 한 번만 계산하여 보관)"""
+        if self._preference_vector is None and self.interests_text:
+            self._preference_vector = await embedding_service.embed(self.interests_text)
+        return self._preference_vector
+
+
+class UserContextCache:
+    """user_id -> UserContext LRU + TTL 캐시 (사용자 정보/리뷰가 바뀌면 무효화)"""
+
+    def __init__(self, ttl: float = USER_CONTEXT_TTL, max_size: int = USER_CONTEXT_MAX_SIZE):
+        self.ttl = ttl
+        self._cache = MemoryCache(max_size=max_size)
+        self.hits = 0
+        self.misses = 0
+
+    def _lookup(self, user_id: int):
+        context = self._cache.get(str(user_id))
+        if context is MISSING:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return context
+
+    def _store(self, user: Optional[models.User]) -> Optional[UserContext]:
+        if user is None:
+            return None
+        context = UserContext(user)
+        self._cache.set(str(user.user_id), context, self.ttl)
+        return context
+
+    async def get(self, db: AsyncSession, user_id: int) -> Optional[UserContext]:
+        """캐시에 없으면 비동기 세션으로 사용자를 조회하여 컨텍스트를 생성 (없는 사용자는 None)"""
+        context = self._lookup(user_id)
+        if context is not MISSING:
+            return context
+        return self._store(await db.run_sync(crud.get_user_by_id, user_id))
+
+    def get_sync(self, db: Session, user_id: int) -> Optional[UserContext]:
+        """동기 세션용 get"""
+        context = self._lookup(user_id)
+        if context is not MISSING:
+            return context
+        return self._store(crud.get_user_by_id(db, user_id))
+
+    def update_preference_vector(self, user_id: int, vector: Optional[List[float]]):
+        """캐시된 컨텍스트의 선호 벡터만 바꿈 (검색/리뷰마다 갱신되는 값이므로 컨텍스트 전체를 버리지 않음)"""
+        context = self._cache.get(str(user_id))
+        if context is not MISSING and vector is not None:
+            context._preference_vector = list(vector)
+
+    def invalidate(self, user_id: Optional[int]):
+        if user_id is not None:
+            self._cache.delete(str(user_id))
+
+    def stats(self):
+        return {"size": len(self._cache), "hits": self.hits, "misses": self.misses}
+
+
+# 애플리케이션 전체에서 공유하는 사용자 컨텍스트 캐시
+user_context_cache = UserContextCache()
+
+
+# preference.py가 검색/리뷰마다 갱신하는 컬럼 (이 컬럼만 바뀌면 컨텍스트를 무효화하지 않고 벡터만 교체)
+PREFERENCE_COLUMNS = ("preference_vector", "preference_weight", "preference_updated_at")
+
+
+# 사용자 정보가 수정되거나 새 리뷰가 작성되면 해당 사용자의 컨텍스트를 무효화
+# (ORM flush 시점에 실행되므로 crud.update_user_interests 외의 수정 경로도 모두 반영됨)
+@event.listens_for(models.User, "after_update")
+def _invalidate_user(mapper, connection, user):
+    state = inspect(user)
+    changed = {attr.key for attr in state.attrs if attr.history.has_changes()}
+    if changed and changed <= set(PREFERENCE_COLUMNS):
+        user_context_cache.update_preference_vector(user.user_id, user.preference_vector)
+        return
+    user_context_cache.invalidate(user.user_id)
+
+
+@event.listens_for(models.Review, "after_insert")
+def _invalidate_reviewer(mapper, connection, review):
+    user_context_cache.invalidate(review.user_id)
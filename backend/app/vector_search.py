@@ -0,0 +1,90 @@
+import os
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import crud
+
+# 벡터 검색 기본 설정 (환경 변수로 조정 가능)
+# VECTOR_SEARCH_METRIC : cosine 또는 inner_product
+# VECTOR_SEARCH_EF_SEARCH : HNSW 탐색 후보 수 (비우면 서버 기본값 사용)
+# VECTOR_SEARCH_ITERATIVE_SCAN : 필터 사용 시 iterative index scan 모드 (pgvector 0.8+)
+VECTOR_SEARCH_METRIC = os.getenv("VECTOR_SEARCH_METRIC", "cosine")
+VECTOR_SEARCH_EF_SEARCH = int(os.getenv("VECTOR_SEARCH_EF_SEARCH", "0")) or None
+VECTOR_SEARCH_ITERATIVE_SCAN = os.getenv("VECTOR_SEARCH_ITERATIVE_SCAN") or None
+
+
+class VectorIndex(ABC):
+    """음식점 벡터 검색 인터페이스
+
+    search()는 (음식점 id, 유사도) 목록을 유사도가 높은 순서로 반환합니다.
+    PostgreSQL(pgvector)과 인메모리 구현이 같은 인터페이스를 따르며, 메서드를 모두 구현하지 않은 클래스는 생성할 수 없습니다.
+    """
+
+    @abstractmethod
+    def search(
+        self,
+        query_vector: List[float],
+        k: int = 10,
+        category: Optional[str] = None,
+        location: Optional[str] = None,
+    ) -> List[Tuple[int, float]]:
+        """(음식점 id, 유사도) 목록을 유사도가 높은 순서로 반환"""
+
+    @abstractmethod
+    def add(self, restaurant_id: int, vector: List[float]):
+        """음식점 벡터를 추가하거나 덮어씀"""
+
+    @abstractmethod
+    def remove(self, restaurant_id: int):
+        """음식점 벡터를 삭제"""
+
+
+class PgVectorIndex(VectorIndex):
+    """pgvector HNSW 인덱스를 사용하는 검색 (요청마다 DB 세션과 함께 생성)"""
+
+    def __init__(
+        self,
+        db: Session,
+        metric: str = VECTOR_SEARCH_METRIC,
+        ef_search: Optional[int] = VECTOR_SEARCH_EF_SEARCH,
+        iterative_scan: Optional[str] = VECTOR_SEARCH_ITERATIVE_SCAN,
+    ):
+        self.db = db
+        self.metric = metric
+        self.ef_search = ef_search
+        self.iterative_scan = iterative_scan
+
+    def search_restaurants(self, query_vector, k=10, category=None, location=None, ef_search=None):
+        """(음식점 모델, 유사도) 목록을 반환"""
+        return crud.search_restaurants_by_vector(
+            self.db,
+            query_vector,
+            k=k,
+            metric=self.metric,
+            ef_search=ef_search or self.ef_search,
+            category=category,
+            location=location,
+            # 필터가 있을 때만 iterative scan을 켜서 결과 수 부족을 방지
+            iterative_scan=self.iterative_scan if (category or location) else None,
+        )
+
+    def search(self, query_vector, k=10, category=None, location=None):
+        return [
+            (restaurant.id, score)
+            for restaurant, score in self.search_restaurants(query_vector, k, category, location)
+        ]
+
+    def add(self, restaurant_id, vector):
+        # 벡터는 restaurants.vector 컬럼에 저장되며 HNSW 인덱스는 PostgreSQL이 갱신
+        restaurant = crud.get_restaurant_by_id(self.db, restaurant_id)
+        if restaurant:
+            restaurant.vector = vector
+            self.db.commit()
+
+    def remove(self, restaurant_id):
+        restaurant = crud.get_restaurant_by_id(self.db, restaurant_id)
+        if restaurant:
+            restaurant.vector = None
+            self.db.commit()
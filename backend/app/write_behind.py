@@ -0,0 +1,255 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import DateTime, insert
+from sqlalchemy.exc import IntegrityError
+
+from . import models
+from .database import engine
+
+# 쓰기 지연(write-behind) 버퍼 설정
+# WRITE_BEHIND_MAX_BATCH : 이 개수만큼 쌓이면 바로 기록
+# WRITE_BEHIND_FLUSH_INTERVAL : 개수와 상관없이 기록하는 주기 (초)
+# WRITE_BEHIND_SPILL_DIR : 기록 전 행을 보관하는 스필 파일 위치 (프로세스가 죽어도 다음 시작 시 재기록)
+#   같은 호스트의 워커 프로세스끼리만 공유 (파일 소유자를 PID로 구분하므로 여러 컨테이너가 같은 볼륨을 쓰면 안 됨)
+WRITE_BEHIND_MAX_BATCH = int(os.getenv("WRITE_BEHIND_MAX_BATCH", "500"))
+WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("WRITE_BEHIND_FLUSH_INTERVAL", "1.0"))
+WRITE_BEHIND_SPILL_DIR = os.getenv("WRITE_BEHIND_SPILL_DIR", "./write_behind")
+
+
+class WriteBehindBuffer:
+    """테이블 행을 모아 두었다가 크기/시간 조건에 따라 multi-row INSERT로 한 번에 기록
+
+    add()는 메모리 버퍼와 스필 파일(JSONL)에만 쓰고 바로 반환하므로 요청 경로에서 커밋을 기다리지 않습니다.
+    기록할 때 스필 파일을 세그먼트로 떼어내고, max_batch 단위 청크를 커밋할 때마다 세그먼트에서 그 행들을 제거합니다.
+    기록에 실패했거나 프로세스가 중간에 종료된 세그먼트는 다음 주기/다음 시작 시 다시 기록됩니다 (최소 1회 기록).
+
+    스필 파일 이름에 PID를 넣어 워커 프로세스마다 따로 씁니다 (<name>.<pid>.active.jsonl, <name>.<pid>.<ms>.<n>.jsonl).
+    다른 프로세스의 파일은 그 프로세스가 종료된 경우에만, 자기 PID 이름으로 rename하여 가져온 뒤 다시 기록하므로
+    살아 있는 워커가 쓰고 있는 파일을 건드리거나 두 워커가 같은 파일을 중복 기록하지 않습니다.
+    """
+
+    def __init__(
+        self,
+        table,
+        name: str,
+        spill_dir: str = WRITE_BEHIND_SPILL_DIR,
+        max_batch: int = WRITE_BEHIND_MAX_BATCH,
+        flush_interval: float = WRITE_BEHIND_FLUSH_INTERVAL,
+    ):
+        self.table = table
+        self.name = name
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.spill_dir = Path(spill_dir)
+        self._datetime_columns = [column.name for column in table.columns if isinstance(column.type, DateTime)]
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._rows: List[Dict[str, Any]] = []
+        self._spill_file = None
+        self._segment = 0
+        self.flushed = 0
+
+    @property
+    def _active_path(self) -> Path:
+        # fork된 워커에서도 자기 PID의 파일을 쓰도록 매번 PID를 확인
+        return self.spill_dir / f"{self.name}.{os.getpid()}.active.jsonl"
+
+    # ---------- 요청 경로 ----------
+
+    def add(self, row: Dict[str, Any]):
+        """행을 버퍼에 추가 (DB에는 나중에 기록)"""
+        with self._lock:
+            if self._spill_file is None:
+                self.spill_dir.mkdir(parents=True, exist_ok=True)
+                self._spill_file = self._active_path.open("a", encoding="utf-8")
+            self._spill_file.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+            # 운영체제 버퍼까지만 내려보냄 (프로세스 종료에는 안전, 전원 장애까지는 보장하지 않음)
+            self._spill_file.flush()
+            self._rows.append(row)
+            if len(self._rows) >= self.max_batch:
+                self._wakeup.set()
+
+    # ---------- 기록 ----------
+
+    def _rotate(self):
+        """현재 버퍼와 스필 파일을 세그먼트로 떼어내어 반환"""
+        with self._lock:
+            if not self._rows:
+                return [], None
+            rows, self._rows = self._rows, []
+            self._spill_file.close()
+            self._spill_file = None
+            segment_path = self._new_segment_path()
+            os.replace(self._active_path, segment_path)
+            return rows, segment_path
+
+    def _new_segment_path(self) -> Path:
+        self._segment += 1
+        return self.spill_dir / f"{self.name}.{os.getpid()}.{int(time.time() * 1000)}.{self._segment}.jsonl"
+
+    def _owner_pid(self, path: Path) -> Optional[int]:
+        """스필 파일을 쓴 프로세스의 PID (PID가 없는 이전 형식의 파일은 None)"""
+        pid = path.name[len(self.name) + 1:].split(".", 1)[0]
+        return int(pid) if pid.isdigit() else None
+
+    def _adopt(self, path: Path) -> Optional[Path]:
+        """종료된 프로세스의 스필 파일을 자기 세그먼트로 rename하여 가져옴 (다른 프로세스가 먼저 가져갔으면 None)"""
+        segment_path = self._new_segment_path()
+        try:
+            os.replace(path, segment_path)
+        except FileNotFoundError:
+            return None
+        return segment_path
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        try:
+            with engine.begin() as connection:
+                connection.execute(insert(self.table), rows)
+        except IntegrityError:
+            # 잘못된 행(존재하지 않는 user_id 등) 하나 때문에 전체가 막히지 않도록 한 행씩 다시 기록
+            for row in rows:
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(self.table), [row])
+                except IntegrityError as e:
+                    print(f"{self.name} 행 기록 실패, 건너뜀: {row}, {e.orig}")
+
+    def _read_segment(self, path: Path) -> List[Dict[str, Any]]:
+        rows = []
+        with path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    # 종료 직전에 일부만 기록된 마지막 줄은 무시
+                    continue
+                for column in self._datetime_columns:
+                    if isinstance(row.get(column), str):
+                        row[column] = datetime.fromisoformat(row[column])
+                rows.append(row)
+        return rows
+
+    def _rewrite_segment(self, path: Path, rows: List[Dict[str, Any]]):
+        """세그먼트 파일을 아직 기록하지 않은 행만 남도록 교체 (임시 파일에 쓴 뒤 rename하므로 중간에 종료되어도 둘 중 하나만 남음)"""
+        tmp_path = path.with_suffix(".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=str) + "\n")
+        os.replace(tmp_path, path)
+
+    def _write_segment(self, rows: List[Dict[str, Any]], path: Path):
+        for start in range(0, len(rows), self.max_batch):
+            self._insert(rows[start:start + self.max_batch])
+            self.flushed += len(rows[start:start + self.max_batch])
+            # 커밋한 청크를 세그먼트에서 제거하여 이후 청크가 실패해도 재기록 시 같은 행이 중복 저장되지 않도록 함
+            remaining = rows[start + self.max_batch:]
+            if remaining:
+                self._rewrite_segment(path, remaining)
+        path.unlink()
+
+    def replay(self):
+        """이전 실행에서 기록하지 못한 스필 파일을 모두 DB에 기록"""
+        if not self.spill_dir.exists():
+            return
+        with self._flush_lock:
+            paths = sorted(self.spill_dir.glob(f"{self.name}.*.jsonl"))
+            active_path = self._active_path
+            for path in paths:
+                if path == active_path:
+                    continue
+                owner = self._owner_pid(path)
+                if owner != os.getpid():
+                    # 살아 있는 다른 워커의 파일은 그 워커가 기록
+                    if owner is not None and _pid_alive(owner):
+                        continue
+                    path = self._adopt(path)
+                    if path is None:
+                        continue
+                try:
+                    self._write_segment(self._read_segment(path), path)
+                except Exception as e:
+                    print(f"{self.name} 스필 파일 재기록 오류: {path}, {e}")
+                    return
+
+    def flush(self):
+        """버퍼에 쌓인 행을 max_batch 단위 multi-row INSERT로 기록"""
+        self.replay()
+        with self._flush_lock:
+            rows, segment_path = self._rotate()
+            if not rows:
+                return
+            try:
+                self._write_segment(rows, segment_path)
+            except Exception as e:
+                # 세그먼트 파일이 남아 있으므로 다음 주기의 replay()에서 다시 기록
+                print(f"{self.name} 기록 오류, 다음 주기에 재시도: {e}")
+
+    # ---------- 백그라운드 스레드 ----------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def start(self):
+        """이전 실행의 스필 파일을 기록하고 주기적 기록 스레드를 시작"""
+        if self._thread is not None:
+            return
+        with self._lock:
+            # 같은 PID를 썼던 이전 실행이 남긴 active 파일은 세그먼트로 바꿔 재기록 대상에 포함
+            # (종료된 다른 PID의 active 파일은 replay()에서 가져옴)
+            if self._spill_file is None and self._active_path.exists():
+                os.replace(self._active_path, self._new_segment_path())
+        self.replay()
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """스레드를 멈추고 남은 행을 모두 기록 (애플리케이션 종료 시 호출)"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._rows)
+        return {"pending": pending, "flushed": self.flushed}
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # Windows의 os.kill(pid, 0)은 프로세스를 종료시키므로 확인하지 않고 살아 있는 것으로 간주
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # 다른 사용자의 프로세스가 같은 PID를 사용 중
+        return True
+    except (OverflowError, ValueError, OSError):
+        return False
+    return True
+
+
+# 검색 기록 버퍼 (검색 요청마다 커밋하지 않고 모아서 기록)
+search_log_buffer = WriteBehindBuffer(models.SearchLog.__table__, "search_logs")
+
+
+def log_search(user_id: int, query: str):
+    """검색 기록을 쓰기 지연 버퍼에 추가 (검색 시각은 요청 시점 기준)"""
+    search_log_buffer.add({"user_id": user_id, "query": query, "created_at": datetime.now(timezone.utc)})
@@ -0,0 +1,105 @@
+"""음식점 이름 검색 지연 시간 벤치마크
+
+DATABASE_URL의 PostgreSQL(pg_trgm 확장 필요)에서 기존 방식(선행 와일드카드 ILIKE 순차 스캔 + 전체 결과 반환)과
+트라이그램/전문 검색 인덱스 + 키셋 페이지네이션 방식의 p50/p95 지연 시간을 비교합니다.
+
+실행: cd backend && python -m benchmarks.bench_name_search --populate 1000000
+  --populate N : 임의 이름을 가진 음식점 N개를 먼저 적재 (bench_ 접두사 이름, 실행 후 삭제하지 않음)
+"""
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app import crud, models
+from app.database import (
+    SessionLocal, create_all_tables, enable_pg_trgm_extension, enable_pgvector_extension, engine,
+    migrate_restaurant_search_indexes,
+)
+from app.ingest import write_rows
+
+AREAS = ["강남", "성수", "홍대", "을지로", "연남", "판교", "해운대", "서면", "익선", "망원"]
+BRANDS = ["미소", "한끼", "온기", "바다", "소담", "정담", "하루", "달빛", "우리", "봄날"]
+CUISINES = ["치킨", "국밥", "카페", "초밥", "파스타", "삼겹살", "냉면", "버거", "마라탕", "떡볶이"]
+CATEGORIES = ["한식", "일식", "양식", "중식", "카페,디저트", "분식", "술집"]
+QUERIES = ["치킨", "성수 카페", "강남국밥", "바다초밥", "연남 파스타", "마라", "떡볶이", "온기냉면"]
+
+
+def populate(count: int, seed: int = 0, chunk_size: int = 20000):
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        rows = [
+            {
+                "name": f"bench_{AREAS[a]}{BRANDS[b]}{CUISINES[c]} {start + index}호점",
+                "summary_category": CATEGORIES[c % len(CATEGORIES)],
+                "summary_feature_menu": CUISINES[c],
+            }
+            for index, (a, b, c) in enumerate(rng.integers(0, 10, size=(size, 3)))
+        ]
+        with engine.begin() as connection:
+            write_rows(connection, models.Restaurant.__table__, ["name", "summary_category", "summary_feature_menu"], rows)
+    print(f"{count:,}개 음식점 적재 완료")
+
+
+def legacy_search(db, name):
+    # 기존 get_restaurants_by_name: name ILIKE '%...%' 를 인덱스 없이 순차 스캔하고 결과 전체를 반환
+    db.execute(text("SET LOCAL enable_bitmapscan = off"))
+    db.execute(text("SET LOCAL enable_indexscan = off"))
+    return db.query(models.Restaurant).filter(models.Restaurant.name.ilike(f"%{name}%")).all()
+
+
+def measure(search, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                search(db, query)
+                latencies.append(time.perf_counter() - started)
+            finally:
+                db.close()
+    return np.array(latencies) * 1000
+
+
+def second_page(mode, limit):
+    def search(db, name):
+        _, cursor = crud.search_restaurants_by_name(db, name, mode=mode, limit=limit)
+        if cursor:
+            crud.search_restaurants_by_name(db, name, mode=mode, limit=limit, cursor=cursor)
+    return search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--populate", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    enable_pgvector_extension()
+    enable_pg_trgm_extension()
+    create_all_tables()
+    migrate_restaurant_search_indexes()
+    if args.populate:
+        populate(args.populate)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE restaurants"))
+
+    modes = {
+        "legacy ilike": legacy_search,
+        "trigram": lambda db, name: crud.search_restaurants_by_name(db, name, mode="trigram", limit=args.limit),
+        "trigram 2 pages": second_page("trigram", args.limit),
+        "fts": lambda db, name: crud.search_restaurants_by_name(db, name, mode="fts", limit=args.limit),
+        "fts 2 pages": second_page("fts", args.limit),
+    }
+    print(f"{'mode':<16}{'p50 ms':>10}{'p95 ms':>10}")
+    for label, search in modes.items():
+        latency = measure(search, args.repeat)
+        print(f"{label:<16}{np.percentile(latency, 50):>10.2f}{np.percentile(latency, 95):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
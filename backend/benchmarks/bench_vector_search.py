@@ -0,0 +1,76 @@
+"""pgvector HNSW 검색 recall / 지연 시간 벤치마크
+
+DATABASE_URL의 PostgreSQL(pgvector 확장 필요)에서 ef_search 값별로 HNSW 검색 결과를
+인덱스를 끈 정확 검색(exact) 결과와 비교하여 recall@k와 p50/p95 지연 시간을 출력합니다.
+
+실행: cd backend && python -m benchmarks.bench_vector_search --populate 100000
+  --populate N : 임의 벡터를 가진 음식점 N개를 먼저 적재 (bench_ 접두사 이름, 실행 후 삭제하지 않음)
+"""
+import argparse
+import time
+
+import numpy as np
+from sqlalchemy import text
+
+from app import crud, models
+from app.database import SessionLocal, create_all_tables, enable_pgvector_extension, engine
+from app.ingest import write_rows, _vector_literal
+from app.nlpService import EMBEDDING_DIM
+
+
+def populate(count: int, seed: int = 0, chunk_size: int = 5000):
+    rng = np.random.default_rng(seed)
+    for start in range(0, count, chunk_size):
+        vectors = rng.standard_normal((min(chunk_size, count - start), EMBEDDING_DIM)).astype(np.float32)
+        rows = [
+            {"name": f"bench_{start + index}", "vector": _vector_literal(vector.tolist())}
+            for index, vector in enumerate(vectors)
+        ]
+        with engine.begin() as connection:
+            write_rows(connection, models.Restaurant.__table__, ["name", "vector"], rows)
+    print(f"{count:,}개 음식점 적재 완료")
+
+
+def run_queries(query_vectors, k, metric, ef_search=None, exact=False):
+    latencies, results = [], []
+    for query_vector in query_vectors:
+        db = SessionLocal()
+        try:
+            if exact:
+                # 인덱스를 쓰지 않는 순차 스캔으로 정답 집합 계산
+                db.execute(text("SET LOCAL enable_indexscan = off"))
+            started = time.perf_counter()
+            rows = crud.search_restaurants_by_vector(db, query_vector.tolist(), k=k, metric=metric, ef_search=ef_search)
+            latencies.append(time.perf_counter() - started)
+            results.append({restaurant.id for restaurant, _ in rows})
+        finally:
+            db.close()
+    return results, np.array(latencies) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--populate", type=int, default=0)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--metric", default="cosine", choices=["cosine", "inner_product"])
+    parser.add_argument("--ef-search", default="10,40,100,200")
+    args = parser.parse_args()
+
+    enable_pgvector_extension()
+    create_all_tables()
+    if args.populate:
+        populate(args.populate)
+
+    query_vectors = np.random.default_rng(1).standard_normal((args.queries, EMBEDDING_DIM)).astype(np.float32)
+    truth, exact_latency = run_queries(query_vectors, args.k, args.metric, exact=True)
+    print(f"{'mode':<16}{'recall@' + str(args.k):>10}{'p50 ms':>10}{'p95 ms':>10}")
+    print(f"{'exact':<16}{1.0:>10.3f}{np.percentile(exact_latency, 50):>10.2f}{np.percentile(exact_latency, 95):>10.2f}")
+    for ef_search in (int(value) for value in args.ef_search.split(",")):
+        found, latency = run_queries(query_vectors, args.k, args.metric, ef_search=ef_search)
+        recall = np.mean([len(a & b) / max(len(b), 1) for a, b in zip(found, truth)])
+        print(f"{'hnsw ef=' + str(ef_search):<16}{recall:>10.3f}{np.percentile(latency, 50):>10.2f}{np.percentile(latency, 95):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.database는 import 시점에 DATABASE_URL을 읽으므로 app 모듈보다 먼저 테스트용 SQLite 파일 DB를 지정
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="cureat-tests-"), "test.sqlite3"))
+
+# backend 디렉터리에서 `python -m pytest`로 실행하지 않아도 app 패키지를 찾을 수 있도록 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def postgres_engine(tmp_path_factory):
+    """PostgreSQL 전용 쿼리(pg_trgm, 전문 검색, pgvector) 테스트용 엔진
+
+    TEST_POSTGRES_URL이 있으면 그 서버를 사용하고, 없으면 pgserver 패키지로 임시 서버를 실행합니다 (둘 다 없으면 건너뜀).
+    """
+    from sqlalchemy import create_engine, text
+
+    url = os.getenv("TEST_POSTGRES_URL")
+    if not url:
+        pgserver = pytest.importorskip("pgserver", reason="TEST_POSTGRES_URL 또는 pgserver 패키지가 필요합니다")
+        url = pgserver.get_server(str(tmp_path_factory.mktemp("pgdata")), cleanup_mode="stop").get_uri()
+    engine = create_engine(url.replace("postgresql://", "postgresql+psycopg2://", 1))
+    with engine.begin() as connection:
+        # 서버에 설치된 확장만 활성화 (pg_trgm이 없으면 trigram 테스트는 건너뜀)
+        for name in ("vector", "pg_trgm"):
+            if connection.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = :name"), {"name": name}).first():
+                connection.execute(text(f"CREATE EXTENSION IF NOT EXISTS {name}"))
+    yield engine
+    engine.dispose()
@@ -0,0 +1,125 @@
+import json
+import os
+
+import pytest
+
+from app import ad_filter as ad_filter_module
+from app.ad_filter import AdFilter
+
+
+@pytest.fixture(params=["automaton", "regex"])
+def matcher(request, monkeypatch):
+    """pyahocorasick 설치 여부와 관계없이 두 매칭 경로를 모두 확인"""
+    if request.param == "automaton":
+        if ad_filter_module.ahocorasick is None:
+            pytest.skip("pyahocorasick이 설치되어 있지 않음")
+    else:
+        monkeypatch.setattr(ad_filter_module, "ahocorasick", None)
+    return request.param
+
+
+class FakeClassifier:
+    def __init__(self, probability):
+        self.probability = probability
+        self.calls = []
+
+    def predict_proba(self, reviews):
+        self.calls.append(list(reviews))
+        return [self.probability] * len(reviews)
+
+
+def test_keyword_and_pattern_matches(matcher):
+    ad_filter = AdFilter(config_path=None)
+    assert ad_filter.is_rule_match("이 글은 체험단으로 방문했습니다")
+    assert ad_filter.is_rule_match("원고료를 지원 받았어요")
+    assert ad_filter.is_rule_match("맛있어요 # 협찬")
+    assert ad_filter.is_rule_match("업체로부터 식사를 무료로 제공받았습니다")
+    assert not ad_filter.is_rule_match("음식이 맛있고 직원분들이 친절해요")
+
+
+def test_overlapping_keywords(matcher):
+    ad_filter = AdFilter(keywords=["광고", "광고 포함", ""], patterns=[], config_path=None)
+    assert ad_filter.keywords == ["광고", "광고 포함"]
+    assert ad_filter.is_rule_match("광고 포함 게시물")
+    assert ad_filter.is_rule_match("광고")
+
+
+def test_keywords_are_matched_literally(matcher):
+    ad_filter = AdFilter(keywords=["1+1", "(이벤트)"], patterns=[], config_path=None)
+    assert ad_filter.is_rule_match("오늘 (이벤트) 진행")
+    assert ad_filter.is_rule_match("1+1 행사")
+    assert not ad_filter.is_rule_match("11 이벤트")
+
+
+def test_no_rules_matches_nothing(matcher):
+    ad_filter = AdFilter(keywords=[], patterns=[], config_path=None)
+    assert not ad_filter.is_rule_match("체험단")
+
+
+def test_score_batch_and_filter_reviews():
+    ad_filter = AdFilter(config_path=None)
+    reviews = ["체험단 후기", "친절하고 맛있어요"]
+    assert ad_filter.score_batch(reviews) == [1.0, 0.0]
+    assert ad_filter.filter_reviews(reviews) == ["친절하고 맛있어요"]
+
+
+def test_classifier_only_scores_reviews_without_rule_match():
+    classifier = FakeClassifier(0.8)
+    ad_filter = AdFilter(config_path=None, classifier=classifier)
+    reviews = ["체험단 후기", "친절하고 맛있어요", "양이 많아요"]
+    assert ad_filter.score_batch(reviews) == [1.0, pytest.approx(0.8), pytest.approx(0.8)]
+    # 규칙에 걸리지 않은 리뷰만 한 번의 배치로 분류기에 전달
+    assert classifier.calls == [["친절하고 맛있어요", "양이 많아요"]]
+    assert ad_filter.filter_reviews(reviews, threshold=0.9) == ["친절하고 맛있어요", "양이 많아요"]
+
+
+def test_classifier_not_called_when_every_review_matches_rules():
+    classifier = FakeClassifier(0.1)
+    ad_filter = AdFilter(config_path=None, classifier=classifier)
+    assert ad_filter.score_batch(["체험단", "#광고"]) == [1.0, 1.0]
+    assert classifier.calls == []
+
+
+def write_config(path, config, mtime):
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+
+def test_reloads_config_when_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(ad_filter_module, "AD_FILTER_RELOAD_INTERVAL", 0)
+    config_path = tmp_path / "ad_filter.json"
+    write_config(config_path, {"keywords": ["내돈내산 아님"], "patterns": []}, 1000)
+    ad_filter = AdFilter(config_path=str(config_path))
+    assert ad_filter.is_rule_match("내돈내산 아님")
+    # 설정 파일의 키워드가 기본 키워드를 대체
+    assert not ad_filter.is_rule_match("체험단")
+
+    assert not ad_filter.maybe_reload()
+    write_config(config_path, {"keywords": ["체험단"], "patterns": [r"#\s*PR"]}, 2000)
+    assert ad_filter.score_batch(["체험단", "# PR", "내돈내산 아님"]) == [1.0, 1.0, 0.0]
+
+
+def test_reload_checks_at_most_once_per_interval(tmp_path, monkeypatch):
+    monkeypatch.setattr(ad_filter_module, "AD_FILTER_RELOAD_INTERVAL", 3600)
+    config_path = tmp_path / "ad_filter.json"
+    write_config(config_path, {"keywords": ["첫번째"]}, 1000)
+    ad_filter = AdFilter(config_path=str(config_path))
+    write_config(config_path, {"keywords": ["두번째"]}, 2000)
+    assert not ad_filter.maybe_reload()
+    assert ad_filter.keywords == ["첫번째"]
+    assert ad_filter.maybe_reload(force=True)
+    assert ad_filter.keywords == ["두번째"]
+
+
+def test_invalid_config_keeps_current_rules(tmp_path, monkeypatch):
+    monkeypatch.setattr(ad_filter_module, "AD_FILTER_RELOAD_INTERVAL", 0)
+    config_path = tmp_path / "ad_filter.json"
+    write_config(config_path, {"keywords": ["첫번째"]}, 1000)
+    ad_filter = AdFilter(config_path=str(config_path))
+    config_path.write_text("{invalid", encoding="utf-8")
+    os.utime(config_path, (2000, 2000))
+    assert not ad_filter.maybe_reload()
+    assert ad_filter.keywords == ["첫번째"]
+    config_path.unlink()
+    assert not ad_filter.maybe_reload()
+    assert ad_filter.is_rule_match("첫번째")
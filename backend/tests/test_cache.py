@@ -0,0 +1,116 @@
+import pytest
+
+from app import cache
+from app.cache import MISSING, MemoryCache, ResponseCache, SQLiteCache, create_cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """cache 모듈의 time.time()을 테스트에서 직접 움직이는 시계로 교체"""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_size=3)
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), max_size=3)
+
+
+def test_get_returns_missing_for_unknown_key(backend):
+    assert backend.get("unknown") is MISSING
+
+
+def test_value_expires_after_ttl(backend, clock):
+    backend.set("a", {"name": "맛집"}, ttl=10)
+    clock[0] += 9
+    assert backend.get("a") == {"name": "맛집"}
+    clock[0] += 2
+    assert backend.get("a") is MISSING
+    # 만료된 항목은 조회할 때 삭제됨
+    assert len(backend) == 0
+
+
+def test_none_is_cached_as_value(backend, clock):
+    backend.set("a", None, ttl=10)
+    assert backend.get("a") is None
+
+
+def test_set_overwrites_value_and_ttl(backend, clock):
+    backend.set("a", 1, ttl=1)
+    backend.set("a", 2, ttl=100)
+    clock[0] += 50
+    assert backend.get("a") == 2
+    assert len(backend) == 1
+
+
+def test_evicts_least_recently_used(backend, clock):
+    for key in ("a", "b", "c"):
+        backend.set(key, key, ttl=100)
+        clock[0] += 1
+    # a를 조회하면 가장 최근에 사용한 항목이 되어 b가 먼저 밀려남
+    assert backend.get("a") == "a"
+    clock[0] += 1
+    backend.set("d", "d", ttl=100)
+    assert len(backend) == 3
+    assert backend.get("b") is MISSING
+    assert [backend.get(key) for key in ("a", "c", "d")] == ["a", "c", "d"]
+
+
+def test_delete_and_clear(backend):
+    backend.set("a", 1, ttl=100)
+    backend.set("b", 2, ttl=100)
+    backend.delete("a")
+    backend.delete("missing")
+    assert backend.get("a") is MISSING
+    backend.clear()
+    assert len(backend) == 0
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    SQLiteCache(path).set("a", [1, 2], ttl=100)
+    assert SQLiteCache(path).get("a") == [1, 2]
+
+
+def test_response_cache_uses_negative_ttl_for_none(clock):
+    response_cache = ResponseCache(MemoryCache(), ttl=100, negative_ttl=10)
+    response_cache.set("found", {"id": 1})
+    response_cache.set("not-found", None)
+    clock[0] += 11
+    assert response_cache.get("found") == {"id": 1}
+    assert response_cache.get("not-found") is MISSING
+
+
+def test_response_cache_stats(clock):
+    response_cache = ResponseCache(MemoryCache(), ttl=100, negative_ttl=10)
+    response_cache.set("found", 1)
+    response_cache.set("not-found", None)
+    response_cache.get("found")
+    response_cache.get("not-found")
+    response_cache.get("unknown")
+    stats = response_cache.stats()
+    assert stats["backend"] == "MemoryCache"
+    assert (stats["size"], stats["hits"], stats["misses"], stats["negative_hits"]) == (2, 2, 1, 1)
+    assert stats["hit_rate"] == 0.667
+
+
+def test_create_cache_reads_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("TEST_CACHE_BACKEND", "sqlite")
+    monkeypatch.setenv("TEST_CACHE_PATH", str(tmp_path / "env.sqlite3"))
+    monkeypatch.setenv("TEST_CACHE_MAX_SIZE", "7")
+    monkeypatch.setenv("TEST_CACHE_TTL", "30")
+    response_cache = create_cache("TEST_CACHE", default_ttl=60, default_negative_ttl=5)
+    assert isinstance(response_cache.backend, SQLiteCache)
+    assert response_cache.backend.max_size == 7
+    assert (response_cache.ttl, response_cache.negative_ttl) == (30.0, 5.0)
+
+
+def test_create_cache_defaults_to_memory(monkeypatch):
+    monkeypatch.delenv("TEST_CACHE_BACKEND", raising=False)
+    monkeypatch.delenv("TEST_CACHE_MAX_SIZE", raising=False)
+    response_cache = create_cache("TEST_CACHE", default_ttl=60, default_negative_ttl=5)
+    assert isinstance(response_cache.backend, MemoryCache)
+    assert response_cache.backend.max_size == 10000
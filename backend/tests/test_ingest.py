@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+
+from app import models
+from app.database import engine
+from app.ingest import Checkpoint, iter_chunks, iter_rows, parse_rating
+
+
+@pytest.fixture
+def checkpoint():
+    models.IngestCheckpoint.__table__.drop(engine, checkfirst=True)
+    return Checkpoint()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("4", 4), (" 4 ", 4), ("4.5", 5), (4.0, 4), (1, 1), ("5", 5),
+    ("0", None), ("6", None), ("-1", None), ("", None), (None, None), ("별로", None), ("nan", None), ("inf", None),
+])
+def test_parse_rating(value, expected):
+    assert parse_rating(value) == expected
+
+
+def test_iter_rows_and_chunks(tmp_path):
+    csv_path = tmp_path / "reviews.csv"
+    csv_path.write_text("content,rating\n맛있어요,5\n별로,2\n보통,3\n", encoding="utf-8")
+    jsonl_path = tmp_path / "restaurants.jsonl"
+    jsonl_path.write_text('{"name": "A"}\n\n{"name": "B"}\n', encoding="utf-8")
+
+    assert [row["content"] for row in iter_rows(str(csv_path), skip=1)] == ["별로", "보통"]
+    assert [row["name"] for row in iter_rows(str(jsonl_path))] == ["A", "B"]
+    assert [len(chunk) for chunk in iter_chunks(iter_rows(str(csv_path)), 2)] == [2, 1]
+
+
+def test_checkpoint_is_kept_per_file(checkpoint, tmp_path):
+    first, second = str(tmp_path / "first.csv"), str(tmp_path / "second.csv")
+    with engine.begin() as connection:
+        checkpoint.save(connection, "reviews", first, 5000)
+    with engine.begin() as connection:
+        checkpoint.save(connection, "reviews", second, 100)
+    # 두 번째 파일을 적재해도 첫 번째 파일의 진행 상황은 그대로 유지
+    assert checkpoint.rows_done("reviews", first) == 5000
+    assert checkpoint.rows_done("reviews", second) == 100
+    assert checkpoint.rows_done("restaurants", first) == 0
+
+    with engine.begin() as connection:
+        checkpoint.save(connection, "reviews", first, 10000)
+    assert checkpoint.rows_done("reviews", first) == 10000
+    assert checkpoint.rows_done("reviews", second) == 100
+
+
+def test_checkpoint_rolls_back_with_chunk(checkpoint, tmp_path):
+    source = str(tmp_path / "reviews.csv")
+    with engine.begin() as connection:
+        checkpoint.save(connection, "reviews", source, 10)
+    with pytest.raises(RuntimeError):
+        with engine.begin() as connection:
+            checkpoint.save(connection, "reviews", source, 20)
+            raise RuntimeError("청크 기록 실패")
+    assert checkpoint.rows_done("reviews", source) == 10
+
+
+def test_migrates_kind_only_primary_key(tmp_path):
+    source = str(tmp_path / "reviews.csv")
+    models.IngestCheckpoint.__table__.drop(engine, checkfirst=True)
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE ingest_checkpoints ("
+            "kind VARCHAR(50) PRIMARY KEY, source VARCHAR(500) NOT NULL, rows INTEGER NOT NULL, updated_at DATETIME)"
+        ))
+        connection.execute(
+            text("INSERT INTO ingest_checkpoints (kind, source, rows) VALUES ('reviews', :source, 42)"), {"source": source}
+        )
+
+    checkpoint = Checkpoint()
+    assert checkpoint.rows_done("reviews", source) == 42
+    other = str(tmp_path / "other.csv")
+    with engine.begin() as connection:
+        checkpoint.save(connection, "reviews", other, 7)
+    assert (checkpoint.rows_done("reviews", source), checkpoint.rows_done("reviews", other)) == (42, 7)
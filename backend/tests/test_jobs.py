@@ -0,0 +1,206 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, update
+
+from app import jobs, models
+from app.database import SessionLocal, engine
+
+
+@pytest.fixture
+def db():
+    # 전체 스키마(pgvector, tsvector)는 SQLite에서 만들 수 없으므로 jobs 테이블만 생성
+    models.Job.__table__.create(engine, checkfirst=True)
+    session = SessionLocal()
+    session.execute(delete(models.Job))
+    session.commit()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def reload(db, job):
+    db.expire_all()
+    return db.get(models.Job, job.id)
+
+
+def test_enqueue_deduplicates_active_key(db):
+    first = jobs.enqueue(db, "summarize_restaurant", {"restaurant_id": 1}, key="summary:1")
+    second = jobs.enqueue(db, "summarize_restaurant", {"restaurant_id": 1}, key="summary:1", priority=5)
+    assert second.id == first.id
+    # 더 높은 우선순위로 다시 요청하면 대기 중인 작업의 우선순위만 올림
+    assert reload(db, first).priority == 5
+    jobs.enqueue(db, "summarize_restaurant", {"restaurant_id": 1}, key="summary:1", priority=1)
+    assert reload(db, first).priority == 5
+    assert jobs.enqueue(db, "summarize_restaurant", {"restaurant_id": 2}, key="summary:2").id != first.id
+
+
+def test_enqueue_same_key_after_completion_creates_new_job(db):
+    first = jobs.enqueue(db, "embed_restaurant", key="embed:1")
+    claimed = jobs.claim(db, "worker-a")
+    assert jobs.complete(db, claimed, {"status": "updated"})
+    assert jobs.enqueue(db, "embed_restaurant", key="embed:1").id != first.id
+
+
+def test_claim_order_and_lock(db):
+    low = jobs.enqueue(db, "a")
+    high = jobs.enqueue(db, "a", priority=10)
+    later_low = jobs.enqueue(db, "a")
+    claimed = [jobs.claim(db, "worker-a").id for _ in range(3)]
+    assert claimed == [high.id, low.id, later_low.id]
+    assert jobs.claim(db, "worker-a") is None
+
+    job = reload(db, high)
+    assert (job.status, job.locked_by, job.attempts) == ("running", "worker-a", 1)
+    assert job.locked_at is not None
+
+
+def test_claim_respects_delay_and_kinds(db):
+    jobs.enqueue(db, "a", delay=3600)
+    other = jobs.enqueue(db, "b")
+    assert jobs.claim(db, "worker-a", kinds=["a"]) is None
+    assert jobs.claim(db, "worker-a", kinds=["a", "b"]).id == other.id
+    assert jobs.claim(db, "worker-a") is None
+
+
+def test_complete_records_result(db):
+    jobs.enqueue(db, "a")
+    job = jobs.claim(db, "worker-a")
+    assert jobs.complete(db, job, {"status": "ok"})
+    stored = reload(db, job)
+    assert (stored.status, stored.result, stored.locked_by, stored.locked_at) == ("succeeded", {"status": "ok"}, None, None)
+    # 이미 완료된 작업은 다시 반영하지 않음
+    assert not jobs.complete(db, job, {"status": "again"})
+
+
+def test_fail_retries_with_backoff_then_fails(db, monkeypatch):
+    jobs.enqueue(db, "a", max_attempts=2)
+    job = jobs.claim(db, "worker-a")
+    assert jobs.fail(db, job, "RuntimeError: 첫 번째 실패") == "queued"
+    stored = reload(db, job)
+    assert (stored.status, stored.last_error, stored.locked_by) == ("queued", "RuntimeError: 첫 번째 실패", None)
+    # 백오프 시간이 지나기 전에는 다시 가져가지 않음
+    assert jobs.claim(db, "worker-a") is None
+
+    db.execute(update(models.Job).where(models.Job.id == job.id).values(run_after=jobs._now()))
+    db.commit()
+    retry = jobs.claim(db, "worker-b")
+    assert (retry.id, retry.attempts) == (job.id, 2)
+    assert jobs.fail(db, retry, "x" * 5000) == "failed"
+    stored = reload(db, job)
+    assert stored.status == "failed"
+    assert len(stored.last_error) == 2000
+    assert jobs.claim(db, "worker-a") is None
+
+
+def test_backoff_seconds(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_BACKOFF_BASE", 10)
+    monkeypatch.setattr(jobs, "JOB_BACKOFF_MAX", 100)
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: high)
+    assert [jobs.backoff_seconds(attempts) for attempts in (1, 2, 3, 4, 5, 10)] == [10, 20, 40, 80, 100, 100]
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: low)
+    assert jobs.backoff_seconds(2) == 10
+
+
+def test_lost_lock_does_not_overwrite_new_owner(db):
+    jobs.enqueue(db, "a")
+    stale = jobs.claim(db, "worker-a")
+    # worker-a가 멈춘 사이 잠금이 만료되어 worker-b가 다시 가져감
+    db.execute(update(models.Job).where(models.Job.id == stale.id).values(locked_at=jobs._now() - timedelta(hours=1)))
+    db.commit()
+    assert jobs.recover_stale(db, timeout=60) == 1
+    current = jobs.claim(db, "worker-b")
+    assert current.id == stale.id
+
+    assert not jobs.complete(db, stale, {"status": "stale"})
+    assert jobs.fail(db, stale, "stale") is None
+    assert jobs.heartbeat(db, "worker-a", [stale.id]) == []
+    stored = reload(db, stale)
+    assert (stored.status, stored.locked_by, stored.result) == ("running", "worker-b", None)
+
+    assert jobs.complete(db, current, {"status": "ok"})
+    assert reload(db, stale).result == {"status": "ok"}
+
+
+def test_heartbeat_refreshes_only_own_running_jobs(db):
+    for _ in range(3):
+        jobs.enqueue(db, "a")
+    mine = jobs.claim(db, "worker-a")
+    theirs = jobs.claim(db, "worker-b")
+    old = jobs._now() - timedelta(hours=1)
+    db.execute(update(models.Job).values(locked_at=old))
+    db.commit()
+
+    assert jobs.heartbeat(db, "worker-a", [mine.id, theirs.id, 999]) == [mine.id]
+    assert jobs.heartbeat(db, "worker-a", []) == []
+    # 갱신된 작업은 잠금 시간 초과로 회수되지 않음
+    assert jobs.recover_stale(db, timeout=60) == 1
+    assert reload(db, mine).status == "running"
+    assert reload(db, theirs).status == "queued"
+
+
+def test_recover_stale_fails_jobs_without_attempts_left(db):
+    jobs.enqueue(db, "a", max_attempts=1)
+    job = jobs.claim(db, "worker-a")
+    assert jobs.recover_stale(db, timeout=60) == 0
+    db.execute(update(models.Job).values(locked_at=jobs._now() - timedelta(hours=1)))
+    db.commit()
+    assert jobs.recover_stale(db, timeout=60) == 1
+    stored = reload(db, job)
+    assert (stored.status, stored.locked_by) == ("failed", None)
+    assert stored.last_error
+
+
+def test_job_stats(db):
+    jobs.enqueue(db, "a")
+    jobs.enqueue(db, "a")
+    jobs.enqueue(db, "b")
+    jobs.claim(db, "worker-a", kinds=["a"])
+    assert jobs.job_stats(db) == {
+        "a": {"queued": 1, "running": 1, "succeeded": 0, "failed": 0},
+        "b": {"queued": 1, "running": 0, "succeeded": 0, "failed": 0},
+    }
+
+
+def test_worker_runs_sync_and_async_handlers(db, monkeypatch):
+    async def async_handler(payload):
+        return {"doubled": payload["value"] * 2}
+
+    def failing_handler(payload):
+        raise RuntimeError("크롤링 실패")
+
+    monkeypatch.setitem(jobs.HANDLERS, "test_async", async_handler)
+    monkeypatch.setitem(jobs.HANDLERS, "test_failing", failing_handler)
+    succeeded = jobs.enqueue(db, "test_async", {"value": 21})
+    retried = jobs.enqueue(db, "test_failing")
+    unknown = jobs.enqueue(db, "test_unknown", max_attempts=1)
+
+    worker = jobs.Worker(worker_id="worker-a")
+    for _ in range(3):
+        asyncio.run(worker.run_job(jobs.claim(db, worker.worker_id)))
+
+    assert reload(db, succeeded).result == {"doubled": 42}
+    assert reload(db, retried).status == "queued"
+    assert reload(db, retried).last_error == "RuntimeError: 크롤링 실패"
+    assert reload(db, unknown).status == "failed"
+    assert worker.stats == {"succeeded": 1, "retried": 1, "failed": 1, "lost": 0}
+    assert worker._running == {}
+
+
+def test_worker_counts_lost_jobs(db, monkeypatch):
+    def handler(payload):
+        # 실행 중에 잠금이 다른 워커로 넘어간 상황
+        with SessionLocal() as session:
+            session.execute(update(models.Job).values(locked_by="worker-b"))
+            session.commit()
+        return {"status": "ok"}
+
+    monkeypatch.setitem(jobs.HANDLERS, "test_lost", handler)
+    job = jobs.enqueue(db, "test_lost")
+    worker = jobs.Worker(worker_id="worker-a")
+    asyncio.run(worker.run_job(jobs.claim(db, worker.worker_id)))
+    stored = reload(db, job)
+    assert (stored.status, stored.locked_by, stored.result) == ("running", "worker-b", None)
+    assert worker.stats["lost"] == 1
@@ -0,0 +1,58 @@
+from app.structured_output import JsonArrayStreamParser
+
+
+def feed_all(parser, chunks):
+    items = []
+    for chunk in chunks:
+        items.extend(parser.feed(chunk))
+    return items
+
+
+def test_returns_each_object_as_soon_as_it_closes():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"name": "A"') == []
+    assert parser.feed('}, {"na') == [{"name": "A"}]
+    assert parser.feed('me": "B"}') == [{"name": "B"}]
+    assert not parser.finished
+    assert parser.feed("]") == []
+    assert parser.finished
+
+
+def test_single_character_chunks():
+    text = '[{"name": "A", "tags": ["x", {"y": 1}]}, {"name": "B"}]'
+    parser = JsonArrayStreamParser()
+    assert feed_all(parser, text) == [{"name": "A", "tags": ["x", {"y": 1}]}, {"name": "B"}]
+    assert parser.finished
+
+
+def test_skips_code_fence_and_prose_before_array():
+    parser = JsonArrayStreamParser()
+    items = feed_all(parser, ["추천 결과입니다.\n```json\n", '[{"name": "A"}]', "\n```"])
+    assert items == [{"name": "A"}]
+
+
+def test_brackets_and_escaped_quotes_inside_strings():
+    parser = JsonArrayStreamParser()
+    text = r'[{"name": "괄호 } ] { [ 식당", "quote": "say \"hi\" \\"}]'
+    assert feed_all(parser, [text[:20], text[20:]]) == [{"name": "괄호 } ] { [ 식당", "quote": 'say "hi" \\'}]
+
+
+def test_repairs_trailing_comma_in_element():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"name": "A", "menu": ["x",],},]') == [{"name": "A", "menu": ["x"]}]
+    assert parser.failed == []
+
+
+def test_records_unparsable_element_and_continues():
+    parser = JsonArrayStreamParser()
+    items = parser.feed('[{"name": A}, {"name": "B"}]')
+    assert items == [{"name": "B"}]
+    assert parser.failed == ['{"name": A}']
+    assert len(parser.errors) == 1
+
+
+def test_ignores_text_after_array_end():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"name": "A"}] 이후 설명 {"name": "B"}') == [{"name": "A"}]
+    assert parser.feed('{"name": "C"}') == []
+    assert parser.finished
@@ -0,0 +1,79 @@
+import threading
+
+import pytest
+
+from app import model_registry as model_registry_module
+from app import nlpService
+from app.model_registry import ModelRegistry
+
+
+def test_loads_once_and_reports_metrics():
+    calls = []
+    registry = ModelRegistry()
+    registry.register("model", lambda: calls.append(1) or "loaded")
+    assert not registry.is_loaded("model")
+    assert registry.get("model") == "loaded"
+    assert registry.get("model") == "loaded"
+    assert calls == [1]
+    metrics = registry.metrics()["models"]["model"]
+    assert (metrics["loaded"], metrics["attempts"], metrics["error"]) == (True, 1, None)
+
+
+def test_unknown_model():
+    with pytest.raises(KeyError):
+        ModelRegistry().get("missing")
+
+
+def test_failed_load_is_retried_after_interval(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(model_registry_module.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(model_registry_module, "MODEL_RETRY_INTERVAL", 60)
+    results = [RuntimeError("다운로드 실패"), "loaded"]
+
+    def loader():
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    registry = ModelRegistry()
+    registry.register("model", loader)
+    assert registry.get("model") is None
+    # 재시도 대기 중에는 로더를 다시 호출하지 않음
+    now[0] += 30
+    assert registry.get("model") is None
+    assert registry.metrics()["models"]["model"]["error"] == "다운로드 실패"
+    now[0] += 31
+    assert registry.get("model") == "loaded"
+    assert registry.metrics()["models"]["model"]["attempts"] == 2
+
+
+def test_slow_load_does_not_block_other_models():
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    registry = ModelRegistry()
+    registry.register("slow", slow_loader)
+    registry.register("fast", lambda: "fast")
+    thread = threading.Thread(target=registry.get, args=("slow",))
+    thread.start()
+    try:
+        assert started.wait(5)
+        # 느린 모델이 로딩 중이어도 다른 모델은 바로 로드됨
+        assert registry.get("fast") == "fast"
+        assert not registry.is_loaded("slow")
+    finally:
+        release.set()
+        thread.join()
+    assert registry.get("slow") == "slow"
+
+
+def test_pos_raises_clear_error_while_okt_unavailable(monkeypatch):
+    monkeypatch.setattr(nlpService, "NLP_TOKENIZER", "okt")
+    monkeypatch.setattr(nlpService, "get_okt", lambda: None)
+    with pytest.raises(RuntimeError, match="Okt"):
+        nlpService._pos("맛있는 냉면")
@@ -0,0 +1,79 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.schema import CreateTable
+
+from app import crud, models
+
+
+def has_extension(engine, name):
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT 1 FROM pg_extension WHERE extname = :name"), {"name": name}).first() is not None
+
+
+@pytest.fixture
+def pg_db(postgres_engine):
+    table = models.Restaurant.__table__
+    table.drop(postgres_engine, checkfirst=True)
+    trigram = has_extension(postgres_engine, "pg_trgm")
+    with postgres_engine.begin() as connection:
+        connection.execute(CreateTable(table))
+        # pg_trgm이 없는 서버에서는 trigram 인덱스만 빼고 생성
+        for index in table.indexes:
+            if trigram or index.name != "idx_restaurant_name_trgm":
+                index.create(connection)
+    session = sessionmaker(bind=postgres_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        table.drop(postgres_engine)
+
+
+def add_restaurants(db, names):
+    db.add_all([models.Restaurant(name=name, summary_category="한식", summary_description=name) for name in names])
+    db.commit()
+
+
+def read_all_pages(db, query, mode, limit):
+    ids, cursors, cursor = [], [], None
+    for _ in range(100):
+        restaurants, cursor = crud.search_restaurants_by_name(db, query, mode=mode, limit=limit, cursor=cursor)
+        ids += [restaurant.id for restaurant in restaurants]
+        if cursor is None:
+            return ids, cursors
+        # 같은 커서가 다시 나오면 무한 반복
+        assert cursor not in cursors
+        cursors.append(cursor)
+    pytest.fail("페이지 조회가 끝나지 않음")
+
+
+@pytest.mark.parametrize("mode, query", [("trigram", "을지로 냉면"), ("fts", "냉면")])
+def test_pages_across_tied_scores(pg_db, postgres_engine, mode, query):
+    if mode == "trigram" and not has_extension(postgres_engine, "pg_trgm"):
+        pytest.skip("pg_trgm 확장이 설치되어 있지 않습니다")
+    # 모든 행의 점수가 같아 페이지 경계마다 동점이 생김
+    add_restaurants(pg_db, ["을지로 냉면"] * 23)
+    ids, cursors = read_all_pages(pg_db, query, mode, limit=5)
+    assert len(ids) == 23
+    assert len(set(ids)) == 23
+    assert ids == sorted(ids)
+    assert len(cursors) == 4
+
+
+@pytest.mark.parametrize("mode, query", [("trigram", "냉면"), ("fts", "냉면")])
+def test_pages_follow_score_order(pg_db, postgres_engine, mode, query):
+    if mode == "trigram" and not has_extension(postgres_engine, "pg_trgm"):
+        pytest.skip("pg_trgm 확장이 설치되어 있지 않습니다")
+    add_restaurants(pg_db, ["냉면", "을지로 냉면", "평양 냉면 본점", "냉면 냉면"] * 4 + ["파스타"])
+    all_at_once, _ = read_all_pages(pg_db, query, mode, limit=100)
+    paged, _ = read_all_pages(pg_db, query, mode, limit=3)
+    assert paged == all_at_once
+    assert len(paged) == 16
+
+
+def test_invalid_mode_and_cursor(pg_db):
+    with pytest.raises(ValueError):
+        crud.search_restaurants_by_name(pg_db, "냉면", mode="like")
+    with pytest.raises(ValueError):
+        crud.search_restaurants_by_name(pg_db, "냉면", cursor="not-a-cursor")
@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import os
+
+import httpx
+import pytest
+
+# app.service 패키지의 __init__은 Gemini SDK 등을 불러오므로 naverMapService 모듈 파일만 직접 로드
+_spec = importlib.util.spec_from_file_location(
+    "naver_map_service",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "service", "naverMapService.py"),
+)
+naverMapService = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(naverMapService)
+
+
+class FakeNaverServer:
+    """요청을 기록하고 미리 정한 응답(상태 코드 또는 예외)을 차례로 돌려주는 가짜 네이버 서버"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0) if self.responses else 200
+        if isinstance(response, Exception):
+            raise response
+        if response == 200:
+            return httpx.Response(200, json={"items": [{"title": request.url.params.get("query")}]})
+        return httpx.Response(response, json={"errorMessage": "error"})
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """재시도 대기 시간을 기록하고 실제로는 기다리지 않음"""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(naverMapService.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(naverMapService.random, "random", lambda: 1.0)
+    return delays
+
+
+def make_client(server, **kwargs):
+    return naverMapService.NaverApiClient(
+        client_id="id", client_secret="secret", base_url="https://naver.test",
+        transport=httpx.MockTransport(server), **kwargs,
+    )
+
+
+def run(client, coroutine_factory):
+    async def main():
+        try:
+            return await coroutine_factory()
+        finally:
+            await client.aclose()
+    return asyncio.run(main())
+
+
+def test_reuses_pooled_client_and_sends_credentials(sleeps):
+    server = FakeNaverServer([200, 200])
+    client = make_client(server)
+
+    async def calls():
+        first_client = client._get_client()
+        local = await client.search_local("냉면")
+        image = await client.search_image("냉면", display=3)
+        # 요청마다 새 클라이언트를 만들지 않고 같은 커넥션 풀을 사용
+        assert client._get_client() is first_client
+        return local, image
+
+    local, image = run(client, calls)
+    assert local == {"items": [{"title": "냉면"}]}
+    assert image == {"items": [{"title": "냉면"}]}
+    assert [request.url.path for request in server.requests] == ["/v1/search/local.json", "/v1/search/image"]
+    assert server.requests[1].url.params["display"] == "3"
+    assert all(request.headers["X-Naver-Client-Id"] == "id" for request in server.requests)
+    assert all(request.headers["X-Naver-Client-Secret"] == "secret" for request in server.requests)
+    assert sleeps == []
+
+
+def test_client_recreated_after_close():
+    client = make_client(FakeNaverServer([]))
+
+    async def calls():
+        first_client = client._get_client()
+        await client.aclose()
+        return first_client, client._get_client()
+
+    first_client, second_client = run(client, calls)
+    assert first_client is not second_client
+
+
+@pytest.mark.parametrize("status_code", [429, 500, 502, 503, 504])
+def test_retries_with_backoff_on_rate_limit_and_server_errors(sleeps, status_code):
+    server = FakeNaverServer([status_code, status_code, 200])
+    client = make_client(server, retries=2, backoff=0.2)
+    assert run(client, lambda: client.search_local("냉면")) == {"items": [{"title": "냉면"}]}
+    assert len(server.requests) == 3
+    assert sleeps == pytest.approx([0.2, 0.4])
+
+
+def test_gives_up_after_retries(sleeps):
+    server = FakeNaverServer([503, 503, 503, 200])
+    client = make_client(server, retries=2)
+    assert run(client, lambda: client.search_local("냉면")) is None
+    assert len(server.requests) == 3
+    assert len(sleeps) == 2
+
+
+@pytest.mark.parametrize("status_code", [400, 401, 403, 404])
+def test_does_not_retry_client_errors(sleeps, status_code):
+    server = FakeNaverServer([status_code, 200])
+    client = make_client(server, retries=2)
+    assert run(client, lambda: client.search_local("냉면")) is None
+    assert len(server.requests) == 1
+    assert sleeps == []
+
+
+def test_timeout_is_retried_then_returns_none(sleeps):
+    server = FakeNaverServer([httpx.ReadTimeout("timeout")] * 3)
+    client = make_client(server, retries=2)
+    assert run(client, lambda: client.search_local("냉면")) is None
+    assert len(server.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_recovers_after_connection_error(sleeps):
+    server = FakeNaverServer([httpx.ConnectError("refused"), 200])
+    client = make_client(server, retries=1)
+    assert run(client, lambda: client.search_local("냉면")) == {"items": [{"title": "냉면"}]}
+    assert len(sleeps) == 1
+
+
+def test_invalid_json_returns_none(sleeps):
+    client = make_client(lambda request: httpx.Response(200, text="<html>"))
+    assert run(client, lambda: client.search_local("냉면")) is None
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main, service
+from app.database import get_async_db
+
+
+class FakePipeline:
+    """들어온 순서대로 맛집마다 검증 결과(상세 정보)를 내보내는 추천 파이프라인 대역"""
+
+    def __init__(self):
+        self.names = []
+
+    async def iter_completed(self, items):
+        index = 0
+        async for candidate in items:
+            self.names.append(candidate.name)
+            yield index, {"name": candidate.name, "address": f"{candidate.name} 주소", "like_count": index}
+            index += 1
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def fake_db():
+        yield None
+
+    async def get_context(db, user_id):
+        return SimpleNamespace(user_id=user_id, namespace="") if user_id == 1 else None
+
+    main.app.dependency_overrides[get_async_db] = fake_db
+    monkeypatch.setattr(main.user_context_cache, "get", get_context)
+    monkeypatch.setattr(main, "record_search", lambda background_tasks, user_id, query: None)
+    monkeypatch.setattr(service, "RECOMMEND_MODE", "generate")
+    monkeypatch.setattr(service, "recommendation_pipeline", FakePipeline())
+    # lifespan(startup)을 실행하지 않도록 with 블록 없이 사용
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
+
+
+def stub_places(monkeypatch, names):
+    async def places(context, prompt):
+        for name in names:
+            yield SimpleNamespace(name=name)
+    monkeypatch.setattr(service, "_stream_places", places)
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines() if line]
+
+
+def read_sse(response):
+    chunks = []
+    for event in response.text.split("\n\n"):
+        if not event:
+            continue
+        event_line, data_line = event.split("\n")
+        chunk = json.loads(data_line[len("data: "):])
+        assert event_line == f"event: {chunk['type']}"
+        chunks.append(chunk)
+    return chunks
+
+
+def test_ndjson_chunk_order(client, monkeypatch):
+    stub_places(monkeypatch, ["냉면집", "파스타집"])
+    response = client.post("/recommendation/stream", json={"user_id": 1, "prompt": "시원한 음식"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert response.headers["x-accel-buffering"] == "no"
+
+    chunks = read_ndjson(response)
+    assert [chunk["type"] for chunk in chunks] == ["answer", "restaurant", "restaurant", "done"]
+    assert chunks[0]["data"]["restaurants"] == []
+    assert chunks[0]["data"]["answer"]
+    assert [chunk["data"]["name"] for chunk in chunks[1:3]] == ["냉면집", "파스타집"]
+    assert chunks[1]["data"]["address"] == "냉면집 주소"
+    assert chunks[-1]["data"] == {"count": 2}
+
+
+def test_sse_chunk_order(client, monkeypatch):
+    stub_places(monkeypatch, ["냉면집"])
+    response = client.post("/recommendation/stream?format=sse", json={"user_id": 1, "prompt": "시원한 음식"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    chunks = read_sse(response)
+    assert [chunk["type"] for chunk in chunks] == ["answer", "restaurant", "done"]
+    assert chunks[1]["data"]["name"] == "냉면집"
+    assert chunks[-1]["data"] == {"count": 1}
+
+
+@pytest.mark.parametrize("format, read", [("ndjson", read_ndjson), ("sse", read_sse)])
+def test_no_results_sends_done_answer(client, monkeypatch, format, read):
+    stub_places(monkeypatch, [])
+    response = client.post(f"/recommendation/stream?format={format}", json={"user_id": 1, "prompt": "없는 음식"})
+    chunks = read(response)
+    assert [chunk["type"] for chunk in chunks] == ["answer", "done"]
+    assert chunks[-1]["data"] == {"count": 0, "answer": "맛집을 찾을 수 없었어요."}
+
+
+def test_invalid_restaurant_is_skipped(client, monkeypatch):
+    class PartialPipeline(FakePipeline):
+        async def iter_completed(self, items):
+            async for candidate in items:
+                yield 0, {"name": candidate.name}
+
+    stub_places(monkeypatch, ["주소 없는 집"])
+    monkeypatch.setattr(service, "recommendation_pipeline", PartialPipeline())
+    chunks = read_ndjson(client.post("/recommendation/stream", json={"user_id": 1, "prompt": "아무거나"}))
+    assert [chunk["type"] for chunk in chunks] == ["answer", "done"]
+    assert chunks[-1]["data"]["count"] == 0
+
+
+def test_unknown_user(client, monkeypatch):
+    stub_places(monkeypatch, ["냉면집"])
+    response = client.post("/recommendation/stream", json={"user_id": 2, "prompt": "시원한 음식"})
+    assert response.status_code == 404
+
+
+def test_retrieval_error_falls_back_to_generate(monkeypatch):
+    async def failing_retrieval(db, context, prompt, category, location):
+        raise RuntimeError("후보 검색 실패")
+
+    async def places(context, prompt):
+        return [SimpleNamespace(name="냉면집")]
+
+    class Pipeline:
+        async def run(self, candidates):
+            return [{"name": candidate.name, "address": "주소"} for candidate in candidates]
+
+    monkeypatch.setattr(service, "RECOMMEND_MODE", "retrieval")
+    monkeypatch.setattr(service, "_recommend_from_candidates", failing_retrieval)
+    monkeypatch.setattr(service, "_recommend_places", places)
+    monkeypatch.setattr(service, "recommendation_pipeline", Pipeline())
+    result = asyncio.run(service.get_recommendation_for_user(SimpleNamespace(user_id=1), "시원한 음식", db=object()))
+    assert [restaurant["name"] for restaurant in result["restaurants"]] == ["냉면집"]
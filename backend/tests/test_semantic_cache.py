@@ -0,0 +1,118 @@
+import asyncio
+
+import pytest
+
+from app import semantic_cache
+from app.semantic_cache import SemanticCache, normalize_prompt
+
+# 정규화된 프롬프트 -> 임베딩 (냉면 추천/냉면 맛집은 서로 가깝고 파스타는 멀게)
+VECTORS = {
+    "냉면 추천": [1.0, 0.0, 0.0],
+    "냉면 맛집 추천": [0.98, 0.2, 0.0],
+    "파스타 추천": [0.0, 1.0, 0.0],
+    "초밥 추천": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def embed_calls(monkeypatch):
+    calls = []
+
+    async def embed(text):
+        calls.append(text)
+        return VECTORS[text]
+
+    monkeypatch.setattr(semantic_cache.embedding_service, "embed", embed)
+    return calls
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "time", lambda: now[0])
+    return now
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  냉면,   추천!! ") == "냉면 추천"
+    assert normalize_prompt("Best PASTA?") == "best pasta"
+
+
+def test_miss_then_store_embeds_prompt_once(embed_calls):
+    cache = SemanticCache(threshold=0.9)
+    cached, vector = run(cache.lookup("냉면 추천"))
+    assert cached is None
+    run(cache.store("냉면 추천", "응답", vector=vector))
+    assert embed_calls == ["냉면 추천"]
+    assert run(cache.lookup("냉면 추천!"))[0] == "응답"
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_store_without_vector_embeds(embed_calls):
+    cache = SemanticCache(threshold=0.9)
+    run(cache.store("냉면 추천", "응답"))
+    assert embed_calls == ["냉면 추천"]
+    assert cache.stats()["size"] == 1
+
+
+def test_similar_prompt_hits_and_different_prompt_misses(embed_calls):
+    cache = SemanticCache(threshold=0.9)
+    run(cache.store("냉면 추천", "냉면 응답"))
+    assert run(cache.lookup("냉면 맛집 추천"))[0] == "냉면 응답"
+    assert run(cache.lookup("파스타 추천"))[0] is None
+
+
+def test_namespaces_do_not_match(embed_calls):
+    cache = SemanticCache(threshold=0.9)
+    run(cache.store("냉면 추천", "A 사용자 응답", namespace="a"))
+    assert run(cache.lookup("냉면 추천", namespace="b"))[0] is None
+    assert run(cache.lookup("냉면 추천", namespace="a"))[0] == "A 사용자 응답"
+
+
+def test_entries_expire(embed_calls, clock):
+    cache = SemanticCache(threshold=0.9, ttl=10)
+    run(cache.store("냉면 추천", "응답"))
+    clock[0] += 11
+    assert run(cache.lookup("냉면 추천"))[0] is None
+    assert cache.stats()["size"] == 0
+
+
+def test_evicts_least_recently_used(embed_calls):
+    cache = SemanticCache(threshold=0.9, max_size=2)
+    run(cache.store("냉면 추천", "냉면"))
+    run(cache.store("파스타 추천", "파스타"))
+    assert run(cache.lookup("냉면 추천"))[0] == "냉면"
+    run(cache.store("초밥 추천", "초밥"))
+    assert run(cache.lookup("파스타 추천"))[0] is None
+    assert run(cache.lookup("냉면 추천"))[0] == "냉면"
+    assert run(cache.lookup("초밥 추천"))[0] == "초밥"
+
+
+def test_matrix_grows_and_stays_consistent_after_removal(embed_calls, monkeypatch):
+    vectors = {f"프롬프트 {index}": [1.0 if axis == index else 0.0 for axis in range(40)] for index in range(40)}
+
+    async def embed(text):
+        return vectors[text]
+
+    monkeypatch.setattr(semantic_cache.embedding_service, "embed", embed)
+    cache = SemanticCache(threshold=0.9, max_size=30)
+    for index in range(40):
+        run(cache.store(f"프롬프트 {index}", index))
+    # 앞의 10개는 밀려나고, 남은 항목은 행을 옮긴 뒤에도 자기 응답을 반환
+    assert [run(cache.lookup(f"프롬프트 {index}"))[0] for index in range(40)] == [None] * 10 + list(range(10, 40))
+
+
+def test_embedding_error_skips_cache(monkeypatch):
+    async def embed(text):
+        raise RuntimeError("모델 없음")
+
+    monkeypatch.setattr(semantic_cache.embedding_service, "embed", embed)
+    cache = SemanticCache()
+    assert run(cache.lookup("냉면 추천")) == (None, None)
+    run(cache.store("냉면 추천", "응답"))
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from app.schemas import CourseDetail, RestaurantDetail
+from app.structured_output import StructuredOutputError, extract_json, parse_model_list, parse_with_repair
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('[{"name": "A"}]', [{"name": "A"}]),
+    ('```json\n{"name": "A"}\n```', {"name": "A"}),
+    ('추천 결과입니다:\n[{"name": "A"}]\n참고하세요.', [{"name": "A"}]),
+    ('결과 {"items": [1, 2]} 입니다 [3]', {"items": [1, 2]}),
+    ('[{"name": "A", "menu": ["x", "y",],},]', [{"name": "A", "menu": ["x", "y"]}]),
+    ('설명 [{"name": "A",}] 끝', [{"name": "A"}]),
+])
+def test_extract_json(text, expected):
+    assert extract_json(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "JSON이 없는 응답", '[{"name": A}]', '{"name": "A"'])
+def test_extract_json_errors(text):
+    with pytest.raises(StructuredOutputError):
+        extract_json(text)
+
+
+def test_structured_output_error_is_value_error():
+    # 호출 측은 ValidationError와 함께 ValueError 하나로 처리
+    assert issubclass(StructuredOutputError, ValueError)
+
+
+def test_parse_model_list_drops_invalid_items(capsys):
+    value = [{"name": "A", "address": "서울"}, {"name": "B"}, {"name": "C", "address": "부산", "like_count": 3}]
+    restaurants = parse_model_list(value, RestaurantDetail)
+    assert [(restaurant.name, restaurant.like_count) for restaurant in restaurants] == [("A", 0), ("C", 3)]
+    assert "RestaurantDetail 검증 오류" in capsys.readouterr().out
+
+
+def test_parse_model_list_unwraps_object():
+    value = {"courses": [{"title": "코스 1", "steps": [{"name": "A", "address": "서울"}]}]}
+    [course] = parse_model_list(value, CourseDetail)
+    assert course.steps[0].name == "A"
+    # 배열이 없는 객체 하나는 원소 하나짜리 배열로 처리
+    assert parse_model_list({"name": "A", "address": "서울"}, RestaurantDetail)[0].name == "A"
+
+
+def test_parse_model_list_errors():
+    assert parse_model_list([], RestaurantDetail) == []
+    with pytest.raises(StructuredOutputError):
+        parse_model_list("A", RestaurantDetail)
+    with pytest.raises(StructuredOutputError, match="유효한 식당 항목이 없습니다"):
+        parse_model_list([{"name": "A"}], RestaurantDetail, label="식당")
+
+
+class FakeRepair:
+    """수정 요청마다 정해진 응답 텍스트를 차례로 반환 (받은 프롬프트는 prompts에 기록)"""
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.prompts = []
+
+    async def __call__(self, prompt):
+        self.prompts.append(prompt)
+        return self.texts.pop(0)
+
+
+def parse_restaurants(value):
+    return parse_model_list(value, RestaurantDetail)
+
+
+def test_repair_not_requested_for_valid_response():
+    repair = FakeRepair([])
+    text = '[{"name": "A", "address": "서울"}]'
+    result, final_text = asyncio.run(parse_with_repair(text, parse_restaurants, repair, max_repairs=1))
+    assert [restaurant.name for restaurant in result] == ["A"]
+    assert final_text == text
+    assert repair.prompts == []
+
+
+def test_repair_sends_error_and_uses_repaired_text():
+    repaired = '[{"name": "A", "address": "서울"}]'
+    repair = FakeRepair([repaired])
+    result, final_text = asyncio.run(parse_with_repair('[{"name": "A"}]', parse_restaurants, repair, max_repairs=1))
+    assert [restaurant.name for restaurant in result] == ["A"]
+    # 캐시에는 검증을 통과한 수정 응답이 저장되어야 함
+    assert final_text == repaired
+    assert len(repair.prompts) == 1
+    assert '[{"name": "A"}]' in repair.prompts[0]
+    assert "address" in repair.prompts[0]
+
+
+def test_repair_is_bounded():
+    repair = FakeRepair(["여전히 JSON 아님", "또 JSON 아님"])
+    with pytest.raises(StructuredOutputError, match="JSON 응답 수정 실패"):
+        asyncio.run(parse_with_repair("JSON 아님", parse_restaurants, repair, max_repairs=2))
+    assert len(repair.prompts) == 2
+
+    repair = FakeRepair([])
+    with pytest.raises(StructuredOutputError):
+        asyncio.run(parse_with_repair("JSON 아님", parse_restaurants, repair, max_repairs=0))
+    assert repair.prompts == []
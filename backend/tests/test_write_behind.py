@@ -0,0 +1,127 @@
+import os
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app import models, write_behind
+from app.database import engine
+from app.write_behind import WriteBehindBuffer
+
+table = models.SearchLog.__table__
+
+
+@pytest.fixture(autouse=True)
+def search_logs():
+    table.drop(engine, checkfirst=True)
+    table.create(engine)
+    yield
+    table.drop(engine)
+
+
+def make_buffer(spill_dir, **kwargs):
+    # 테스트에서는 백그라운드 스레드가 먼저 기록하지 않도록 주기를 길게 둠
+    kwargs.setdefault("flush_interval", 60)
+    return WriteBehindBuffer(table, "search_logs", spill_dir=str(spill_dir), **kwargs)
+
+
+def row(n):
+    return {"user_id": 1, "query": f"검색{n}", "created_at": datetime(2024, 1, 1, 12, n, tzinfo=timezone.utc)}
+
+
+def stored_queries():
+    with engine.connect() as connection:
+        return sorted(connection.execute(select(table.c.query)).scalars())
+
+
+def spill_files(spill_dir):
+    return sorted(path.name for path in spill_dir.glob("search_logs.*"))
+
+
+def test_add_spills_until_flush(tmp_path):
+    buffer = make_buffer(tmp_path)
+    for n in range(3):
+        buffer.add(row(n))
+
+    # 커밋 전에는 DB에 없고 스필 파일에만 있음
+    assert stored_queries() == []
+    assert spill_files(tmp_path) == [f"search_logs.{os.getpid()}.active.jsonl"]
+    assert len((tmp_path / spill_files(tmp_path)[0]).read_text(encoding="utf-8").splitlines()) == 3
+
+    buffer.flush()
+    assert stored_queries() == ["검색0", "검색1", "검색2"]
+    assert spill_files(tmp_path) == []
+    assert buffer.stats() == {"pending": 0, "flushed": 3}
+
+
+def test_replays_spill_file_after_crash(tmp_path):
+    crashed = make_buffer(tmp_path)
+    for n in range(3):
+        crashed.add(row(n))
+    # 기록하기 전에 프로세스가 종료된 상황 (메모리 버퍼는 사라지고 스필 파일만 남음)
+    crashed._spill_file.close()
+
+    restarted = make_buffer(tmp_path)
+    restarted.start()
+    restarted.stop()
+    assert stored_queries() == ["검색0", "검색1", "검색2"]
+    assert spill_files(tmp_path) == []
+
+
+def test_failed_chunk_keeps_only_unwritten_rows(tmp_path, monkeypatch):
+    buffer = make_buffer(tmp_path, max_batch=2)
+    for n in range(5):
+        buffer.add(row(n))
+
+    insert = buffer._insert
+    calls = []
+
+    def failing_insert(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("DB 연결 끊김")
+        insert(rows)
+
+    monkeypatch.setattr(buffer, "_insert", failing_insert)
+    buffer.flush()
+    # 첫 청크만 커밋되고 세그먼트에는 나머지 세 행만 남음
+    assert stored_queries() == ["검색0", "검색1"]
+    [segment] = spill_files(tmp_path)
+    assert len((tmp_path / segment).read_text(encoding="utf-8").splitlines()) == 3
+
+    monkeypatch.setattr(buffer, "_insert", insert)
+    buffer.flush()
+    assert stored_queries() == ["검색0", "검색1", "검색2", "검색3", "검색4"]
+    assert spill_files(tmp_path) == []
+    assert buffer.flushed == 5
+
+
+def test_adopts_only_dead_process_files(tmp_path):
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    dead_pid, live_pid = process.pid, os.getppid()
+
+    writer = make_buffer(tmp_path)
+    for n in range(2):
+        writer.add(row(n))
+    writer._spill_file.close()
+    own_path = tmp_path / f"search_logs.{os.getpid()}.active.jsonl"
+    # 종료된 워커의 active 파일과 살아 있는 워커의 세그먼트를 흉내 냄
+    dead_path = tmp_path / f"search_logs.{dead_pid}.active.jsonl"
+    live_path = tmp_path / f"search_logs.{live_pid}.1.1.jsonl"
+    os.replace(own_path, dead_path)
+    live_path.write_text(dead_path.read_text(encoding="utf-8"), encoding="utf-8")
+
+    make_buffer(tmp_path).replay()
+    assert stored_queries() == ["검색0", "검색1"]
+    assert spill_files(tmp_path) == [live_path.name]
+
+
+def test_pid_alive():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    assert write_behind._pid_alive(os.getpid())
+    if os.name != "nt":
+        assert not write_behind._pid_alive(process.pid)